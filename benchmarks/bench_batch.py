@@ -0,0 +1,90 @@
+"""Benchmark batch research throughput against a local fake Gemini client.
+
+The fake client sleeps for a fixed latency and fails a fraction of calls with
+a 503 so that concurrency, rate limiting and retries are all exercised
+without network access. Retrieval is replaced with an empty context because
+only the generation pipeline is measured here.
+
+Usage:
+    python benchmarks/bench_batch.py --records 100 --latency 0.5 --concurrency 1 8 32
+"""
+import argparse
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.agent import MarketingResearchAgent
+from core.batch import BatchRunner
+
+
+class FakeServerError(Exception):
+    code = 503
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, latency: float, failure_rate: float):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+
+    def generate_content(self, model: str, contents: str):
+        self.calls += 1
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise FakeServerError("503 UNAVAILABLE (fake)")
+        return FakeResponse(f"# 핵심 발견사항\n- 프롬프트 길이 {len(contents)}")
+
+
+class FakeClient:
+    def __init__(self, latency: float, failure_rate: float):
+        self.models = FakeModels(latency, failure_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch research throughput")
+    parser.add_argument("--records", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake generation latency (seconds)")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--rpm", type=float, default=6000, help="Requests per minute limit")
+    args = parser.parse_args()
+
+    records = [{"id": f"bench_{i:04d}", "query": f"질문 {i}", "update": False} for i in range(args.records)]
+
+    print(f"{'Concurrency':>11} {'Seconds':>8} {'Req/s':>7} {'Calls':>6} {'Failed':>7}")
+    print("-" * 44)
+    for concurrency in args.concurrency:
+        with tempfile.TemporaryDirectory() as tmp:
+            config_path = Path(tmp) / "config.yaml"
+            config_path.write_text(
+                f'paths:\n  research_history: "{tmp}/history"\n'
+                'prompts:\n  research_initial: "{rag_context}{query}"\n',
+                encoding='utf-8'
+            )
+            client = FakeClient(args.latency, args.failure_rate)
+            agent = MarketingResearchAgent(str(config_path), client=client)
+            agent._retrieve_docs = lambda query: []
+
+            runner = BatchRunner(agent, concurrency=concurrency, requests_per_minute=args.rpm,
+                                 backoff_base=0.05, stream=io.StringIO())
+            start = time.perf_counter()
+            results = runner.run(records)
+            elapsed = time.perf_counter() - start
+
+            failed = sum(1 for r in results if r["status"] != "ok")
+            print(f"{concurrency:>11} {elapsed:>8.2f} {len(results) / elapsed:>7.1f} "
+                  f"{client.models.calls:>6} {failed:>7}")
+
+
+if __name__ == "__main__":
+    main()
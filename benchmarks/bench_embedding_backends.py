@@ -0,0 +1,118 @@
+"""Benchmark embedding backends: speed vs. agreement with the PyTorch baseline.
+
+Embeds the sample docs' chunks and the research history findings with each
+backend (no embedding cache), then reports load time, throughput, cosine
+similarity of each vector to the torch vector for the same text, and how
+often top-k retrieval for a set of queries returns the same chunks.
+
+Usage:
+    python benchmarks/bench_embedding_backends.py --backends torch onnx onnx-int8 --threads 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.commons import get_research_history_path, load_config, load_research
+from core.embeddings import BACKENDS, create_embeddings
+
+QUERIES = [
+    "경쟁사 가격 정책",
+    "HubSpot 시장점유율",
+    "마케팅 자동화 트렌드",
+    "우리 제품의 강점과 약점",
+    "AI 콘텐츠 생성 기능",
+]
+
+
+def load_texts(config: dict, docs_dir: Path) -> list:
+    """Sample doc chunks plus research history findings paragraphs."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=config['rag']['chunk_size'],
+                                              chunk_overlap=config['rag']['chunk_overlap'])
+    texts = []
+    for path in sorted(docs_dir.glob("*.txt")):
+        texts.extend(splitter.split_text(path.read_text(encoding='utf-8')))
+
+    history_path = get_research_history_path(config)
+    for path in sorted(history_path.glob("*.jsonl")):
+        data = load_research(path.stem, history_path, raise_if_missing=False) or {}
+        for version in data.get("versions", []):
+            texts.extend(p for p in version["findings"].split("\n\n") if p.strip())
+    return list(dict.fromkeys(texts))
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def run_backend(rag_config: dict, texts: list, repeats: int) -> dict:
+    start = time.perf_counter()
+    embeddings = create_embeddings(rag_config)
+    embeddings.embed_documents(texts[:4])  # 세션/그래프 워밍업
+    load_seconds = time.perf_counter() - start
+
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        doc_vectors = embeddings.embed_documents(texts)
+        seconds.append(time.perf_counter() - start)
+    query_vectors = np.array([embeddings.embed_query(q) for q in QUERIES], dtype=np.float32)
+    return {
+        "load": load_seconds,
+        "seconds": min(seconds),
+        "docs": normalize(np.array(doc_vectors, dtype=np.float32)),
+        "queries": normalize(query_vectors),
+    }
+
+
+def top_k(result: dict, k: int) -> list:
+    scores = result["queries"] @ result["docs"].T
+    return [set(np.argsort(-row)[:k]) for row in scores]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--docs", default="sample_docs", help="Directory of .txt docs")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    texts = load_texts(config, Path(args.docs))
+    print(f"{len(texts)} texts ({sum(len(t) for t in texts)} chars), {len(QUERIES)} queries\n")
+
+    results = {}
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        rag_config = dict(config['rag'], embedding_backend=backend,
+                          embedding_threads=args.threads, embedding_batch_size=args.batch_size)
+        try:
+            results[backend] = run_backend(rag_config, texts, args.repeats)
+        except ValueError as e:
+            print(f"{backend}: skipped ({e})")
+
+    baseline = results["torch"]
+    baseline_top = top_k(baseline, args.top_k)
+    print(f"{'Backend':<10} {'Load (s)':>9} {'Embed (s)':>10} {'Texts/s':>8} {'Speedup':>8} "
+          f"{'Cos mean':>9} {'Cos min':>8} {f'Top-{args.top_k} overlap':>14}")
+    print("-" * 84)
+    for backend, result in results.items():
+        cosine = np.sum(result["docs"] * baseline["docs"], axis=1)
+        overlap = np.mean([len(a & b) / args.top_k for a, b in zip(top_k(result, args.top_k), baseline_top)])
+        print(f"{backend:<10} {result['load']:>9.2f} {result['seconds']:>10.3f} "
+              f"{len(texts) / result['seconds']:>8.1f} {baseline['seconds'] / result['seconds']:>7.2f}x "
+              f"{cosine.mean():>9.4f} {cosine.min():>8.4f} {overlap:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Benchmark peak memory of the diff export on multi-megabyte findings.
+
+Compares the previous implementation (diff materialized as a list and the
+whole report built as one string) with the streaming ``write_diff``, using
+tracemalloc, and checks that both produce the same report.
+
+Usage:
+    python benchmarks/bench_export_diff.py --sizes-mb 1 4 16
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from difflib import unified_diff
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from export_txt import write_diff
+
+
+def make_findings(size_mb: float, seed: int = 0) -> tuple:
+    """Two markdown reports of ~size_mb with ~5% of lines changed."""
+    rng = random.Random(seed)
+    words = ["시장", "점유율", "HubSpot", "Salesforce", "가격", "성장률", "AI", "자동화", "캠페인", "전환율"]
+    lines = []
+    size = 0
+    while size < size_mb * 1024 * 1024:
+        if len(lines) % 40 == 0:
+            line = f"## 섹션 {len(lines) // 40}\n"
+        else:
+            line = "- " + " ".join(rng.choice(words) for _ in range(12)) + f" {rng.randint(1, 99)}%\n"
+        lines.append(line)
+        size += len(line.encode('utf-8'))
+    new_lines = [line if rng.random() > 0.05 else line.rstrip('\n') + " (수정)\n" for line in lines]
+    return "".join(lines), "".join(new_lines)
+
+
+def legacy_write_diff(f, research_id: str, ver1: dict, ver2: dict) -> None:
+    """The previous export_diff body: list of diff lines + one content string."""
+    v1, v2 = ver1['version'], ver2['version']
+    findings1 = ver1['findings']
+    findings2 = ver2['findings']
+    diff_lines = list(unified_diff(
+        findings1.splitlines(keepends=True),
+        findings2.splitlines(keepends=True),
+        fromfile=f"Version {v1} ({ver1['timestamp']})",
+        tofile=f"Version {v2} ({ver2['timestamp']})",
+        lineterm=''
+    ))
+    added = sum(1 for line in diff_lines if line.startswith('+') and not line.startswith('+++'))
+    removed = sum(1 for line in diff_lines if line.startswith('-') and not line.startswith('---'))
+    content = f"""{'='*80}
+DIFF REPORT
+Research ID: {research_id}
+Comparison: Version {v1} → Version {v2}
+Generated: {datetime.now().isoformat()}
+{'='*80}
+
+[Version {v1}]
+  Timestamp: {ver1['timestamp']}
+  Query: {ver1['query']}
+
+[Version {v2}]
+  Timestamp: {ver2['timestamp']}
+  Query: {ver2['query']}
+
+{'='*80}
+SUMMARY
+{'='*80}
+  Lines added:   +{added}
+  Lines removed: -{removed}
+
+{'='*80}
+UNIFIED DIFF
+{'='*80}
+"""
+    content += ''.join(diff_lines)
+    content += f"""
+
+{'='*80}
+VERSION {v1} FULL TEXT
+{'='*80}
+{findings1}
+
+{'='*80}
+VERSION {v2} FULL TEXT
+{'='*80}
+{findings2}
+"""
+    f.write(content)
+
+
+def measure(func, ver1: dict, ver2: dict, output_path: Path) -> tuple:
+    """Return (seconds, peak MB above baseline) for writing one report."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        func(f, "bench", ver1, ver2)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024
+
+
+def without_generated(path: Path) -> str:
+    with open(path, encoding='utf-8') as f:
+        return "".join(line for line in f if not line.startswith("Generated: "))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark diff export memory")
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    print(f"{'Size':>6} {'Legacy peak (MB)':>17} {'Stream peak (MB)':>17} "
+          f"{'Legacy (s)':>11} {'Stream (s)':>11} {'Same':>5}")
+    print("-" * 74)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes_mb:
+            findings1, findings2 = make_findings(size_mb)
+            ver1 = {"version": 1, "timestamp": "2025-01-01T00:00:00", "query": "q", "findings": findings1}
+            ver2 = {"version": 2, "timestamp": "2025-02-01T00:00:00", "query": "q", "findings": findings2}
+            legacy_path, stream_path = Path(tmp) / "legacy.txt", Path(tmp) / "stream.txt"
+            legacy_s, legacy_mb = measure(legacy_write_diff, ver1, ver2, legacy_path)
+            stream_s, stream_mb = measure(write_diff, ver1, ver2, stream_path)
+            same = without_generated(legacy_path) == without_generated(stream_path)
+            print(f"{size_mb:>5g}M {legacy_mb:>17.1f} {stream_mb:>17.1f} "
+                  f"{legacy_s:>11.2f} {stream_s:>11.2f} {'yes' if same else 'NO':>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark the BM25 index and hybrid (dense + BM25) retrieval.
+
+Index part (no embedding model needed): builds a BM25 index over synthetic
+Korean/English chunks and reports build throughput, persisted size, load
+time, incremental update time and query latency.
+
+With --compare, also runs the configured agent over the ingested RAG DB
+and reports, for entity queries, whether each returned chunk mentions the
+entity, for dense-only and hybrid retrieval at the same top_k.
+
+Usage:
+    python benchmarks/bench_hybrid_retrieval.py --chunks 1000 10000 50000
+    python benchmarks/bench_hybrid_retrieval.py --compare --top-k 3
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.bm25 import BM25Index
+
+WORDS = ["시장", "점유율", "가격", "성장률", "자동화", "캠페인", "전환율", "고객", "세그먼트", "리텐션",
+         "marketing", "automation", "crm", "pricing", "email", "analytics", "ai", "roi"]
+ENTITIES = ["HubSpot", "Salesforce", "Marketo", "Braze", "Mailchimp", "MarketInsight"]
+
+
+def make_chunk(rng: random.Random, words: int = 150) -> str:
+    parts = [rng.choice(WORDS) for _ in range(words)]
+    parts[rng.randrange(words)] = rng.choice(ENTITIES) + "의"
+    return " ".join(parts)
+
+
+def bench_index(sizes: list, queries: int) -> None:
+    rng = random.Random(0)
+    print(f"{'Chunks':>8} {'Build (s)':>10} {'Chunks/s':>9} {'Size (MB)':>10} {'Load (s)':>9} "
+          f"{'Update (ms)':>12} {'Query p50 (ms)':>15} {'p95 (ms)':>9}")
+    print("-" * 92)
+    for size in sizes:
+        chunks = [make_chunk(rng) for _ in range(size)]
+        with tempfile.TemporaryDirectory() as tmp:
+            index = BM25Index(Path(tmp))
+            start = time.perf_counter()
+            for i, chunk in enumerate(chunks):
+                index.add(f"doc{i // 10}:{i % 10:05d}", chunk)
+            index.flush()
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index = BM25Index(Path(tmp))
+            load = time.perf_counter() - start
+            file_mb = index.path.stat().st_size / 1024 / 1024
+
+            # 문서 하나(청크 10개) 교체
+            start = time.perf_counter()
+            ids = [f"doc0:{j:05d}" for j in range(10)]
+            index.remove(ids)
+            for chunk_id in ids:
+                index.add(chunk_id, make_chunk(rng))
+            update = (time.perf_counter() - start) * 1000
+
+            timings = []
+            for _ in range(queries):
+                query = f"{rng.choice(ENTITIES)} {rng.choice(WORDS)} {rng.choice(WORDS)}"
+                start = time.perf_counter()
+                index.search(query, 20)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(f"{size:>8} {build:>10.2f} {size / build:>9.0f} {file_mb:>10.1f} {load:>9.2f} "
+                  f"{update:>12.2f} {statistics.median(timings):>15.2f} "
+                  f"{timings[int(len(timings) * 0.95) - 1]:>9.2f}")
+
+
+def compare_retrieval(config_path: str, top_k: int) -> None:
+    from core.agent import MarketingResearchAgent
+
+    agent = MarketingResearchAgent(config_path)
+    agent.config['rag']['top_k'] = top_k
+    agent.config['rag']['retrieval_cache_similarity'] = 0
+    if not len(agent.bm25_index):
+        print("BM25 index is empty: run --mode ingest first")
+        return
+    queries = [f"{entity} 가격 정책과 강점" for entity in ENTITIES]
+    print(f"\n{'Query':<32} {'Dense hits':>10} {'Hybrid hits':>12} {'Dense (ms)':>11} {'Hybrid (ms)':>12}")
+    print("-" * 82)
+    for query in queries:
+        entity = query.split()[0].lower()
+        row = []
+        for hybrid in (False, True):
+            agent.config['rag']['hybrid'] = hybrid
+            embedding = agent.embeddings.embed_query(query)
+            start = time.perf_counter()
+            if hybrid:
+                docs = agent._hybrid_search(query, embedding, top_k)
+            else:
+                docs = [{"content": d.page_content}
+                        for d in agent.vectorstore.similarity_search_by_vector(embedding, k=top_k)]
+            elapsed = (time.perf_counter() - start) * 1000
+            row.append((sum(entity in d["content"].lower() for d in docs), elapsed))
+        print(f"{query:<32} {row[0][0]:>7}/{top_k} {row[1][0]:>9}/{top_k} {row[0][1]:>11.1f} {row[1][1]:>12.1f}")
+    agent.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 and hybrid retrieval")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--compare", action="store_true", help="Compare dense vs hybrid on the ingested RAG DB")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    bench_index(args.chunks, args.queries)
+    if args.compare:
+        compare_retrieval(args.config, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark the research pipeline offline with a stub Gemini client.
+
+Runs the same set of queries twice against a temporary history and LLM
+response cache: the first pass misses the cache and pays the stub's latency,
+the second pass is served from the cache. Retrieval uses the configured RAG
+DB and embedding model unless --no-rag is given.
+
+Hybrid retrieval (--hybrid), near-duplicate retrieval-cache reuse
+(--retrieval-similarity) and the prompt token budget (--budget) are
+enabled for the run; all are off by default in config.yaml.
+
+Usage:
+    python benchmarks/bench_research_pipeline.py --queries 10 --latency 1.0
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.agent import MarketingResearchAgent
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModels:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, model: str, contents: str):
+        self.calls += 1
+        time.sleep(self.latency)
+        return StubResponse(f"# 핵심 발견사항\n- 스텁 응답 (프롬프트 {len(contents)}자)")
+
+
+class StubClient:
+    def __init__(self, latency: float):
+        self.models = StubModels(latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research pipeline with a stub client")
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=1.0, help="Stub generation latency (seconds)")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--no-rag", action="store_true", help="Skip retrieval (no embedding model needed)")
+    parser.add_argument("--retrieval-similarity", type=float, default=0.97,
+                        help="rag.retrieval_cache_similarity for the run (0: exact-query cache only)")
+    parser.add_argument("--budget", action=argparse.BooleanOptionalAction, default=True,
+                        help="Enable the prompt token budget (budget.enabled) for the run")
+    parser.add_argument("--hybrid", action=argparse.BooleanOptionalAction, default=True,
+                        help="Use hybrid BM25 + vector retrieval (rag.hybrid) for the run")
+    args = parser.parse_args()
+
+    client = StubClient(args.latency)
+    agent = MarketingResearchAgent(args.config, client=client)
+    with tempfile.TemporaryDirectory() as tmp:
+        agent.research_history_path = Path(tmp) / "history"
+        agent.research_history_path.mkdir()
+        agent.config['paths'] = dict(agent.config.get('paths') or {}, llm_cache=str(Path(tmp) / "llm_cache"))
+        agent.use_llm_cache = True
+        agent.config['rag']['retrieval_cache_similarity'] = args.retrieval_similarity
+        agent.config['rag']['hybrid'] = args.hybrid
+        agent.config['budget'] = dict(agent.config.get('budget') or {}, enabled=args.budget)
+        if args.no_rag:
+            agent._retrieve_docs = lambda query: []
+
+        queries = [f"2025년 마케팅 자동화 시장 트렌드 {i}" for i in range(args.queries)]
+        print(f"{'Pass':<6} {'Mean (ms)':>10} {'p95 (ms)':>9} {'Cache hits':>11} {'Gemini calls':>13}")
+        print("-" * 54)
+        for name in ("cold", "warm"):
+            calls_before = client.models.calls
+            timings, hits = [], 0
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                agent.research(query, f"bench_{i}")
+                timings.append((time.perf_counter() - start) * 1000)
+                hits += bool(agent.last_llm_cache_hit)
+            p95 = sorted(timings)[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+            print(f"{name:<6} {statistics.mean(timings):>10.1f} {p95:>9.1f} {hits:>11} "
+                  f"{client.models.calls - calls_before:>13}")
+    agent.close()
+
+
+if __name__ == "__main__":
+    main()
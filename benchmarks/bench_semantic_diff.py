@@ -0,0 +1,87 @@
+"""Benchmark semantic_diff latency against report section count.
+
+Usage:
+    python benchmarks/bench_semantic_diff.py --sections 5 10 20 40 80
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.agent import MarketingResearchAgent
+
+
+class CountingEmbeddings:
+    """Wraps an embeddings object and counts model calls and embedded texts."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.calls = 0
+        self.texts = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return self.inner.embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls += 1
+        self.texts += 1
+        return self.inner.embed_query(text)
+
+
+def make_report(sections: int, revision: int = 0) -> str:
+    """Build a synthetic markdown report; every third section changes per revision."""
+    parts = []
+    for i in range(sections):
+        changed = revision and i % 3 == 0
+        share = 10 + (i * 7 + revision * 5 if changed else i * 7) % 40
+        parts.append(
+            f"# 섹션 {i + 1}: {'신규 ' if changed else ''}시장 동향\n"
+            f"- 경쟁사 {i % 5 + 1}의 시장점유율은 {share}% 수준입니다.\n"
+            f"- 채널별 캠페인 ROI는 {'하락' if changed else '상승'} 추세이며 예산 재배분이 필요합니다.\n"
+            f"- 중소기업 마케팅 팀을 대상으로 한 자동화 수요가 꾸준히 증가하고 있습니다."
+        )
+    return "\n\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark semantic_diff latency")
+    parser.add_argument("--sections", type=int, nargs="+", default=[5, 10, 20, 40, 80])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--cached", action="store_true",
+                        help="Go through the persistent embedding cache (default: measure raw model inference)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    agent = MarketingResearchAgent(args.config)
+    if args.cached:
+        agent.embeddings.inner = counter = CountingEmbeddings(agent.embeddings.inner)
+    else:
+        agent.embeddings = counter = CountingEmbeddings(agent.embeddings.inner)
+
+    # Warm up the model so the first measurement does not include lazy init
+    agent.semantic_diff(make_report(2), make_report(2, revision=1))
+
+    print(f"{'Sections':>8} {'Chunks':>7} {'Changed':>8} {'Calls':>6} {'Texts':>6} {'Mean (ms)':>10} {'Min (ms)':>9}")
+    print("-" * 62)
+    for sections in args.sections:
+        old, new = make_report(sections), make_report(sections, revision=1)
+        timings = []
+        for _ in range(args.repeat):
+            counter.calls = counter.texts = 0
+            start = time.perf_counter()
+            result = agent.semantic_diff(old, new)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        print(f"{sections:>8} {result['total_sections']:>7} {len(result['changed_sections']):>8} "
+              f"{counter.calls:>6} {counter.texts:>6} "
+              f"{sum(timings) / len(timings):>10.1f} {min(timings):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark request latency against a running agent server (cli.py --mode serve).
+
+Sends diff and retrieval requests to the warm server (sequentially, then
+with --concurrency parallel clients) and reports client-side latency
+percentiles. With --cold, also times the same diff as a fresh
+``cli.py --mode diff`` process, which pays for interpreter startup, model
+loading and store opening on every call.
+
+Usage:
+    python cli.py --mode serve &
+    python benchmarks/bench_server.py --id marketing_trend_2025 --old 1 --new 2 --query "HubSpot 가격" --cold
+    python benchmarks/bench_server.py --id marketing_trend_2025 --old 1 --new 2 --requests 200 --concurrency 8
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.server import request, DEFAULT_HOST, DEFAULT_PORT
+
+
+def timed_requests(server: str, endpoint: str, payload: dict, count: int, concurrency: int) -> tuple:
+    def one(_):
+        start = time.perf_counter()
+        request(server, endpoint, payload)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        timings = sorted(executor.map(one, range(count)))
+    return timings, count / (time.perf_counter() - start)
+
+
+def report(label: str, timings: list, throughput: float) -> None:
+    print(f"{label:<28} {statistics.median(timings):>10.1f} {timings[int(len(timings) * 0.95) - 1]:>10.1f} "
+          f"{timings[-1]:>10.1f} {throughput:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the warm agent server")
+    parser.add_argument("--server", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    parser.add_argument("--id", required=True, help="Research ID with at least two versions")
+    parser.add_argument("--old", type=int, default=1)
+    parser.add_argument("--new", type=int, default=2)
+    parser.add_argument("--query", default="HubSpot 가격 정책", help="Retrieval query")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cold", action="store_true", help="Also time a fresh cli.py --mode diff process")
+    args = parser.parse_args()
+
+    diff = {"id": args.id, "old": args.old, "new": args.new}
+    retrieve = {"query": args.query}
+    # 첫 요청에서 diff 결과/검색 캐시가 만들어지므로 측정 전에 한 번씩 호출
+    request(args.server, "diff", diff)
+    request(args.server, "retrieve", retrieve)
+
+    print(f"{'Request':<28} {'p50 (ms)':>10} {'p95 (ms)':>10} {'Max (ms)':>10} {'Req/s':>9}")
+    print("-" * 72)
+    for endpoint, payload in (("diff", diff), ("retrieve", retrieve)):
+        report(f"server {endpoint} (1 client)", *timed_requests(args.server, endpoint, payload, args.requests, 1))
+        report(f"server {endpoint} ({args.concurrency} clients)",
+               *timed_requests(args.server, endpoint, payload, args.requests, args.concurrency))
+
+    if args.cold:
+        cli = Path(__file__).resolve().parent.parent / "cli.py"
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(cli), "--mode", "diff", "--id", args.id,
+                            "--old", str(args.old), "--new", str(args.new)],
+                           stdout=subprocess.DEVNULL, check=True)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        report("cold cli.py --mode diff", timings, len(timings) / (sum(timings) / 1000))
+
+
+if __name__ == "__main__":
+    main()
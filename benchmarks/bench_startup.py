@@ -0,0 +1,100 @@
+"""Benchmark CLI cold-start time per mode using ``python -X importtime``.
+
+Each mode is run in a fresh interpreter inside a scratch directory with a
+synthetic research history, so no API key, network or RAG DB is needed.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = str(REPO_ROOT / "cli.py")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def make_workspace(root: Path) -> None:
+    history = root / "research_history"
+    history.mkdir()
+    versions = [
+        {
+            "version": i,
+            "timestamp": f"2025-01-0{i}T09:00:00",
+            "query": "마케팅 자동화 시장 트렌드",
+            "findings": "\n".join(f"- 발견사항 {j}: 버전 {i}" for j in range(50)),
+            "sources": ["Gemini Web Search"],
+            "delta": "Initial research" if i == 1 else "Updated with new insights",
+        }
+        for i in (1, 2)
+    ]
+    with open(history / "bench.json", 'w', encoding='utf-8') as f:
+        json.dump({"versions": versions}, f, ensure_ascii=False)
+    (root / "config.yaml").write_text(
+        'paths:\n  research_history: "./research_history"\n', encoding='utf-8'
+    )
+
+
+def parse_importtime(stderr: str) -> tuple:
+    """Return (total top-level import time in ms, heaviest top-level modules)."""
+    top_level = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level.append((int(match.group(2)) / 1000, match.group(4)))
+    top_level.sort(reverse=True)
+    return sum(ms for ms, _ in top_level), top_level[:3]
+
+
+def run_mode(cmd: list, cwd: Path, repeat: int) -> dict:
+    walls, imports = [], []
+    heaviest = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + cmd, cwd=cwd,
+                              capture_output=True, text=True)
+        walls.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(cmd)} failed:\n{proc.stderr[-2000:]}")
+        total, heaviest = parse_importtime(proc.stderr)
+        imports.append(total)
+    return {"wall_ms": statistics.median(walls), "import_ms": statistics.median(imports), "heaviest": heaviest}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI cold-start time per mode")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--heavy", action="store_true",
+                        help="Also measure importing the agent's heavy dependencies (research/ingest paths)")
+    args = parser.parse_args()
+
+    modes = {
+        "list": [CLI, "--mode", "list", "--file", "research_history/bench.json"],
+        "diff --textual-only": [CLI, "--mode", "diff", "--id", "bench", "--old", "1", "--new", "2", "--textual-only"],
+        "import core.agent": ["-c", "import sys; sys.path.insert(0, %r); import core.agent" % str(REPO_ROOT)],
+    }
+    if args.heavy:
+        modes["research deps"] = ["-c", "import google.genai, langchain_chroma, langchain_huggingface, numpy"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(tmp)
+        make_workspace(workspace)
+
+        print(f"{'Mode':<22} {'Wall (ms)':>10} {'Imports (ms)':>13}  Heaviest imports")
+        print("-" * 90)
+        for name, cmd in modes.items():
+            result = run_mode(cmd, workspace, args.repeat)
+            heaviest = ", ".join(f"{mod} {ms:.0f}ms" for ms, mod in result["heaviest"])
+            print(f"{name:<22} {result['wall_ms']:>10.1f} {result['import_ms']:>13.1f}  {heaviest}")
+
+
+if __name__ == "__main__":
+    main()
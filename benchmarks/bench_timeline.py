@@ -0,0 +1,92 @@
+"""Benchmark timeline (multi-version drift) analysis time and peak memory.
+
+Writes a synthetic history of N versions (sectioned findings where a few
+sections change every version) to a temp directory and builds the timeline
+with a deterministic hash-based embedder, so the numbers reflect history
+streaming, batching and drift computation rather than model speed. Peak
+memory is measured with tracemalloc and should grow with versions x dim,
+not with the total history size.
+
+Usage:
+    python benchmarks/bench_timeline.py --versions 30 300 1000
+    python benchmarks/bench_timeline.py --versions 500 --batch-texts 128 --export /tmp/timeline.json
+"""
+import argparse
+import hashlib
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.commons import append_research_version, iter_research_versions
+from core.timeline import build_timeline
+
+SECTIONS = ["시장 동향", "경쟁사 동향", "가격 정책", "고객 세그먼트", "채널 전략", "리스크", "기회 요인", "결론"]
+WORDS = ["시장", "점유율", "가격", "성장률", "자동화", "캠페인", "전환율", "고객", "HubSpot", "Salesforce", "AI"]
+
+
+def hash_embed(texts, dim: int = 384) -> np.ndarray:
+    """Deterministic pseudo-embeddings (normalized), one RNG seed per text."""
+    vectors = np.stack([
+        np.random.default_rng(int.from_bytes(hashlib.sha1(t.encode('utf-8')).digest()[:8], 'little'))
+        .standard_normal(dim, dtype=np.float32) for t in texts
+    ]) if texts else np.zeros((0, dim), dtype=np.float32)
+    return vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-8)
+
+
+def chunk_text(text: str, chunk_size: int = 500) -> list:
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [""]
+
+
+def write_history(path: Path, versions: int, section_chars: int) -> int:
+    rng = random.Random(0)
+    bodies = {s: " ".join(rng.choice(WORDS) for _ in range(section_chars // 4)) for s in SECTIONS}
+    for v in range(1, versions + 1):
+        for section in rng.sample(SECTIONS, 2):
+            words = bodies[section].split()
+            words[rng.randrange(len(words))] = f"{rng.choice(WORDS)}{v}"
+            bodies[section] = " ".join(words)
+        findings = "\n".join(f"## {i}. {s}\n{bodies[s]}\n" for i, s in enumerate(SECTIONS, 1))
+        append_research_version("bench", {"timestamp": f"2025-01-01T00:{v // 60 % 60:02d}:{v % 60:02d}",
+                                          "query": f"q{v}", "findings": findings}, path)
+    return sum(f.stat().st_size for f in path.glob("bench.*"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark timeline drift analysis")
+    parser.add_argument("--versions", type=int, nargs="+", default=[30, 300])
+    parser.add_argument("--section-chars", type=int, default=800)
+    parser.add_argument("--batch-texts", type=int, default=512)
+    parser.add_argument("--export", help="Also time writing the timeline to this .json/.csv path")
+    args = parser.parse_args()
+
+    print(f"{'Versions':>9} {'History (MB)':>13} {'Build (s)':>10} {'Export (s)':>11} {'Peak (MB)':>10}")
+    print("-" * 58)
+    for versions in args.versions:
+        with tempfile.TemporaryDirectory() as tmp:
+            history_mb = write_history(Path(tmp), versions, args.section_chars) / 1024 / 1024
+            tracemalloc.start()
+            start = time.perf_counter()
+            timeline = build_timeline("bench", iter_research_versions("bench", Path(tmp)),
+                                      hash_embed, chunk_text, batch_texts=args.batch_texts)
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            if args.export:
+                if args.export.endswith(".json"):
+                    timeline.write_json(args.export)
+                else:
+                    timeline.write_csv(args.export)
+            export = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{versions:>9} {history_mb:>13.1f} {build:>10.2f} {export:>11.2f} {peak / 1024 / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark the flat memory-mapped vector store against Chroma.
+
+Uses synthetic random vectors (no embedding model needed): each chunk text
+maps to a precomputed vector, so only the stores themselves are measured.
+Reports ingest throughput, cold open time (new process-like handle, first
+query included), single-query latency and batched multi-query latency, and
+checks that both stores return the same top-1 for each query.
+
+Usage:
+    python benchmarks/bench_vector_store.py --chunks 10000 100000 --dim 384
+    python benchmarks/bench_vector_store.py --chunks 50000 --no-chroma
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.flat_store import FlatVectorStore
+
+
+class LookupEmbeddings:
+    """Embedding function returning precomputed vectors for "chunk <n>" texts."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[int(text.split()[1])].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[int(text.split()[1])].tolist()
+
+
+def open_chroma(path: str, embeddings):
+    from langchain_chroma import Chroma
+    return Chroma(persist_directory=path, embedding_function=embeddings)
+
+
+def measure(open_store, vectors: np.ndarray, queries: np.ndarray, batch: int, k: int) -> dict:
+    embeddings = LookupEmbeddings(vectors)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = open_store(tmp, embeddings)
+        start = time.perf_counter()
+        for i in range(0, len(vectors), 1000):
+            ids = [f"doc{j // 10}:{j % 10:05d}" for j in range(i, min(i + 1000, len(vectors)))]
+            store.add_texts([f"chunk {j}" for j in range(i, i + len(ids))],
+                            metadatas=[{"source": f"doc{j // 10}.txt"} for j in range(i, i + len(ids))],
+                            ids=ids)
+        ingest = time.perf_counter() - start
+        del store
+
+        start = time.perf_counter()
+        store = open_store(tmp, embeddings)
+        store.similarity_search_by_vector(queries[0].tolist(), k=k)
+        cold = time.perf_counter() - start
+
+        timings, top1 = [], []
+        for query in queries:
+            start = time.perf_counter()
+            docs = store.similarity_search_by_vector(query.tolist(), k=k)
+            timings.append((time.perf_counter() - start) * 1000)
+            top1.append(docs[0].page_content)
+        timings.sort()
+
+        batched = None
+        if hasattr(store, "similarity_search_by_vector_batch"):
+            start = time.perf_counter()
+            for i in range(0, len(queries), batch):
+                store.similarity_search_by_vector_batch(queries[i:i + batch], k=k)
+            batched = (time.perf_counter() - start) * 1000 / len(queries)
+        return {"ingest": ingest, "cold": cold, "p50": statistics.median(timings),
+                "p95": timings[int(len(timings) * 0.95) - 1], "batched": batched, "top1": top1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flat vs Chroma vector stores")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=16, help="Queries per batched search")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--no-chroma", action="store_true", help="Only measure the flat store")
+    args = parser.parse_args()
+
+    stores = [("flat", lambda path, embeddings: FlatVectorStore(path, embeddings))]
+    if not args.no_chroma:
+        stores.append(("chroma", open_chroma))
+
+    rng = np.random.default_rng(0)
+    print(f"{'Chunks':>8} {'Store':<7} {'Ingest (s)':>11} {'Cold open (s)':>14} "
+          f"{'Query p50 (ms)':>15} {'p95 (ms)':>9} {'Batched (ms/q)':>15}")
+    print("-" * 85)
+    for size in args.chunks:
+        vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+        # 실제 질의처럼 저장된 청크 근처의 벡터로 검색
+        picks = rng.integers(0, size, args.queries)
+        queries = vectors[picks] + 0.1 * rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+        results = {}
+        for name, open_store in stores:
+            result = results[name] = measure(open_store, vectors, queries, args.batch, args.top_k)
+            batched = f"{result['batched']:.2f}" if result["batched"] is not None else "-"
+            print(f"{size:>8} {name:<7} {result['ingest']:>11.2f} {result['cold']:>14.3f} "
+                  f"{result['p50']:>15.2f} {result['p95']:>9.2f} {batched:>15}")
+        if len(results) == 2:
+            agree = sum(a == b for a, b in zip(results["flat"]["top1"], results["chroma"]["top1"]))
+            print(f"{'':>8} top-1 agreement: {agree}/{args.queries}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Multiprocess stress test for concurrent research history writes.
+
+Starts W writer processes that each append M versions, either all to the
+same research ID (contended per-ID lock) or one ID per worker (independent
+locks), optionally with reader processes polling the history at the same
+time. Afterwards it verifies that no version was lost or duplicated:
+
+- the version count equals W x M and version numbers are exactly 1..W x M
+- every (worker, sequence) payload appears exactly once
+- every version decodes (including delta-encoded ones) and matches a full
+  sequential parse of the history
+
+and reports throughput plus lock-wait statistics. Exits with status 1 if
+verification fails.
+
+Usage:
+    python benchmarks/stress_history_writes.py --workers 1 2 4 8 --appends 50
+    python benchmarks/stress_history_writes.py --workers 8 --separate-ids
+    python benchmarks/stress_history_writes.py --workers 4 --readers 2 --snapshot-interval 5 --compression zlib
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.commons import append_research_version, count_research_versions, load_research, load_research_version
+
+FILLER = "시장 점유율과 가격 정책, 경쟁사 캠페인 동향에 대한 분석 문단입니다. " * 10
+
+
+def writer(history_path: str, research_id: str, worker: int, appends: int,
+           snapshot_interval: int, compression: str, queue) -> None:
+    from core.metrics import METRICS
+
+    path = Path(history_path)
+    for seq in range(appends):
+        append_research_version(research_id, {
+            "timestamp": f"{time.time():.6f}",
+            "query": f"worker{worker}-{seq}",
+            "findings": f"## 작성자\nworker{worker}-{seq}\n\n## 본문\n{FILLER}\n",
+        }, path, snapshot_interval=snapshot_interval, compression=compression)
+    data = METRICS.to_dict()
+    wait = data["spans"].get("history.lock_wait", {"total": 0.0, "max": 0.0})
+    queue.put((wait["total"], wait["max"], data["counters"].get("history_lock_contended", 0)))
+
+
+def reader(history_path: str, research_ids: list, stop) -> None:
+    path = Path(history_path)
+    while not stop.is_set():
+        for research_id in research_ids:
+            count = count_research_versions(research_id, path)
+            if count:
+                load_research_version(research_id, path, count)
+
+
+def verify(history_path: Path, research_ids: list, workers: int, appends: int) -> list:
+    errors = []
+    expected = {f"worker{w}-{s}" for w in range(workers) for s in range(appends)}
+    if len(research_ids) > 1:
+        expected_by_id = {rid: {f"worker{w}-{s}" for s in range(appends)} for w, rid in enumerate(research_ids)}
+    else:
+        expected_by_id = {research_ids[0]: expected}
+
+    for research_id in research_ids:
+        wanted = expected_by_id[research_id]
+        count = count_research_versions(research_id, history_path)
+        if count != len(wanted):
+            errors.append(f"{research_id}: {count} versions, expected {len(wanted)}")
+        versions = load_research(research_id, history_path)["versions"]
+        numbers = [v["version"] for v in versions]
+        if numbers != list(range(1, len(versions) + 1)):
+            errors.append(f"{research_id}: version numbers are not 1..{len(versions)}")
+        queries = [v["query"] for v in versions]
+        if len(set(queries)) != len(queries):
+            errors.append(f"{research_id}: duplicated payloads")
+        if set(queries) != wanted:
+            errors.append(f"{research_id}: {len(wanted - set(queries))} payloads lost")
+        for v in versions:
+            single = load_research_version(research_id, history_path, v["version"])
+            if single["findings"] != v["findings"] or v["query"] not in v["findings"]:
+                errors.append(f"{research_id}: version {v['version']} does not decode consistently")
+                break
+    return errors
+
+
+def run(workers: int, appends: int, separate_ids: bool, readers: int,
+        snapshot_interval: int, compression: str) -> bool:
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        research_ids = [f"stress_{w}" for w in range(workers)] if separate_ids else ["stress"]
+        queue = ctx.Queue()
+        stop = ctx.Event()
+        reader_procs = [ctx.Process(target=reader, args=(tmp, research_ids, stop)) for _ in range(readers)]
+        writer_procs = [ctx.Process(target=writer, args=(tmp, research_ids[w % len(research_ids)], w, appends,
+                                                         snapshot_interval, compression, queue))
+                        for w in range(workers)]
+        for proc in reader_procs:
+            proc.start()
+        start = time.perf_counter()
+        for proc in writer_procs:
+            proc.start()
+        waits = [queue.get() for _ in writer_procs]
+        for proc in writer_procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for proc in reader_procs:
+            proc.join()
+
+        failed = [proc.exitcode for proc in writer_procs + reader_procs if proc.exitcode != 0]
+        errors = verify(Path(tmp), research_ids, workers, appends)
+        if failed:
+            errors.append(f"{len(failed)} worker processes failed")
+
+    total = workers * appends
+    wait_total = sum(w[0] for w in waits)
+    print(f"{workers:>8} {'separate' if separate_ids else 'same':>9} {total:>8} {elapsed:>9.2f} "
+          f"{total / elapsed:>10.0f} {wait_total / total * 1000:>14.2f} {max(w[1] for w in waits) * 1000:>13.1f} "
+          f"{sum(w[2] for w in waits):>10g}  {'OK' if not errors else 'FAIL'}")
+    for error in errors:
+        print(f"    {error}")
+    return not errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test concurrent history appends")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--appends", type=int, default=50, help="Versions appended per worker")
+    parser.add_argument("--separate-ids", action="store_true", help="One research ID per worker")
+    parser.add_argument("--readers", type=int, default=0, help="Reader processes polling during the run")
+    parser.add_argument("--snapshot-interval", type=int, default=0)
+    parser.add_argument("--compression", default="none")
+    args = parser.parse_args()
+
+    print(f"{'Workers':>8} {'IDs':>9} {'Versions':>8} {'Time (s)':>9} {'Appends/s':>10} "
+          f"{'Wait/append (ms)':>14} {'Max wait (ms)':>13} {'Contended':>10}  Result")
+    print("-" * 100)
+    ok = all([run(w, args.appends, args.separate_ids, args.readers, args.snapshot_interval, args.compression)
+              for w in args.workers])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
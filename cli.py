@@ -1,23 +1,33 @@
 # cli.py
 import json
+import sqlite3
 import sys
 import argparse
 from pathlib import Path
-from core.agent import MarketingResearchAgent
-from core.commons import InvalidResearchIdError
+from core.commons import (
+    InvalidResearchIdError,
+    load_config,
+    get_research_history_path,
+    load_research,
+    count_research_versions,
+    load_research_version,
+    load_draft,
+)
+
+# core.agent 및 무거운 의존성(genai, langchain, torch)은 필요한 모드에서만 import 합니다.
+
+RETRIEVAL_LABELS = {"hit": "캐시 적중", "near_hit": "유사 질의 캐시 적중", "miss": "벡터 검색"}
 
 
 def list_versions(file_path: str) -> None:
-    """List all versions in a research history JSON file."""
+    """List all versions in a research history file (.jsonl, or legacy .json)."""
     path = Path(file_path)
-    if not path.exists():
+    research_id = path.stem
+    data = load_research(research_id, path.parent, raise_if_missing=False)
+    if data is None:
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
     versions = data.get("versions", [])
-    research_id = path.stem
 
     print(f"\nFile: {file_path}")
     print(f"Research ID: {research_id}")
@@ -30,6 +40,160 @@ def list_versions(file_path: str) -> None:
         print(f"{v['version']:<5} {v['timestamp'][:19]:<25} {query_short:<40}")
 
 
+def show_textual_diff(research_id: str, v1: int, v2: int, config_path: str = "config.yaml") -> None:
+    """Print a textual diff without initializing the agent or embedding model."""
+    from core.agent import print_textual_diff
+
+    config = load_config(config_path)
+    history_path = get_research_history_path(config)
+    count = count_research_versions(research_id, history_path)
+    if count == 0:
+        raise FileNotFoundError(f"Research not found: {research_id}")
+    if count < max(v1, v2):
+        print("버전을 찾을 수 없습니다.")
+        return
+    findings1 = load_research_version(research_id, history_path, v1)["findings"]
+    findings2 = load_research_version(research_id, history_path, v2)["findings"]
+    print_textual_diff(research_id, findings1, findings2, v1, v2)
+
+
+def show_catalog(research_id: str = None, since: str = None, until: str = None,
+                 per_version: bool = False, config_path: str = "config.yaml") -> None:
+    """List research (or versions) across all histories from the SQLite index."""
+    from core.history_index import HistoryIndex
+
+    config = load_config(config_path)
+    with HistoryIndex.open(get_research_history_path(config)) as index:
+        if per_version:
+            rows = index.list_versions(research_id, since, until)
+            print(f"\n{'ID':<25} {'Ver':<5} {'Timestamp':<20} {'Length':>7}  {'Query':<40}")
+            print("-" * 100)
+            for row in rows:
+                query_short = row['query'][:37] + "..." if len(row['query']) > 40 else row['query']
+                print(f"{row['research_id']:<25} {row['version']:<5} {row['timestamp'][:19]:<20} "
+                      f"{row['length']:>7}  {query_short:<40}")
+        else:
+            rows = index.list_research(research_id, since, until)
+            print(f"\n{'ID':<25} {'Vers':<5} {'Last updated':<20} {'Latest query':<40}")
+            print("-" * 92)
+            for row in rows:
+                query_short = row['query'][:37] + "..." if len(row['query']) > 40 else row['query']
+                print(f"{row['research_id']:<25} {row['versions']:<5} {row['last'][:19]:<20} {query_short:<40}")
+    print(f"\n총 {len(rows)}건")
+
+
+def search_history(text: str, research_id: str = None, since: str = None, until: str = None,
+                   limit: int = 20, config_path: str = "config.yaml") -> None:
+    """Full-text search over all research findings via the SQLite index."""
+    from core.history_index import HistoryIndex
+
+    config = load_config(config_path)
+    with HistoryIndex.open(get_research_history_path(config)) as index:
+        rows = index.search(text, research_id, since, until, limit=limit)
+    for row in rows:
+        snippet = " ".join(row['snippet'].split())
+        print(f"{row['research_id']} v{row['version']} ({row['timestamp'][:19]}) - {row['query']}")
+        print(f"    {snippet}")
+    print(f"\n'{text}' 검색 결과 {len(rows)}건")
+
+
+def reindex_history(config_path: str = "config.yaml") -> None:
+    """Rebuild the SQLite index from all history files."""
+    from core.history_index import HistoryIndex
+
+    config = load_config(config_path)
+    with HistoryIndex(get_research_history_path(config)) as index:
+        count = index.rebuild()
+    print(f"✓ 버전 {count}개를 인덱싱했습니다 ({index.path})")
+
+
+def print_timeline(timeline, limit: int = 20, max_rows: int = 60) -> None:
+    """Print the per-version drift table, the largest shifts and the most churned sections."""
+    versions = timeline.versions
+    print(f"\n{'='*80}\n[Timeline] {timeline.research_id} "
+          f"({len(versions)}개 버전, {versions[0]['timestamp'][:10]} → {versions[-1]['timestamp'][:10]})\n{'='*80}")
+
+    if len(versions) <= max_rows:
+        largest = max((v["step_drift"] or 0 for v in versions), default=0) or 1
+        print(f"{'Ver':<5} {'Timestamp':<20} {'Step':>7} {'From v1':>8} {'Sum':>7} {'Changed':>8}")
+        print("-" * 80)
+        for v in versions:
+            changes = len(v["changed"]) + len(v["added"]) + len(v["removed"])
+            bar = "█" * round((v["step_drift"] or 0) / largest * 20)
+            # 빈 findings 버전과의 거리는 정의되지 않음
+            step = "-" if v["step_drift"] is None else f"{v['step_drift']:.3f}"
+            from_first = "-" if v["drift_from_first"] is None else f"{v['drift_from_first']:.3f}"
+            print(f"{v['version']:<5} {v['timestamp'][:19]:<20} {step:>7} "
+                  f"{from_first:>8} {v['cumulative_drift']:>7.3f} {changes:>8}  {bar}")
+    else:
+        print(f"(버전이 {len(versions)}개라 버전별 표는 생략합니다. 전체는 --output 으로 내보내세요.)")
+
+    shifts = timeline.shifts(limit)
+    print(f"\n큰 변화 (이전 버전 대비 거리 > {timeline.threshold}): {len(shifts)}건")
+    for v in shifts:
+        sections = v["changed"] + [f"+{t}" for t in v["added"]] + [f"-{t}" for t in v["removed"]]
+        print(f"  v{v['version']} ({v['timestamp'][:19]}) {v['step_drift']:.3f}  {', '.join(sections[:5])}"
+              + (f" 외 {len(sections) - 5}개" if len(sections) > 5 else ""))
+
+    print("\n변화가 많은 섹션:")
+    print(f"  {'Section':<40} {'Changes':>8} {'Drift':>7} {'Versions':>10} {'Last changed':>13}")
+    for s in timeline.churn(limit):
+        title = s["section"][:37] + "..." if len(s["section"]) > 40 else s["section"]
+        last = f"v{s['last_changed']}" if s["last_changed"] else "-"
+        print(f"  {title:<40} {s['changes']:>8} {s['drift']:>7.3f} "
+              f"{'v' + str(s['first_version']) + '-v' + str(s['last_version']):>10} {last:>13}")
+
+
+REMOTE_MODES = ["ingest", "research", "update", "diff"]
+
+
+def run_remote(args) -> None:
+    """Send the request to a running server (--mode serve) and print the result like the local modes."""
+    from core.server import request
+
+    if args.mode == "ingest":
+        stats = request(args.server, "ingest", {"docs": [str(Path(p).resolve()) for p in args.docs]})
+        print(f"✓ 문서 {len(args.docs)}개 처리 완료 "
+              f"(추가 {stats['added']}, 변경 {stats['updated']}, 변경없음 {stats['unchanged']}, "
+              f"삭제 {stats['removed']} | 새 청크 {stats['chunks']}개)")
+
+    elif args.mode in ["research", "update"]:
+        if args.stream:
+            print("Warning: --server 사용 시 --stream 은 지원되지 않아 완료 후 한 번에 출력합니다.", file=sys.stderr)
+        response = request(args.server, "research",
+                           {"query": args.query, "id": args.id, "update": args.mode == "update"})
+        result = response["result"]
+        print(f"\n{'='*80}\n리서치 결과 (ID: {args.id})\n{'='*80}")
+        print(result["findings"])
+        print(f"\n저장 위치: 서버 리서치 히스토리 {args.id}.jsonl (버전 {result['version']})")
+        if response["llm_cache_hit"] is not None:
+            print(f"LLM 캐시: {'적중 (Gemini 호출 생략)' if response['llm_cache_hit'] else '미적중'}")
+        stats = response["retrieval_stats"]
+        print(f"RAG 검색: {RETRIEVAL_LABELS.get(response['retrieval'], response['retrieval'])} "
+              f"(누적 hit {stats['hits']} / near-hit {stats['near_hits']} / miss {stats['misses']})")
+
+    elif args.mode == "diff":
+        from core.agent import print_diff
+
+        response = request(args.server, "diff", {"id": args.id, "old": args.old_ver, "new": args.new_ver,
+                                                 "textual_only": args.textual_only})
+        print_diff(response["diff"])
+
+
+def serve(args) -> None:
+    """Run the resident agent server until interrupted."""
+    from core.agent import MarketingResearchAgent
+    from core.server import AgentServer, DEFAULT_HOST, DEFAULT_PORT
+
+    agent = MarketingResearchAgent()
+    server_config = agent.config.get('server') or {}
+    server = AgentServer.from_config(agent, workers=args.workers)
+    print("모델과 저장소를 불러오는 중...", file=sys.stderr)
+    server.warm_up()
+    server.serve_forever(host=args.host or server_config.get('host', DEFAULT_HOST),
+                         port=args.port or server_config.get('port', DEFAULT_PORT))
+
+
 def validate_args(args) -> bool:
     """Validate CLI arguments based on mode.
 
@@ -61,21 +225,83 @@ def validate_args(args) -> bool:
         if not args.file:
             print("Error: --file is required for list mode", file=sys.stderr)
             return False
+    elif args.mode == "timeline":
+        if not args.id:
+            print("Error: --id is required for timeline mode", file=sys.stderr)
+            return False
+        if args.output and not args.output.endswith((".json", ".csv")):
+            print("Error: --output must end with .json or .csv", file=sys.stderr)
+            return False
+    elif args.mode == "recover":
+        if not args.id:
+            print("Error: --id is required for recover mode", file=sys.stderr)
+            return False
+    elif args.mode == "batch":
+        if not args.file:
+            print("Error: --file is required for batch mode", file=sys.stderr)
+            return False
+    elif args.mode == "search":
+        if not args.query:
+            print("Error: --query is required for search mode", file=sys.stderr)
+            return False
     return True
 
 
 def main():
     parser = argparse.ArgumentParser(description="Marketing Research Agent CLI")
-    parser.add_argument("--mode", choices=["ingest", "research", "update", "diff", "list"], required=True)
+    parser.add_argument("--mode", choices=["ingest", "research", "update", "diff", "list", "batch", "recover",
+                                           "catalog", "search", "reindex", "timeline", "serve"], required=True)
     parser.add_argument("--docs", nargs="+", help="문서 경로 (ingest 모드)")
-    parser.add_argument("--query", help="리서치 질문")
-    parser.add_argument("--id", help="리서치 ID")
+    parser.add_argument("--query", help="리서치 질문 / 검색어 (search 모드)")
+    parser.add_argument("--id", help="리서치 ID (catalog/search 모드에서는 glob 패턴, 예: 'crm_*')")
     parser.add_argument("--old", dest="old_ver", type=int, help="비교 소스 버전 (diff 모드)")
     parser.add_argument("--new", dest="new_ver", type=int, help="비교 대상 버전 (diff 모드)")
-    parser.add_argument("--file", help="리서치 히스토리 JSON 파일 경로 (list 모드)")
+    parser.add_argument("--file", help="리서치 히스토리 파일 경로 (list 모드) / 요청 JSONL 파일 경로 (batch 모드)")
+    parser.add_argument("--stream", action="store_true",
+                        help="생성되는 대로 출력하고 부분 결과를 draft로 저장 (research/update 모드)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="LLM 응답 캐시를 사용하지 않음 (research/update/batch 모드)")
+    parser.add_argument("--concurrency", type=int, help="동시 Gemini 호출 수 (batch 모드, 기본값: config.yaml)")
+    parser.add_argument("--textual-only", action="store_true",
+                        help="의미 분석 없이 텍스트 diff만 출력 (diff 모드, 임베딩 모델 로딩 없음)")
+    parser.add_argument("--since", help="이 시각 이후 버전만 (catalog/search 모드, 예: 2025-01-01)")
+    parser.add_argument("--until", help="이 시각 이전 버전만 (catalog/search 모드, 날짜만 주면 그날 포함)")
+    parser.add_argument("--versions", action="store_true", help="리서치별 요약 대신 버전별로 출력 (catalog 모드)")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="최대 검색 결과 수 (search 모드) / 표시할 큰 변화·섹션 수 (timeline 모드), 기본값: 20")
+    parser.add_argument("--output", help="타임라인 내보내기 파일 (timeline 모드, .json 또는 .csv)")
+    parser.add_argument("--server", help="실행 중인 서버로 요청 (ingest/research/update/diff 모드, 예: http://127.0.0.1:8765)")
+    parser.add_argument("--host", help="바인드 주소 (serve 모드, 기본값: config.yaml)")
+    parser.add_argument("--port", type=int, help="포트 (serve 모드, 기본값: config.yaml)")
+    parser.add_argument("--workers", type=int, help="요청 처리 스레드 수 (serve 모드, 기본값: config.yaml)")
+    parser.add_argument("--profile", action="store_true", help="실행 후 단계별 소요 시간/캐시 통계를 출력 (stderr)")
+    parser.add_argument("--metrics-out", help="측정값 내보내기 파일 (.json 이면 JSON, 그 외는 Prometheus 텍스트 형식)")
 
     args = parser.parse_args()
+    try:
+        run(args)
+    finally:
+        report_metrics(args)
+
+
+def report_metrics(args) -> None:
+    """Print the --profile summary and write --metrics-out, if requested."""
+    if not args.profile and not args.metrics_out:
+        return
+    from core.metrics import METRICS
+
+    if args.profile:
+        print(f"\n{'='*80}\n프로파일 (--mode {args.mode})\n{'='*80}", file=sys.stderr)
+        print(METRICS.summary(), file=sys.stderr)
+    if args.metrics_out:
+        try:
+            METRICS.write(args.metrics_out)
+        except OSError as e:
+            print(f"Error: 측정값을 저장하지 못했습니다: {e}", file=sys.stderr)
+
 
+def run(args) -> None:
+    """Run the selected mode (exits with status 1 on errors)."""
     if not validate_args(args):
         sys.exit(1)
 
@@ -89,8 +315,53 @@ def main():
         except json.JSONDecodeError as e:
             print(f"Error: Invalid JSON file: {e}", file=sys.stderr)
             sys.exit(1)
+        except InvalidResearchIdError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.mode in ["catalog", "search", "reindex"]:
+        try:
+            if args.mode == "catalog":
+                show_catalog(args.id, args.since, args.until, per_version=args.versions)
+            elif args.mode == "search":
+                search_history(args.query, args.id, args.since, args.until, limit=args.limit)
+            else:
+                reindex_history()
+        except sqlite3.Error as e:
+            print(f"Error: 히스토리 인덱스 오류: {e} (--mode reindex 로 다시 만들 수 있습니다)", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.mode == "serve":
+        try:
+            serve(args)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        except OSError as e:
+            print(f"Error: 서버를 시작할 수 없습니다: {e}", file=sys.stderr)
+            sys.exit(1)
         return
 
+    if args.server and args.mode in REMOTE_MODES:
+        try:
+            run_remote(args)
+        except (InvalidResearchIdError, FileNotFoundError, RuntimeError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.mode == "diff" and args.textual_only:
+        try:
+            show_textual_diff(args.id, args.old_ver, args.new_ver)
+        except (InvalidResearchIdError, FileNotFoundError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    from core.agent import MarketingResearchAgent
+
     try:
         agent = MarketingResearchAgent()
     except ValueError as e:
@@ -99,25 +370,76 @@ def main():
     except Exception as e:
         print(f"Error initializing agent: {e}", file=sys.stderr)
         sys.exit(1)
+    if args.no_cache:
+        agent.use_llm_cache = False
 
     try:
         if args.mode == "ingest":
-            agent.ingest_documents(args.docs)
-            print(f"✓ {len(args.docs)}개 문서 추가 완료")
+            stats = agent.ingest_documents(args.docs)
+            print(f"✓ 문서 {len(args.docs)}개 처리 완료 "
+                  f"(추가 {stats['added']}, 변경 {stats['updated']}, 변경없음 {stats['unchanged']}, "
+                  f"삭제 {stats['removed']} | 새 청크 {stats['chunks']}개)")
 
         elif args.mode in ["research", "update"]:
+            draft = load_draft(args.id, agent.research_history_path)
+            if args.stream and draft and draft.get("status") == "interrupted":
+                print(f"Warning: 중단된 draft가 있습니다 ({draft.get('updated', '')}). "
+                      f"보존하려면 먼저 --mode recover --id {args.id} 를 실행하세요. 계속하면 덮어씁니다.",
+                      file=sys.stderr)
+
+            if args.stream:
+                print(f"\n{'='*80}\n리서치 결과 (ID: {args.id})\n{'='*80}")
             result = agent.research(
                 query=args.query,
                 research_id=args.id,
-                update_mode=(args.mode == "update")
+                update_mode=(args.mode == "update"),
+                stream=args.stream,
+                on_text=lambda text: print(text, end='', flush=True)
             )
-            print(f"\n{'='*80}\n리서치 결과 (ID: {args.id})\n{'='*80}")
-            print(result["findings"])
-            print(f"\n저장 위치: ./research_history/{args.id}.json")
+            if args.stream:
+                stats = agent.last_stream_stats
+                ttft = f"{stats['time_to_first_token']:.2f}s" if stats['time_to_first_token'] is not None else "-"
+                print(f"\n\n첫 토큰: {ttft} | 전체: {stats['total_seconds']:.2f}s | {stats['chars']}자")
+            else:
+                print(f"\n{'='*80}\n리서치 결과 (ID: {args.id})\n{'='*80}")
+                print(result["findings"])
+            print(f"\n저장 위치: {agent.research_history_path / args.id}.jsonl")
+            if agent.last_llm_cache_hit is not None:
+                print(f"LLM 캐시: {'적중 (Gemini 호출 생략)' if agent.last_llm_cache_hit else '미적중'}")
+            stats = agent.retrieval_cache.stats
+            print(f"RAG 검색: {RETRIEVAL_LABELS.get(agent.last_retrieval, agent.last_retrieval)} "
+                  f"(누적 hit {stats['hits']} / near-hit {stats['near_hits']} / miss {stats['misses']})")
 
         elif args.mode == "diff":
             agent.show_diff(args.id, args.old_ver, args.new_ver)
 
+        elif args.mode == "timeline":
+            timeline = agent.timeline(args.id)
+            print_timeline(timeline, limit=args.limit)
+            if args.output:
+                if args.output.endswith(".json"):
+                    timeline.write_json(args.output)
+                    written = [args.output]
+                else:
+                    written = timeline.write_csv(args.output)
+                print(f"\n✓ 내보내기 완료: {', '.join(str(p) for p in written)}")
+
+        elif args.mode == "recover":
+            version = agent.recover_draft(args.id)
+            print(f"✓ draft를 버전 {version['version']}로 저장했습니다 ({len(version['findings'])}자)")
+
+        elif args.mode == "batch":
+            from core.batch import BatchRunner, load_batch_file
+
+            records = load_batch_file(args.file)
+            runner = BatchRunner.from_config(agent, concurrency=args.concurrency)
+            results = runner.run(records)
+            failed = [r for r in results if r["status"] != "ok"]
+            print(f"\n✓ {len(results) - len(failed)}/{len(results)}건 완료"
+                  + (f", 실패 {len(failed)}건: {', '.join(r['id'] for r in failed)}" if failed else ""))
+            if failed:
+                sys.exit(1)
+
     except InvalidResearchIdError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -127,9 +449,14 @@ def main():
     except RuntimeError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"Unexpected error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        agent.close()
 
 
 if __name__ == "__main__":
@@ -1,155 +1,677 @@
 # core/agent.py
+# 무거운 의존성(google.genai, langchain_*, torch, numpy)은 실제로 필요한 경로에서만 import 하여
+# list / diff --textual-only 같은 가벼운 모드의 시작 시간을 짧게 유지합니다.
 import sys
-from typing import List, Optional
+import time
+from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
 from pathlib import Path
-from google import genai
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from difflib import unified_diff
 import os
 from dotenv import load_dotenv
-import numpy as np
 import colorama
 
 # Initialize colorama for cross-platform ANSI color support
 colorama.init()
 
+from core.ingest import iter_split_documents, batched, IngestProgress
+from core.manifest import (
+    load_manifest,
+    save_manifest,
+    manifest_key,
+    chunk_ids,
+    is_unchanged,
+    read_generation,
+    bump_generation,
+)
+from core.retrieval_cache import RetrievalCache
+from core.bm25 import BM25Index, reciprocal_rank_fusion
+from core.prompt_budget import PromptBudget, estimate_tokens
+from core.llm_cache import ResponseCache
+from core.history_index import HistoryIndex
+from core.diff_store import SemanticDiffStore
+from core.embeddings import create_embeddings, embedding_identity
+from core.metrics import span, incr, record, timed
 from core.commons import (
     load_config,
     get_research_history_path,
     get_rag_db_path,
-    load_research,
-    save_research,
+    get_embedding_cache_path,
+    get_llm_cache_path,
+    count_research_versions,
+    load_research_version,
+    iter_research_versions,
+    append_research_version,
+    save_draft,
+    load_draft,
+    delete_draft,
 )
 
+if TYPE_CHECKING:
+    import numpy as np
+    from langchain_chroma import Chroma
+    from core.timeline import Timeline
+
 
 class MarketingResearchAgent:
-    def __init__(self, config_path: str = "config.yaml"):
+    @timed("agent.init")
+    def __init__(self, config_path: str = "config.yaml", client=None):
         load_dotenv()
         self.config = load_config(config_path)
 
-        # Gemini client 초기화
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
+        # Gemini client는 첫 호출 시 생성 (테스트/벤치마크용 fake client 주입 가능)
+        self._api_key = os.getenv('GEMINI_API_KEY')
+        if client is None and not self._api_key:
             raise ValueError("GEMINI_API_KEY not found in .env file")
-        self.client = genai.Client(api_key=api_key)
+        self._client = client
         self.model = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash-exp')
 
         self.rag_db_path = get_rag_db_path(self.config)
         self.research_history_path = get_research_history_path(self.config)
         self.research_history_path.mkdir(exist_ok=True)
 
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=self.config['rag']['embedding_model']
-        )
+        # 임베딩 모델과 벡터 스토어는 필요한 모드에서만 지연 로딩
+        self._embeddings = None
+        self._vectorstore = None
+        self._retrieval_cache = None
+        self._bm25_index = None
+        self.last_retrieval = None
+        self.last_stream_stats = None
+        self.last_prompt_budget = None
+
+        # 동일 프롬프트 응답 캐시 (opt-in, --no-cache 로 끌 수 있음)
+        self.use_llm_cache = (self.config.get('llm_cache') or {}).get('enabled', False)
+        self._llm_cache = None
+        self.last_llm_cache_hit = None
+
+        # 전체 리서치 목록/검색용 SQLite 인덱스 (저장 시 갱신)
+        self._history_index = None
+        # 버전별 섹션 임베딩과 semantic diff 결과 저장소
+        self._diff_store = None
+        # 저장 시 섹션 임베딩 사전 계산을 batch/server 의 lock 밖에서 실행하는 백그라운드 worker
+        self._precompute_executor = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            with span("model.load_gemini_client"):
+                from google import genai
+                self._client = genai.Client(api_key=self._api_key)
+        return self._client
+
+    @property
+    def embeddings(self):
+        # 임베딩은 (모델명+백엔드, 텍스트 해시) 기준으로 디스크에 캐시되어 ingest/검색/diff가 공유
+        if self._embeddings is None:
+            from core.embedding_cache import EmbeddingCache, CachedEmbeddings
+
+            rag_config = self.config['rag']
+            with span("model.load_embeddings", backend=rag_config.get('embedding_backend', 'torch')):
+                self._embeddings = CachedEmbeddings(
+                    create_embeddings(rag_config),
+                    EmbeddingCache(
+                        get_embedding_cache_path(self.config),
+                        embedding_identity(rag_config),
+                        max_bytes=int(rag_config.get('embedding_cache_max_mb', 256) * 1024 * 1024)
+                    )
+                )
+        return self._embeddings
+
+    @embeddings.setter
+    def embeddings(self, value):
+        self._embeddings = value
+        self._vectorstore = None
+
+    @property
+    def vectorstore(self) -> "Chroma":
+        """에이전트당 하나의 벡터 스토어 핸들 (rag.vector_store: chroma | flat)"""
+        if self._vectorstore is None:
+            embeddings = self.embeddings
+            if self.config['rag'].get('vector_store', 'chroma') == 'flat':
+                with span("flat_store.open"):
+                    from core.flat_store import FlatVectorStore
+                    self._vectorstore = FlatVectorStore(
+                        persist_directory=str(self.rag_db_path / "flat_store"),
+                        embedding_function=embeddings
+                    )
+            else:
+                with span("chroma.open"):
+                    from langchain_chroma import Chroma
+                    self._vectorstore = Chroma(
+                        persist_directory=str(self.rag_db_path),
+                        embedding_function=embeddings
+                    )
+        return self._vectorstore
+
+    @property
+    def retrieval_cache(self) -> RetrievalCache:
+        if self._retrieval_cache is None:
+            self._retrieval_cache = RetrievalCache(
+                self.rag_db_path,
+                max_entries=self.config['rag'].get('retrieval_cache_size', 256),
+                mode="hybrid" if self.config['rag'].get('hybrid', False) else "dense"
+            )
+        return self._retrieval_cache
+
+    @property
+    def bm25_index(self) -> BM25Index:
+        """청크 ID 기준 BM25 역색인 (ingest 시 증분 갱신)"""
+        if self._bm25_index is None:
+            with span("bm25.load"):
+                self._bm25_index = BM25Index(self.rag_db_path)
+        return self._bm25_index
+
+    @property
+    def llm_cache(self) -> ResponseCache:
+        if self._llm_cache is None:
+            llm_cache_config = self.config.get('llm_cache') or {}
+            self._llm_cache = ResponseCache(
+                get_llm_cache_path(self.config),
+                ttl_seconds=llm_cache_config.get('ttl_hours', 24) * 3600,
+                max_bytes=int(llm_cache_config.get('max_mb', 100) * 1024 * 1024)
+            )
+        return self._llm_cache
+
+    @property
+    def history_index(self) -> HistoryIndex:
+        if self._history_index is None:
+            with span("history_index.open"):
+                self._history_index = HistoryIndex.open(self.research_history_path)
+        return self._history_index
+
+    @property
+    def diff_store(self) -> SemanticDiffStore:
+        if self._diff_store is None:
+            self._diff_store = SemanticDiffStore(self.research_history_path,
+                                                 embedding_identity(self.config['rag']))
+        return self._diff_store
+
+    def flush(self):
+        """변경된 캐시/인덱스를 디스크에 기록 (핸들은 유지)"""
+        cache = getattr(self._embeddings, 'cache', None)
+        if cache is not None:
+            cache.flush()
+        if self._retrieval_cache is not None:
+            self._retrieval_cache.flush()
+        if self._bm25_index is not None:
+            self._bm25_index.flush()
+
+    def close(self):
+        """진행 중인 사전 계산을 기다린 뒤 캐시를 flush 하고 지연 생성된 핸들을 해제"""
+        if self._precompute_executor is not None:
+            self._precompute_executor.shutdown(wait=True)
+            self._precompute_executor = None
+        self.flush()
+        self._retrieval_cache = None
+        self._bm25_index = None
+        if self._history_index is not None:
+            self._history_index.close()
+            self._history_index = None
+        self._vectorstore = None
+        self._embeddings = None
+        if self._client is not None and hasattr(self._client, 'close'):
+            self._client.close()
+        self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
-    def ingest_documents(self, doc_paths: List[str]):
-        """문서를 RAG DB에 추가 (최신 API)"""
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.config['rag']['chunk_size'],
-            chunk_overlap=self.config['rag']['chunk_overlap']
-        )
-        
-        all_chunks = []
-        all_metadatas = []
-        
+    @timed("agent.ingest_documents")
+    def ingest_documents(self, doc_paths: List[str]) -> dict:
+        """문서를 RAG DB에 증분 추가 (변경 없는 파일은 건너뛰고, 변경/삭제된 파일의 청크는 교체/삭제)
+
+        파일 읽기/분할은 프로세스 풀에서 수행되고, 청크는 고정 크기 배치로
+        임베딩되어 완료되는 대로 벡터 스토어에 upsert 됩니다.
+        """
+        rag_config = self.config['rag']
+        settings = {
+            "embedding_model": embedding_identity(rag_config),
+            "chunk_size": rag_config['chunk_size'],
+            "chunk_overlap": rag_config['chunk_overlap'],
+        }
+        if rag_config.get('vector_store', 'chroma') != 'chroma':
+            # 백엔드를 바꾸면 새 스토어가 비어 있으므로 전체 재색인
+            settings["vector_store"] = rag_config['vector_store']
+        manifest = load_manifest(self.rag_db_path, settings)
+        files = manifest["files"]
+        stale = manifest["stale"]
+        if (not files and rag_config.get('vector_store', 'chroma') == 'chroma'
+                and (self.rag_db_path / "chroma.sqlite3").exists()
+                and self.vectorstore.get(limit=1, include=[])["ids"]):
+            # 파일만 있고 비어 있는 DB(서버 warm-up, ingest 전 검색 등으로 생성)는 경고하지 않음
+            print("Warning: RAG DB에 manifest가 없습니다. 기존 벡터는 중복될 수 있으니 "
+                  f"{self.rag_db_path}를 삭제 후 다시 ingest하세요.", file=sys.stderr)
+
+        vectorstore = self.vectorstore
+        bm25 = self.bm25_index
+        if not bm25.exists and files and not stale:
+            # BM25 인덱스 도입 전에 ingest 된 청크는 벡터 스토어에서 한 번 읽어 색인
+            existing = vectorstore.get(include=["documents"])
+            for chunk_id, text in zip(existing["ids"], existing["documents"]):
+                bm25.add(chunk_id, text)
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "chunks": 0}
+
+        if stale:
+            # 청크/임베딩 설정이 바뀌면 이번에 지정하지 않은 문서도 새 설정으로 모두 교체
+            # (일부만 교체하고 manifest를 저장하면 나머지는 이전 설정의 청크로 남음)
+            requested = {manifest_key(path) for path in doc_paths}
+            doc_paths = list(doc_paths) + [
+                entry["source"] if manifest_key(entry["source"]) == key else key
+                for key, entry in files.items()
+                if key not in requested and Path(key).exists()
+            ]
+
+        # 크기/수정 시각이 같은 파일은 읽지 않고 건너뜀
+        pending = []
         for path in doc_paths:
-            with open(path, 'r', encoding='utf-8') as f:
-                text = f.read()
-            chunks = splitter.split_text(text)
-            all_chunks.extend(chunks)
-            all_metadatas.extend([{"source": path}] * len(chunks))
-        
-        # Chroma DB 생성/업데이트 (persist 자동 처리)
-        Chroma.from_texts(
-            texts=all_chunks,
-            embedding=self.embeddings,
-            metadatas=all_metadatas,
-            persist_directory=str(self.rag_db_path)
-        )
+            entry = files.get(manifest_key(path))
+            if entry and not stale and is_unchanged(entry, os.stat(path)):
+                stats["unchanged"] += 1
+            else:
+                pending.append(path)
+
+        def chunk_stream():
+            for doc in iter_split_documents(
+                pending,
+                rag_config['chunk_size'],
+                rag_config['chunk_overlap'],
+                workers=rag_config.get('ingest_workers', min(4, os.cpu_count() or 1))
+            ):
+                key = manifest_key(doc.path)
+                entry = files.get(key)
+                if entry and not stale and entry["sha256"] == doc.sha256:
+                    entry.update(size=doc.size, mtime=doc.mtime)
+                    stats["unchanged"] += 1
+                    continue
+
+                if entry:
+                    old_ids = chunk_ids(key, entry["chunks"])
+                    vectorstore.delete(ids=old_ids)
+                    bm25.remove(old_ids)
+                files[key] = {
+                    "source": doc.path,
+                    "size": doc.size,
+                    "mtime": doc.mtime,
+                    "sha256": doc.sha256,
+                    "chunks": len(doc.chunks),
+                }
+                stats["updated" if entry else "added"] += 1
+                for chunk, chunk_id in zip(doc.chunks, chunk_ids(key, len(doc.chunks))):
+                    yield chunk, {"source": doc.path}, chunk_id
+
+        progress = IngestProgress()
+        for batch in batched(chunk_stream(), rag_config.get('ingest_batch_size', 256)):
+            texts, metadatas, ids = zip(*batch)
+            with span("ingest.upsert_batch", chunks=len(batch)):
+                vectorstore.add_texts(texts=list(texts), metadatas=list(metadatas), ids=list(ids))
+                for chunk_id, text in zip(ids, texts):
+                    bm25.add(chunk_id, text)
+            incr("ingested_chunks", len(batch))
+            progress.update(len(batch))
+        progress.finish()
+        stats["chunks"] = progress.chunks
+
+        # 디스크에서 사라진 문서의 청크 제거
+        for key in [k for k in files if not Path(k).exists()]:
+            old_ids = chunk_ids(key, files.pop(key)["chunks"])
+            vectorstore.delete(ids=old_ids)
+            bm25.remove(old_ids)
+            stats["removed"] += 1
+
+        bm25.flush()
+        save_manifest(manifest, self.rag_db_path)
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            # 검색 결과 캐시 무효화
+            bump_generation(self.rag_db_path)
+        return stats
     
+    @timed("agent.retrieve")
+    def _retrieve_docs(self, query: str) -> List[dict]:
+        """RAG 검색 (같은/유사한 질의는 벡터 스토어가 바뀌기 전까지 캐시 재사용)"""
+        rag_config = self.config['rag']
+        k = rag_config['top_k']
+        threshold = rag_config.get('retrieval_cache_similarity', 0)
+        generation = read_generation(self.rag_db_path)
+        cache = self.retrieval_cache
+
+        docs = cache.get(query, generation, k)
+        if docs is not None:
+            self.last_retrieval = "hit"
+            incr("retrieval_cache_hits")
+            return docs
+
+        embeddings = self.embeddings
+        with span("retrieval.embed_query"):
+            embedding = embeddings.embed_query(query)
+        if threshold:
+            docs = cache.get_similar(embedding, generation, k, threshold)
+            if docs is not None:
+                self.last_retrieval = "near_hit"
+                incr("retrieval_cache_near_hits")
+                return docs
+
+        incr("retrieval_cache_misses")
+        if rag_config.get('hybrid', False) and len(self.bm25_index):
+            docs = self._hybrid_search(query, embedding, k)
+        else:
+            vectorstore = self.vectorstore
+            with span("retrieval.vector_search", k=k) as attrs:
+                results = vectorstore.similarity_search_by_vector(embedding, k=k)
+                attrs["docs"] = len(results)
+            docs = [{"source": doc.metadata['source'], "content": doc.page_content} for doc in results]
+        cache.put(query, generation, k, docs, embedding if threshold else None)
+        self.last_retrieval = "miss"
+        return docs
+
+    def _hybrid_search(self, query: str, embedding: List[float], k: int) -> List[dict]:
+        """벡터 검색과 BM25 검색 결과를 reciprocal-rank fusion으로 합쳐 상위 k개 반환"""
+        rag_config = self.config['rag']
+        candidates = rag_config.get('hybrid_candidates', max(k * 4, 20))
+
+        vectorstore = self.vectorstore
+        bm25 = self.bm25_index
+        docs_by_key = {}
+        dense_keys = []
+        with span("retrieval.vector_search", k=candidates):
+            results = vectorstore.similarity_search_by_vector(embedding, k=candidates)
+        for doc in results:
+            key = (doc.metadata['source'], doc.page_content)
+            docs_by_key[key] = {"source": key[0], "content": key[1]}
+            dense_keys.append(key)
+
+        with span("retrieval.bm25_search", k=candidates) as attrs:
+            sparse_ids = [chunk_id for chunk_id, _ in bm25.search(query, candidates)]
+            attrs["docs"] = len(sparse_ids)
+        sparse_keys = []
+        if sparse_ids:
+            with span("retrieval.fetch_chunks", docs=len(sparse_ids)):
+                found = vectorstore.get(ids=sparse_ids, include=["documents", "metadatas"])
+            by_id = {chunk_id: (metadata['source'], text) for chunk_id, text, metadata
+                     in zip(found["ids"], found["documents"], found["metadatas"])}
+            for chunk_id in sparse_ids:
+                key = by_id.get(chunk_id)
+                if key is None:
+                    continue
+                docs_by_key.setdefault(key, {"source": key[0], "content": key[1]})
+                sparse_keys.append(key)
+
+        fused = reciprocal_rank_fusion([dense_keys, sparse_keys], k=rag_config.get('rrf_k', 60))
+        return [docs_by_key[key] for key, _ in fused[:k]]
+
+    @staticmethod
+    def _format_docs(docs: List[dict]) -> str:
+        return "\n\n".join([f"[출처: {doc['source']}]\n{doc['content']}" for doc in docs])
+
     def _retrieve_context(self, query: str) -> str:
-        """RAG 검색"""
-        vectorstore = Chroma(
-            persist_directory=str(self.rag_db_path),
-            embedding_function=self.embeddings
-        )
-        k = self.config['rag']['top_k']
-        docs = vectorstore.similarity_search(query, k=k)
-        return "\n\n".join([f"[출처: {doc.metadata['source']}]\n{doc.page_content}" for doc in docs])
+        """RAG 검색 결과를 프롬프트용 컨텍스트로 변환"""
+        return self._format_docs(self._retrieve_docs(query))
     
-    def _load_research_version(self, research_id: str) -> Optional[dict]:
-        return load_research(research_id, self.research_history_path, raise_if_missing=False)
-
-    def _save_research_version(self, research_id: str, data: dict):
-        existing = self._load_research_version(research_id) or {"versions": []}
+    def _load_research_version(self, research_id: str, version: Optional[int] = None) -> Optional[dict]:
+        """특정 버전(기본: 최신) 하나만 로드 (없으면 None)"""
+        return load_research_version(research_id, self.research_history_path, version, raise_if_missing=False)
 
+    @timed("agent.save_version")
+    def _save_research_version(self, research_id: str, data: dict) -> dict:
+        """새 버전을 히스토리 끝에 append (전체 파일을 다시 쓰지 않음)"""
         new_version = {
-            "version": len(existing["versions"]) + 1,
             "timestamp": datetime.now().isoformat(),
             "query": data["query"],
             "findings": data["findings"],
             "sources": data.get("sources", []),
             "delta": data.get("delta", "Initial research")
         }
-        existing["versions"].append(new_version)
+        history_config = self.config.get('history') or {}
+        stored = append_research_version(
+            research_id, new_version, self.research_history_path,
+            snapshot_interval=history_config.get('snapshot_interval', 0),
+            compression=history_config.get('compression', 'none')
+        )
+        history_index = self.history_index
+        with span("history_index.add_version"):
+            history_index.add_version(research_id, stored)
+        if history_config.get('precompute_embeddings', True) and 'rag' in self.config:
+            # 이후 어떤 버전과 diff 하더라도 임베딩 없이 배열 연산만 하도록 미리 계산
+            # (임베딩 설정이 없으면 건너뜀, 모델 추론은 백그라운드에서 실행해 저장을 막지 않음)
+            self._schedule_precompute(research_id, stored["version"], new_version["findings"])
+        return stored
+
+    def _schedule_precompute(self, research_id: str, version: int, findings: str) -> None:
+        """섹션 임베딩 사전 계산을 백그라운드 worker 에 넘김 (close() 가 완료를 기다림)"""
+        from concurrent.futures import ThreadPoolExecutor
 
-        save_research(research_id, existing, self.research_history_path)
+        # 지연 생성 핸들은 호출한 스레드(lock 안)에서 만들어 worker 와 동시에 생성되지 않도록 함
+        self.embeddings
+        self.diff_store
+        if self._precompute_executor is None:
+            self._precompute_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompute")
+        self._precompute_executor.submit(self._precompute_version_embeddings, research_id, version, findings)
+
+    def _precompute_version_embeddings(self, research_id: str, version: int, findings: str) -> None:
+        try:
+            with span("history.precompute_embeddings"):
+                self._version_embeddings(research_id, findings)
+        except Exception as e:
+            # 버전은 이미 저장됐으므로 diff 때 다시 계산하면 됨
+            incr("precompute_embedding_errors")
+            print(f"Warning: {research_id} v{version} 임베딩 사전 계산 실패 "
+                  f"(diff 시 다시 계산합니다): {e}", file=sys.stderr)
     
     def _build_prompt(self, template_key: str, **kwargs) -> str:
         template = self.config['prompts'][template_key]
         return template.format(**kwargs)
     
-    def research(self, query: str, research_id: str, update_mode: bool = False) -> dict:
+    @timed("agent.prepare_prompt")
+    def _prepare_research(self, query: str, research_id: str, update_mode: bool = False) -> str:
+        """RAG 검색 + 이전 리서치 로드 후 토큰 예산에 맞춰 프롬프트 생성"""
         # RAG context
-        rag_context = self._retrieve_context(query)
+        docs = self._retrieve_docs(query)
         
         # 이전 리서치 로드
         previous_research = ""
         if update_mode:
-            existing = self._load_research_version(research_id)
-            if existing and existing["versions"]:
-                latest = existing["versions"][-1]
+            latest = self._load_research_version(research_id)
+            if latest:
                 previous_research = latest['findings']
+
+        template_key = 'research_update' if update_mode else 'research_initial'
+        budget_config = self.config.get('budget') or {}
+        if budget_config.get('enabled', False):
+            docs, previous_research = self._fit_prompt_budget(template_key, query, docs, previous_research)
         
         # Prompt 생성
-        if update_mode:
-            prompt = self._build_prompt(
-                'research_update',
-                rag_context=rag_context,
-                query=query,
-                previous_research=previous_research
-            )
-        else:
-            prompt = self._build_prompt(
-                'research_initial',
-                rag_context=rag_context,
-                query=query
-            )
-        
-        # Gemini API 호출
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt
-            )
-            findings = response.text
-        except Exception as e:
-            print(f"Error: Gemini API call failed: {e}", file=sys.stderr)
-            raise RuntimeError(f"Failed to generate research content: {e}") from e
-        
-        # 결과 저장
+        with span("prompt.build") as attrs:
+            rag_context = self._format_docs(docs)
+            if update_mode:
+                prompt = self._build_prompt(
+                    template_key,
+                    rag_context=rag_context,
+                    query=query,
+                    previous_research=previous_research
+                )
+            else:
+                prompt = self._build_prompt(
+                    template_key,
+                    rag_context=rag_context,
+                    query=query
+                )
+            attrs.update(rag_docs=len(docs), prompt_tokens=estimate_tokens(prompt))
+        return prompt
+
+    def _fit_prompt_budget(self, template_key: str, query: str, docs: List[dict], previous_research: str) -> tuple:
+        """이전 리서치와 겹치는 RAG 청크 제거 + 예산 초과 시 문서 축소/이전 리서치 요약, 토큰 수 로그"""
+        budget = PromptBudget.from_config(self.config)
+        template_tokens = estimate_tokens(
+            self._build_prompt(template_key, rag_context="", query="", previous_research="")
+        )
+        before = {
+            "template": template_tokens,
+            "query": estimate_tokens(query),
+            "rag_context": estimate_tokens(self._format_docs(docs)),
+            "previous_research": estimate_tokens(previous_research),
+        }
+
+        if docs and previous_research:
+            previous_chunks = self._chunk_findings(previous_research)
+            embedded = self._embed_texts([doc["content"] for doc in docs] + previous_chunks)
+            docs = budget.dedupe_docs(docs, embedded[:len(docs)], embedded[len(docs):])
+        docs, previous_research = budget.fit(template_tokens, query, docs, previous_research, self._format_docs)
+
+        after = dict(before, rag_context=estimate_tokens(self._format_docs(docs)),
+                     previous_research=estimate_tokens(previous_research))
+        self.last_prompt_budget = {"before": before, "after": after, "rag_docs": len(docs)}
+        print(f"[budget] prompt tokens ~{sum(before.values())} → ~{sum(after.values())} "
+              f"(limit {budget.max_prompt_tokens}) | "
+              + " ".join(f"{key} {before[key]}→{after[key]}" for key in before),
+              file=sys.stderr)
+        return docs, previous_research
+
+    def _record_research(self, query: str, research_id: str, findings: str, update_mode: bool = False) -> dict:
+        """생성 결과를 새 버전으로 저장"""
         result = {
             "query": query,
             "findings": findings,
             "sources": ["Gemini Web Search"],
             "delta": "Updated with new insights" if update_mode else "Initial research"
         }
-        self._save_research_version(research_id, result)
-        
+        stored = self._save_research_version(research_id, result)
+        result["version"] = stored["version"]
         return result
+
+    def _cached_response(self, prompt: str) -> Optional[str]:
+        """캐시가 켜져 있으면 (모델, 프롬프트) 기준 캐시된 응답 반환"""
+        if not self.use_llm_cache:
+            self.last_llm_cache_hit = None
+            return None
+        cached = self.llm_cache.get(self.model, prompt)
+        self.last_llm_cache_hit = cached is not None
+        incr("llm_cache_hits" if cached is not None else "llm_cache_misses")
+        return cached
+
+    def _store_response(self, prompt: str, text: str):
+        if self.use_llm_cache:
+            self.llm_cache.put(self.model, prompt, text)
+
+    def _generate(self, prompt: str) -> str:
+        """Gemini 호출 (응답 캐시 적중 시 호출 생략)"""
+        cached = self._cached_response(prompt)
+        if cached is not None:
+            return cached
+
+        findings = self._call_gemini(prompt)
+        self._store_response(prompt, findings)
+        return findings
+
+    def _call_gemini(self, prompt: str) -> str:
+        """캐시를 거치지 않는 Gemini 호출 (에이전트 상태를 바꾸지 않으므로 여러 스레드에서 동시 호출 가능)"""
+        client = self.client
+        try:
+            with span("gemini.generate", model=self.model, prompt_tokens=estimate_tokens(prompt)) as attrs:
+                response = client.models.generate_content(
+                    model=self.model,
+                    contents=prompt
+                )
+                findings = response.text
+                attrs["response_tokens"] = estimate_tokens(findings)
+            incr("gemini_calls")
+        except Exception as e:
+            incr("gemini_errors")
+            print(f"Error: Gemini API call failed: {e}", file=sys.stderr)
+            raise RuntimeError(f"Failed to generate research content: {e}") from e
+        return findings
+
+    def _generate_streaming(self, prompt: str, query: str, research_id: str,
+                            update_mode: bool = False, on_text=None) -> str:
+        """스트리밍 생성: 텍스트를 도착 즉시 on_text 로 전달하고 부분 결과를 draft 파일에 주기적으로 저장"""
+        interval = (self.config.get('streaming') or {}).get('checkpoint_seconds', 2.0)
+        draft = {
+            "query": query,
+            "update_mode": update_mode,
+            "model": self.model,
+            "status": "streaming",
+            "started": datetime.now().isoformat(),
+            "findings": ""
+        }
+        parts = []
+        start = last_checkpoint = time.perf_counter()
+        first_token = None
+
+        client = self.client
+        incr("gemini_calls")
+        try:
+            for chunk in client.models.generate_content_stream(model=self.model, contents=prompt):
+                text = chunk.text or ""
+                if not text:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(text)
+                if on_text:
+                    on_text(text)
+                if time.perf_counter() - last_checkpoint >= interval:
+                    draft.update(findings="".join(parts), updated=datetime.now().isoformat())
+                    save_draft(research_id, draft, self.research_history_path)
+                    last_checkpoint = time.perf_counter()
+        except (Exception, KeyboardInterrupt) as e:
+            # 중단된 생성 결과는 버리지 않고 draft 로 남김 (--mode recover 로 버전 저장 가능)
+            draft.update(status="interrupted", findings="".join(parts),
+                         updated=datetime.now().isoformat(), error=str(e) or type(e).__name__)
+            path = save_draft(research_id, draft, self.research_history_path)
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            print(f"Error: Gemini API call failed: {e}", file=sys.stderr)
+            raise RuntimeError(f"Failed to generate research content: {e} (partial draft: {path})") from e
+
+        self.last_stream_stats = {
+            "time_to_first_token": first_token,
+            "total_seconds": time.perf_counter() - start,
+            "chars": sum(len(p) for p in parts)
+        }
+        findings = "".join(parts)
+        record("gemini.generate_stream", self.last_stream_stats["total_seconds"], model=self.model,
+               prompt_tokens=estimate_tokens(prompt), response_tokens=estimate_tokens(findings),
+               time_to_first_token=first_token)
+        self._store_response(prompt, findings)
+        return findings
+
+    def recover_draft(self, research_id: str) -> dict:
+        """중단된 스트리밍 draft 를 새 버전으로 저장하고 draft 삭제"""
+        draft = load_draft(research_id, self.research_history_path)
+        if draft is None:
+            raise FileNotFoundError(f"Draft not found: {research_id}")
+        version = self._save_research_version(research_id, {
+            "query": draft["query"],
+            "findings": draft["findings"],
+            "sources": ["Gemini Web Search"],
+            "delta": f"Recovered from interrupted draft ({draft.get('status')}: {draft.get('error', '')})"
+        })
+        delete_draft(research_id, self.research_history_path)
+        return version
+
+    @timed("agent.research")
+    def research(self, query: str, research_id: str, update_mode: bool = False,
+                 stream: bool = False, on_text=None) -> dict:
+        prompt = self._prepare_research(query, research_id, update_mode)
+
+        if stream:
+            findings = self._cached_response(prompt)
+            if findings is not None:
+                self.last_stream_stats = {"time_to_first_token": 0.0, "total_seconds": 0.0, "chars": len(findings)}
+                if on_text:
+                    on_text(findings)
+            else:
+                findings = self._generate_streaming(prompt, query, research_id, update_mode, on_text)
+            result = self._record_research(query, research_id, findings, update_mode)
+            delete_draft(research_id, self.research_history_path)
+            return result
+        
+        # Gemini API 호출
+        findings = self._generate(prompt)
+        
+        # 결과 저장
+        return self._record_research(query, research_id, findings, update_mode)
     
     def _chunk_findings(self, findings: str, chunk_size: int = 500):
         """텍스트를 의미 단위로 분할"""
@@ -161,115 +683,330 @@ class MarketingResearchAgent:
             if len(current_chunk) + len(sent) < chunk_size:
                 current_chunk += sent + "\n"
             else:
-                if current_chunk:
+                if current_chunk.strip():
                     chunks.append(current_chunk.strip())
                 current_chunk = sent + "\n"
         
-        if current_chunk:
+        # 빈 줄뿐인 청크는 버림 (빈 섹션이 diff 에 삭제/추가로 나타나지 않도록)
+        if current_chunk.strip():
             chunks.append(current_chunk.strip())
         
         return chunks
     
+    def _embed_texts(self, texts: List[str]) -> "np.ndarray":
+        """텍스트 목록을 한 번의 배치 호출로 임베딩 (L2 정규화, 빈 텍스트는 0 벡터)"""
+        import numpy as np
+
+        unique = list(dict.fromkeys(t for t in texts if t))
+        if not unique:
+            return np.zeros((len(texts), 0), dtype=np.float32)
+
+        embeddings = self.embeddings
+        with span("diff.embed_chunks", texts=len(unique)):
+            vectors = np.asarray(embeddings.embed_documents(unique), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-8
+
+        rows = {text: i for i, text in enumerate(unique)}
+        embedded = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+        for i, text in enumerate(texts):
+            if text:
+                embedded[i] = vectors[rows[text]]
+        return embedded
+
+    @staticmethod
+    def _paired_distances(emb1: "np.ndarray", emb2: "np.ndarray") -> "np.ndarray":
+        """행 단위 코사인 거리 (0=identical, 2=orthogonal/빈 텍스트)"""
+        import numpy as np
+
+        distances = 1.0 - np.einsum('ij,ij->i', emb1, emb2)
+        empty = ~(emb1.any(axis=1) & emb2.any(axis=1))
+        distances[empty] = 2.0
+        return distances
+
+    def _version_embeddings(self, research_id: str, findings: str) -> "np.ndarray":
+        """한 버전의 [전체, 섹션1, 섹션2, ...] 임베딩 (저장된 것이 없으면 계산 후 저장)"""
+        diff_store = self.diff_store
+        embedded = diff_store.load_embeddings(research_id, findings)
+        if embedded is None:
+            embedded = self._embed_texts([findings] + self._chunk_findings(findings))
+            if embedded.shape[1]:
+                diff_store.save_embeddings(research_id, findings, embedded)
+        return embedded
+
     def _semantic_distance(self, text1: str, text2: str) -> float:
         """두 텍스트 간 임베딩 거리 (0=identical, 2=orthogonal)"""
         if not text1 or not text2:
             return 2.0
-        
-        emb1 = np.array(self.embeddings.embed_query(text1))
-        emb2 = np.array(self.embeddings.embed_query(text2))
-        
-        # Cosine distance = 1 - cosine_similarity
-        similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2) + 1e-8)
-        return 1 - similarity
-    
-    def semantic_diff(self, findings1: str, findings2: str, threshold: float = 0.15) -> dict:
-        """의미론적 변화 분석"""
-        # Overall similarity
-        overall_dist = self._semantic_distance(findings1, findings2)
-        overall_similarity = 1 - overall_dist
-        
-        # Chunk-level comparison
+
+        embedded = self._embed_texts([text1, text2])
+        return float(self._paired_distances(embedded[:1], embedded[1:])[0])
+
+    @staticmethod
+    def _align_chunks(similarity: "np.ndarray", min_similarity: float) -> List[tuple]:
+        """순서를 보존하는 DP 정렬: (유사도 - min_similarity) 합이 최대인 (i, j) 쌍 목록"""
+        import numpy as np
+
+        m, n = similarity.shape
+        gain = similarity - min_similarity
+        score = np.zeros((m + 1, n + 1))
+        for i in range(1, m + 1):
+            for j in range(1, n + 1):
+                score[i, j] = max(score[i - 1, j], score[i, j - 1], score[i - 1, j - 1] + gain[i - 1, j - 1])
+
+        pairs = []
+        i, j = m, n
+        while i > 0 and j > 0:
+            if gain[i - 1, j - 1] > 0 and score[i, j] == score[i - 1, j - 1] + gain[i - 1, j - 1]:
+                pairs.append((i - 1, j - 1))
+                i, j = i - 1, j - 1
+            elif score[i, j] == score[i - 1, j]:
+                i -= 1
+            else:
+                j -= 1
+        return pairs[::-1]
+
+    @timed("agent.semantic_diff")
+    def semantic_diff(self, findings1: str, findings2: str, threshold: float = 0.15,
+                      min_similarity: float = 0.5, embedded1: Optional["np.ndarray"] = None,
+                      embedded2: Optional["np.ndarray"] = None) -> dict:
+        """의미론적 변화 분석 (섹션 정렬 기반)
+
+        1. 텍스트가 완전히 같은 섹션은 임베딩 없이 순서 보존 매칭 (LCS)
+        2. 위치만 바뀐 동일 섹션은 moved 로 처리
+        3. 나머지 섹션만 한 번에 임베딩하고 유사도 행렬을 계산한 뒤,
+           고정된 섹션 사이 구간마다 DP 로 정렬 (min_similarity 미만은 추가/삭제)
+        4. 정렬되지 않은 섹션 중 거의 같은 내용(거리 <= threshold)은 moved 로 처리
+
+        embedded1/embedded2 에 버전별 [전체, 섹션...] 임베딩을 주면 3단계는 임베딩 호출 없이 행 선택만 함
+        """
+        import numpy as np
+        from bisect import bisect_right
+        from difflib import SequenceMatcher
+
         chunks1 = self._chunk_findings(findings1)
         chunks2 = self._chunk_findings(findings2)
-        
+        if findings1 == findings2:
+            return {
+                "overall_similarity": 1.0,
+                "semantic_change_score": 0.0,
+                "changed_sections": [],
+                "total_sections": len(chunks1)
+            }
+
+        # 1. 동일 텍스트 섹션 (임베딩 불필요)
+        anchors = [(a + t, b + t)
+                   for a, b, size in SequenceMatcher(None, chunks1, chunks2, autojunk=False).get_matching_blocks()
+                   for t in range(size)]
+        anchored1 = {i for i, _ in anchors}
+        anchored2 = {j for _, j in anchors}
+        old_left = [i for i in range(len(chunks1)) if i not in anchored1]
+        new_left = [j for j in range(len(chunks2)) if j not in anchored2]
+
+        # 2. 위치만 바뀐 동일 섹션
+        moved = []
+        by_text = {}
+        for i in old_left:
+            by_text.setdefault(chunks1[i], []).append(i)
+        for j in list(new_left):
+            if by_text.get(chunks2[j]):
+                i = by_text[chunks2[j]].pop(0)
+                moved.append((i, j, 0.0))
+                old_left.remove(i)
+                new_left.remove(j)
+
+        # 3. [전체1, 전체2, 남은 청크1..., 남은 청크2...] 를 단일 embed_documents 호출로 처리
+        precomputed = (embedded1 is not None and embedded2 is not None
+                       and len(embedded1) == len(chunks1) + 1 and len(embedded2) == len(chunks2) + 1
+                       and embedded1.shape[1] == embedded2.shape[1])
+        if precomputed:
+            embedded = np.concatenate([embedded1[:1], embedded2[:1],
+                                       embedded1[[i + 1 for i in old_left]],
+                                       embedded2[[j + 1 for j in new_left]]])
+        else:
+            embedded = self._embed_texts(
+                [findings1, findings2] + [chunks1[i] for i in old_left] + [chunks2[j] for j in new_left]
+            )
+        overall_dist = float(self._paired_distances(embedded[0:1], embedded[1:2])[0])
+        overall_similarity = 1 - overall_dist
+        similarity = embedded[2:2 + len(old_left)] @ embedded[2 + len(old_left):].T
+
+        anchor_old = [i for i, _ in anchors]
+        anchor_new = [j for _, j in anchors]
+        gaps = {}
+        for row, i in enumerate(old_left):
+            gaps.setdefault(bisect_right(anchor_old, i), ([], []))[0].append(row)
+        for col, j in enumerate(new_left):
+            gaps.setdefault(bisect_right(anchor_new, j), ([], []))[1].append(col)
+
+        matched = []
+        for rows, cols in gaps.values():
+            if rows and cols:
+                for r, c in self._align_chunks(similarity[np.ix_(rows, cols)], min_similarity):
+                    matched.append((rows[r], cols[c]))
+
+        # 4. 정렬되지 않은 섹션 중 거의 같은 내용은 moved
+        used_rows = {r for r, _ in matched}
+        used_cols = {c for _, c in matched}
+        candidates = sorted(
+            ((similarity[r, c], r, c)
+             for r in range(len(old_left)) if r not in used_rows
+             for c in range(len(new_left)) if c not in used_cols),
+            reverse=True
+        )
+        for sim, r, c in candidates:
+            if 1 - sim > threshold:
+                break
+            if r in used_rows or c in used_cols:
+                continue
+            moved.append((old_left[r], new_left[c], float(1 - sim)))
+            used_rows.add(r)
+            used_cols.add(c)
+
+        def preview(text: str) -> str:
+            return text[:100] + "..." if len(text) > 100 else text
+
         changed_sections = []
-        max_len = max(len(chunks1), len(chunks2))
-        
-        for i in range(max_len):
-            c1 = chunks1[i] if i < len(chunks1) else ""
-            c2 = chunks2[i] if i < len(chunks2) else ""
-            
-            distance = self._semantic_distance(c1, c2)
-            
+        for r, c in matched:
+            distance = float(1 - similarity[r, c])
             if distance > threshold:
-                change_type = "modified"
-                if not c1:
-                    change_type = "added"
-                elif not c2:
-                    change_type = "removed"
-                
                 changed_sections.append({
-                    "section": i + 1,
-                    "type": change_type,
+                    "section": new_left[c] + 1,
+                    "type": "modified",
                     "distance": round(distance, 3),
-                    "old": c1[:100] + "..." if len(c1) > 100 else c1,
-                    "new": c2[:100] + "..." if len(c2) > 100 else c2
+                    "old": preview(chunks1[old_left[r]]),
+                    "new": preview(chunks2[new_left[c]])
                 })
-        
+        for i, j, distance in moved:
+            changed_sections.append({
+                "section": j + 1,
+                "type": "moved",
+                "from_section": i + 1,
+                "distance": round(distance, 3),
+                "old": preview(chunks1[i]),
+                "new": preview(chunks2[j])
+            })
+        for r, i in enumerate(old_left):
+            if r not in used_rows:
+                changed_sections.append({
+                    "section": i + 1, "type": "removed", "distance": 2.0,
+                    "old": preview(chunks1[i]), "new": ""
+                })
+        for c, j in enumerate(new_left):
+            if c not in used_cols:
+                changed_sections.append({
+                    "section": j + 1, "type": "added", "distance": 2.0,
+                    "old": "", "new": preview(chunks2[j])
+                })
+        changed_sections.sort(key=lambda change: (change["section"], change["type"] != "removed"))
+
+        unmatched = (len(old_left) - len(used_rows)) + (len(new_left) - len(used_cols))
         return {
             "overall_similarity": round(overall_similarity, 3),
             "semantic_change_score": round(overall_dist, 3),
             "changed_sections": changed_sections,
-            "total_sections": max_len
+            "total_sections": len(anchors) + len(moved) + len(matched) + unmatched
         }
     
-    def show_diff(self, research_id: str, v1: int, v2: int):
+    @timed("agent.diff_versions")
+    def diff_versions(self, research_id: str, v1: int, v2: int, findings1: str, findings2: str,
+                      threshold: float = 0.15, min_similarity: float = 0.5) -> dict:
+        """저장된 두 버전의 semantic diff (결과는 (id, v1, v2, 임베딩 모델, threshold) 기준으로 저장/재사용)"""
+        diff_store = self.diff_store
+        result = diff_store.load_result(research_id, v1, v2, findings1, findings2, threshold, min_similarity)
+        if result is not None:
+            incr("diff_cache_hits")
+            return result
+        incr("diff_cache_misses")
+
+        embedded1 = self._version_embeddings(research_id, findings1) if findings1 != findings2 else None
+        embedded2 = self._version_embeddings(research_id, findings2) if findings1 != findings2 else None
+        result = self.semantic_diff(findings1, findings2, threshold, min_similarity, embedded1, embedded2)
+        diff_store.save_result(research_id, v1, v2, findings1, findings2, threshold, min_similarity, result)
+        return result
+
+    @timed("agent.timeline")
+    def timeline(self, research_id: str, threshold: Optional[float] = None) -> "Timeline":
+        """전체 버전의 drift 타임라인 (버전을 순서대로 읽으며 배치 단위로 임베딩)"""
+        from core.timeline import build_timeline
+
+        if count_research_versions(research_id, self.research_history_path) == 0:
+            raise FileNotFoundError(f"Research not found: {research_id}")
+        timeline_config = self.config.get('timeline') or {}
+        return build_timeline(
+            research_id,
+            iter_research_versions(research_id, self.research_history_path),
+            embed_texts=self._embed_texts,
+            chunk_text=self._chunk_findings,
+            threshold=threshold if threshold is not None else timeline_config.get('change_threshold', 0.15),
+            batch_texts=timeline_config.get('embed_batch_texts', 512)
+        )
+
+    def compute_diff(self, research_id: str, v1: int, v2: int, textual_only: bool = False) -> Optional[dict]:
+        """두 버전의 findings 와 semantic diff 결과 (버전이 없으면 None, textual_only 면 semantic 생략)"""
+        if count_research_versions(research_id, self.research_history_path) < max(v1, v2):
+            return None
+
+        findings1 = self._load_research_version(research_id, v1)["findings"]
+        findings2 = self._load_research_version(research_id, v2)["findings"]
+        semantic = None if textual_only else self.diff_versions(research_id, v1, v2, findings1, findings2)
+        return {"research_id": research_id, "v1": v1, "v2": v2,
+                "findings1": findings1, "findings2": findings2, "semantic": semantic}
+
+    @timed("agent.show_diff")
+    def show_diff(self, research_id: str, v1: int, v2: int, textual_only: bool = False):
         """두 버전 간 diff 시각화 (textual + semantic)"""
-        data = self._load_research_version(research_id)
-        if not data or len(data["versions"]) < max(v1, v2):
-            print("버전을 찾을 수 없습니다.")
-            return
-        
-        findings1 = data["versions"][v1-1]["findings"]
-        findings2 = data["versions"][v2-1]["findings"]
-        
-        # Semantic Diff
+        print_diff(self.compute_diff(research_id, v1, v2, textual_only))
+
+
+def print_diff(diff: Optional[dict]):
+    """compute_diff 결과 출력 (서버 응답도 같은 형식이라 thin client 에서도 사용)"""
+    if diff is None:
+        print("버전을 찾을 수 없습니다.")
+        return
+    research_id, v1, v2 = diff["research_id"], diff["v1"], diff["v2"]
+    semantic_result = diff["semantic"]
+    if semantic_result is not None:
         print(f"\n{'='*80}\n[Semantic Analysis] {research_id} (v{v1} → v{v2})\n{'='*80}")
-        semantic_result = self.semantic_diff(findings1, findings2)
-        
         print(f"\n전체 유사도: {semantic_result['overall_similarity']:.1%} "
               f"(변화량: {semantic_result['semantic_change_score']:.3f})")
         print(f"총 섹션: {semantic_result['total_sections']} | "
               f"변경됨: {len(semantic_result['changed_sections'])}\n")
-        
+
         if semantic_result['changed_sections']:
             print("변경된 섹션:")
             for change in semantic_result['changed_sections']:
-                color = '\033[92m' if change['type'] == 'added' else '\033[91m' if change['type'] == 'removed' else '\033[93m'
-                print(f"{color}[섹션 {change['section']}] {change['type'].upper()} "
+                color = {'added': '\033[92m', 'removed': '\033[91m', 'moved': '\033[96m'}.get(change['type'], '\033[93m')
+                section = change['section']
+                if change['type'] == 'moved':
+                    section = f"{change['from_section']} → {change['section']}"
+                print(f"{color}[섹션 {section}] {change['type'].upper()} "
                       f"(거리: {change['distance']})\033[0m")
                 if change['old']:
                     print(f"  Old: {change['old']}")
                 if change['new']:
                     print(f"  New: {change['new']}")
                 print()
-        
-        # Textual Diff
-        print(f"\n{'='*80}\n[Textual Diff] {research_id} (v{v1} → v{v2})\n{'='*80}")
-        findings1_lines = findings1.splitlines(keepends=True)
-        findings2_lines = findings2.splitlines(keepends=True)
-        
-        diff = unified_diff(
-            findings1_lines, findings2_lines,
-            fromfile=f"Version {v1}",
-            tofile=f"Version {v2}",
-            lineterm=''
-        )
-        
-        for line in diff:
-            if line.startswith('+') and not line.startswith('+++'):
-                print(f"\033[92m{line}\033[0m")
-            elif line.startswith('-') and not line.startswith('---'):
-                print(f"\033[91m{line}\033[0m")
-            else:
-                print(line)
+
+    print_textual_diff(research_id, diff["findings1"], diff["findings2"], v1, v2)
+
+
+def print_textual_diff(research_id: str, findings1: str, findings2: str, v1: int, v2: int):
+    """두 버전 간 textual diff 출력 (임베딩 불필요)"""
+    print(f"\n{'='*80}\n[Textual Diff] {research_id} (v{v1} → v{v2})\n{'='*80}")
+    findings1_lines = findings1.splitlines(keepends=True)
+    findings2_lines = findings2.splitlines(keepends=True)
+    
+    diff = unified_diff(
+        findings1_lines, findings2_lines,
+        fromfile=f"Version {v1}",
+        tofile=f"Version {v2}",
+        lineterm=''
+    )
+    
+    for line in diff:
+        if line.startswith('+') and not line.startswith('+++'):
+            print(f"\033[92m{line}\033[0m")
+        elif line.startswith('-') and not line.startswith('---'):
+            print(f"\033[91m{line}\033[0m")
+        else:
+            print(line)
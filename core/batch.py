@@ -0,0 +1,196 @@
+"""Batch research: local retrieval + concurrent, rate-limited Gemini generation.
+
+Records are read from a JSONL file of ``{"id", "query", "update"}`` objects.
+Records sharing a research ID run in file order (an update must see the
+version saved before it); different IDs run concurrently. Each result is
+saved to its history file as soon as its generation completes. Local work
+(retrieval, embedding, saving) is not thread-safe and runs one record at a
+time; only Gemini calls overlap.
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List
+
+from core.commons import validate_research_id
+from core.metrics import incr, record
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def load_batch_file(path: str) -> List[dict]:
+    """Load and validate batch records from a JSONL file.
+
+    Args:
+        path: Path to JSONL file with one {"id", "query", "update"} object per line
+
+    Returns:
+        List of records with "id", "query" and boolean "update"
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If a line is not valid JSON or misses required fields
+        InvalidResearchIdError: If a record has an invalid research ID
+    """
+    filepath = Path(path)
+    if not filepath.exists():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    records = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON: {e}") from e
+            if not item.get("id") or not item.get("query"):
+                raise ValueError(f"{path}:{lineno}: 'id' and 'query' are required")
+            validate_research_id(item["id"])
+            records.append({"id": item["id"], "query": item["query"], "update": bool(item.get("update"))})
+    return records
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter (``rate`` tokens/second, ``capacity`` burst)."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """True for rate-limit, server-side and network errors worth retrying."""
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    return code in TRANSIENT_STATUS_CODES
+
+
+class BatchRunner:
+    """Runs batch records through an agent with bounded concurrency and retries."""
+
+    def __init__(self, agent, concurrency: int = 8, requests_per_minute: float = 60,
+                 max_retries: int = 5, backoff_base: float = 1.0, stream=sys.stdout):
+        self.agent = agent
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.stream = stream
+
+    @classmethod
+    def from_config(cls, agent, **overrides) -> "BatchRunner":
+        options = dict(agent.config.get('batch') or {})
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(
+            agent,
+            concurrency=options.get('concurrency', 8),
+            requests_per_minute=options.get('requests_per_minute', 60),
+            max_retries=options.get('max_retries', 5),
+            backoff_base=options.get('backoff_base_seconds', 1.0),
+        )
+
+    async def _generate(self, prompt: str) -> str:
+        client = self.agent.client
+        aio = getattr(client, 'aio', None)
+        if aio is not None:
+            response = await aio.models.generate_content(model=self.agent.model, contents=prompt)
+        else:
+            response = await asyncio.to_thread(
+                client.models.generate_content, model=self.agent.model, contents=prompt
+            )
+        return response.text
+
+    async def _generate_with_retry(self, prompt: str) -> tuple:
+        """Return (text, attempts); raise the last error once retries are exhausted."""
+        cached = self.agent._cached_response(prompt)
+        if cached is not None:
+            return cached, 0
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    # 동시에 실행되는 코루틴끼리 span 스택을 공유하지 않도록 측정값만 기록
+                    start = time.perf_counter()
+                    text = await self._generate(prompt)
+                    record("gemini.generate", time.perf_counter() - start, model=self.agent.model, attempt=attempt + 1)
+                incr("gemini_calls")
+                self.agent._store_response(prompt, text)
+                return text, attempt + 1
+            except Exception as e:
+                incr("gemini_errors")
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                incr("gemini_retries")
+                delay = self.backoff_base * 2 ** attempt + random.uniform(0, self.backoff_base)
+                print(f"  retry {attempt + 1}/{self.max_retries} in {delay:.1f}s: {e}",
+                      file=sys.stderr)
+                await asyncio.sleep(delay)
+
+    async def _run_id(self, records: List[dict], results: list) -> None:
+        for item in records:
+            start = time.perf_counter()
+            outcome = {"id": item["id"], "query": item["query"], "update": item["update"]}
+            try:
+                # 로컬 검색/임베딩/저장은 스레드 안전성을 위해 한 번에 하나씩 실행
+                # (저장도 임베딩 캐시와 diff 저장소를 사용)
+                async with self._local_lock:
+                    prompt = await asyncio.to_thread(
+                        self.agent._prepare_research, item["query"], item["id"], item["update"]
+                    )
+                findings, attempts = await self._generate_with_retry(prompt)
+                async with self._local_lock:
+                    await asyncio.to_thread(
+                        self.agent._record_research, item["query"], item["id"], findings, item["update"]
+                    )
+                outcome.update(status="ok", attempts=attempts, cache_hit=attempts == 0)
+            except Exception as e:
+                outcome.update(status="failed", error=str(e))
+
+            outcome["seconds"] = round(time.perf_counter() - start, 3)
+            results.append(outcome)
+            mark = "✓" if outcome["status"] == "ok" else "✗"
+            detail = outcome["error"] if outcome["status"] != "ok" else \
+                "cache hit" if outcome["cache_hit"] else f"{outcome['seconds']:.1f}s"
+            print(f"[{len(results)}/{self._total}] {mark} {item['id']} "
+                  f"({'update' if item['update'] else 'research'}) {detail}", file=self.stream, flush=True)
+
+    async def run_async(self, records: List[dict]) -> List[dict]:
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(self.requests_per_minute / 60.0, capacity=self.concurrency)
+        self._local_lock = asyncio.Lock()
+        self._total = len(records)
+
+        by_id = OrderedDict()
+        for item in records:
+            by_id.setdefault(item["id"], []).append(item)
+
+        results = []
+        await asyncio.gather(*(self._run_id(group, results) for group in by_id.values()))
+        return results
+
+    def run(self, records: List[dict]) -> List[dict]:
+        """Run all records and return per-record outcomes in completion order."""
+        return asyncio.run(self.run_async(records))
@@ -0,0 +1,125 @@
+"""Local BM25 inverted index over RAG chunks, plus reciprocal-rank fusion.
+
+The index is keyed by the same stable chunk IDs as the vector store, so
+ingestion can add and remove a document's chunks incrementally. Only the
+per-chunk term frequencies are persisted (``bm25_index.json`` next to the
+vector store); postings and document lengths are rebuilt on load. Chunk
+text itself stays in the vector store.
+
+Tokenization is dependency-free: Latin words and numbers are lowercased
+whole tokens, and Hangul runs yield the run plus its character bigrams so
+that names followed by particles ("HubSpot의", "점유율은") still match.
+"""
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+INDEX_FILENAME = "bm25_index.json"
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[.\-][a-z0-9]+)*|[가-힣]+')
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for match in TOKEN_PATTERN.findall(text.lower()):
+        if '가' <= match[0] <= '힣':
+            tokens.append(match)
+            tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        else:
+            tokens.append(match)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[Hashable]], k: int = 60) -> List[Tuple[Hashable, float]]:
+    """Fuse ranked key lists: score(d) = sum of 1 / (k + rank) over the lists (rank from 1)."""
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """Incrementally updatable Okapi BM25 index of chunk IDs."""
+
+    def __init__(self, rag_db_path: Path, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(rag_db_path) / INDEX_FILENAME
+        self.k1 = k1
+        self.b = b
+        self.docs: Dict[str, Dict[str, int]] = {}        # chunk id -> term frequencies
+        self.lengths: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}    # term -> {chunk id: tf}
+        self.total_length = 0
+        self._dirty = False
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for chunk_id, tf in json.load(f)["docs"].items():
+                    self._index(chunk_id, tf)
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _index(self, chunk_id: str, tf: Dict[str, int]) -> None:
+        self.docs[chunk_id] = tf
+        length = sum(tf.values())
+        self.lengths[chunk_id] = length
+        self.total_length += length
+        for term, count in tf.items():
+            self.postings.setdefault(term, {})[chunk_id] = count
+
+    def add(self, chunk_id: str, text: str) -> None:
+        """Index (or re-index) one chunk."""
+        if chunk_id in self.docs:
+            self.remove([chunk_id])
+        self._index(chunk_id, dict(Counter(tokenize(text))))
+        self._dirty = True
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        for chunk_id in chunk_ids:
+            tf = self.docs.pop(chunk_id, None)
+            if tf is None:
+                continue
+            self.total_length -= self.lengths.pop(chunk_id)
+            for term in tf:
+                postings = self.postings[term]
+                del postings[chunk_id]
+                if not postings:
+                    del self.postings[term]
+            self._dirty = True
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top-``k`` (chunk id, score) pairs for ``query``, best first."""
+        n = len(self.docs)
+        if not n:
+            return []
+        average_length = self.total_length / n
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / average_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def flush(self) -> None:
+        """Atomically persist the index if it changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"docs": self.docs}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -1,11 +1,37 @@
 # core/commons.py
 """Shared configuration and utility functions."""
+import itertools
 import json
+import os
 import re
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 import yaml
 
+from core.delta import encode_findings, decode_findings, decoded, is_delta
+from core.metrics import METRICS, timed
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Research history is stored append-only: {id}.jsonl holds one JSON record per
+# version and {id}.idx holds one little-endian uint64 byte offset per version.
+# Writers (append, full rewrite, legacy migration, torn-write repair) hold an
+# exclusive per-ID lock on {id}.lock; readers never lock.
+OFFSET_SIZE = 8
+LOCK_POLL_SECONDS = 0.05
+
+_held_locks = threading.local()
+
 
 class InvalidResearchIdError(ValueError):
     """Raised when a research ID contains invalid characters."""
@@ -34,6 +60,7 @@ def validate_research_id(research_id: str) -> str:
     return research_id
 
 
+@timed("commons.load_config")
 def load_config(config_path: str = "config.yaml") -> dict:
     """Load configuration from YAML file.
 
@@ -76,8 +103,218 @@ def get_rag_db_path(config: dict) -> Path:
     return get_path(config, "rag_db", "./chroma_db")
 
 
+def get_embedding_cache_path(config: dict) -> Path:
+    """Get embedding cache path from config."""
+    return get_path(config, "embedding_cache", "./embedding_cache")
+
+
+def get_llm_cache_path(config: dict) -> Path:
+    """Get LLM response cache path from config."""
+    return get_path(config, "llm_cache", "./llm_cache")
+
+
+def _try_lock(f, shared: bool = False) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        else:
+            # msvcrt has no shared locks; readers take the exclusive lock too
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(lock_path: Path, shared: bool = False, timeout: Optional[float] = None,
+              metric: str = "file", **attrs):
+    """Hold an exclusive (or shared) lock on ``lock_path``, re-entrant within a thread.
+
+    Works across processes (flock, or msvcrt byte-range locks on Windows) and
+    across threads of one process. Time spent waiting is recorded as the
+    ``<metric>.lock_wait`` span and contended acquisitions as the
+    ``<metric>_lock_contended`` counter. A thread that already holds the lock
+    in either mode re-enters without waiting.
+
+    Raises:
+        TimeoutError: If the lock is not acquired within ``timeout`` seconds
+    """
+    held = getattr(_held_locks, "paths", None)
+    if held is None:
+        held = _held_locks.paths = set()
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    key = str(lock_path.resolve())
+    if key in held:
+        yield
+        return
+
+    f = open(lock_path, 'a+b')
+    try:
+        start = time.perf_counter()
+        if not _try_lock(f, shared):
+            METRICS.incr(f"{metric}_lock_contended")
+            if fcntl is not None and timeout is None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                while not _try_lock(f, shared):
+                    if timeout is not None and time.perf_counter() - start > timeout:
+                        raise TimeoutError(f"Timed out waiting for the lock on '{lock_path}'")
+                    time.sleep(LOCK_POLL_SECONDS)
+        METRICS.record(f"{metric}.lock_wait", time.perf_counter() - start, **attrs)
+        held.add(key)
+        try:
+            yield
+        finally:
+            held.discard(key)
+            _unlock(f)
+    finally:
+        f.close()
+
+
+def history_lock(research_id: str, research_history_path: Path, timeout: Optional[float] = None):
+    """Hold the exclusive per-ID write lock (re-entrant within a thread).
+
+    See ``file_lock``; waits are recorded as the ``history.lock_wait`` span
+    and contended acquisitions as the ``history_lock_contended`` counter.
+
+    Raises:
+        TimeoutError: If the lock is not acquired within ``timeout`` seconds
+    """
+    return file_lock(research_history_path / f"{research_id}.lock", timeout=timeout,
+                     metric="history", research_id=research_id)
+
+
+def _history_files(research_id: str, research_history_path: Path) -> tuple:
+    """Return (records, index, legacy JSON) paths for a research ID."""
+    return (
+        research_history_path / f"{research_id}.jsonl",
+        research_history_path / f"{research_id}.idx",
+        research_history_path / f"{research_id}.json",
+    )
+
+
+def _fsync_write(filepath: Path, mode: str, data: bytes) -> None:
+    with open(filepath, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _atomic_write(filepath: Path, data: bytes) -> None:
+    """Write to a unique temp file in the same directory, fsync, then rename over filepath."""
+    fd, tmp_name = tempfile.mkstemp(dir=filepath.parent, prefix=filepath.name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filepath)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _rebuild_index(records_path: Path, index_path: Path) -> None:
+    """Rebuild the offset index from the records file, dropping a torn final line."""
+    offsets = []
+    end = 0
+    with open(records_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                json.loads(line)
+            except json.JSONDecodeError:
+                break
+            offsets.append(end)
+            end += len(line)
+    if records_path.stat().st_size != end:
+        with open(records_path, 'r+b') as f:
+            f.truncate(end)
+    _atomic_write(index_path, struct.pack(f'<{len(offsets)}Q', *offsets))
+
+
+def _ensure_history(research_id: str, research_history_path: Path) -> bool:
+    """Migrate a legacy JSON history and repair the index if needed.
+
+    Returns:
+        True if an append-only history exists for research_id
+    """
+    records_path, index_path, legacy_path = _history_files(research_id, research_history_path)
+    if not records_path.exists():
+        if not legacy_path.exists():
+            return False
+        with history_lock(research_id, research_history_path):
+            # 다른 프로세스가 먼저 변환했을 수 있음
+            if not records_path.exists():
+                with open(legacy_path, 'r', encoding='utf-8') as f:
+                    save_research(research_id, json.load(f), research_history_path)
+                os.replace(legacy_path, legacy_path.with_suffix('.json.bak'))
+        return True
+
+    if _history_consistent(records_path, index_path):
+        return True
+    # 다른 writer가 append 중일 수 있으므로 lock을 잡은 뒤 다시 확인하고 재구성
+    with history_lock(research_id, research_history_path):
+        if not _history_consistent(records_path, index_path):
+            _rebuild_index(records_path, index_path)
+    return True
+
+
+def _history_consistent(records_path: Path, index_path: Path) -> bool:
+    """True if the index's last record ends exactly at the end of the records file."""
+    size = records_path.stat().st_size
+    count = index_path.stat().st_size // OFFSET_SIZE if index_path.exists() else -1
+    if count == 0 and size == 0:
+        return True
+    if count > 0:
+        with open(index_path, 'rb') as f:
+            f.seek((count - 1) * OFFSET_SIZE)
+            (last_offset,) = struct.unpack('<Q', f.read(OFFSET_SIZE))
+        with open(records_path, 'rb') as f:
+            f.seek(last_offset)
+            f.readline()
+            if f.tell() == size:
+                return True
+    return False
+
+
+def _read_record(records_path: Path, index_path: Path, version: int) -> dict:
+    """Read one raw (possibly delta-encoded) record via the offset index."""
+    with open(index_path, 'rb') as f:
+        f.seek((version - 1) * OFFSET_SIZE)
+        (offset,) = struct.unpack('<Q', f.read(OFFSET_SIZE))
+    with open(records_path, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+
+@timed("commons.count_research_versions")
+def count_research_versions(research_id: str, research_history_path: Path) -> int:
+    """Return the number of saved versions (0 if the research does not exist).
+
+    Raises:
+        InvalidResearchIdError: If research_id contains invalid characters
+    """
+    validate_research_id(research_id)
+    if not _ensure_history(research_id, research_history_path):
+        return 0
+    _, index_path, _ = _history_files(research_id, research_history_path)
+    return index_path.stat().st_size // OFFSET_SIZE
+
+
+@timed("commons.load_research")
 def load_research(research_id: str, research_history_path: Path, raise_if_missing: bool = True) -> Optional[dict]:
-    """Load research data from JSON file.
+    """Load the full research history.
 
     Args:
         research_id: Research ID
@@ -93,17 +330,124 @@ def load_research(research_id: str, research_history_path: Path, raise_if_missin
         InvalidResearchIdError: If research_id contains invalid characters
     """
     validate_research_id(research_id)
-    filepath = research_history_path / f"{research_id}.json"
-    if not filepath.exists():
+    if not _ensure_history(research_id, research_history_path):
         if raise_if_missing:
             raise FileNotFoundError(f"Research not found: {research_id}")
         return None
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return {"versions": list(iter_research_versions(research_id, research_history_path))}
+
+
+def iter_research_versions(research_id: str, research_history_path: Path) -> Iterator[dict]:
+    """Yield decoded versions in order, holding only one version in memory at a time.
+
+    Raises:
+        InvalidResearchIdError: If research_id contains invalid characters
+    """
+    count = count_research_versions(research_id, research_history_path)
+    if count == 0:
+        return
+    records_path, _, _ = _history_files(research_id, research_history_path)
+    previous = None
+    with open(records_path, 'r', encoding='utf-8') as f:
+        for line in itertools.islice(f, count):
+            record = json.loads(line)
+            previous = decode_findings(record, previous)
+            yield decoded(record, previous)
+
+
+@timed("commons.load_research_version")
+def load_research_version(research_id: str, research_history_path: Path,
+                          version: Optional[int] = None, raise_if_missing: bool = True) -> Optional[dict]:
+    """Load a single version without parsing the rest of the history.
+
+    Args:
+        research_id: Research ID
+        research_history_path: Path to research history directory
+        version: Version number (1-based), or None for the latest version
+        raise_if_missing: If True, raise when the research or version is not found.
+                          If False, return None instead.
 
+    Returns:
+        Version dictionary, or None if not found and raise_if_missing=False
 
+    Raises:
+        FileNotFoundError: If research file does not exist and raise_if_missing=True
+        ValueError: If the version does not exist and raise_if_missing=True
+        InvalidResearchIdError: If research_id contains invalid characters
+    """
+    count = count_research_versions(research_id, research_history_path)
+    if count == 0:
+        if raise_if_missing:
+            raise FileNotFoundError(f"Research not found: {research_id}")
+        return None
+    if version is None:
+        version = count
+    if version < 1 or version > count:
+        if raise_if_missing:
+            raise ValueError(f"Version {version} not found. Available: 1-{count}")
+        return None
+
+    records_path, index_path, _ = _history_files(research_id, research_history_path)
+    # delta 레코드는 가장 가까운 snapshot까지 거슬러 올라가 순서대로 적용 (snapshot 간격으로 제한)
+    chain = [_read_record(records_path, index_path, version)]
+    while is_delta(chain[-1]):
+        chain.append(_read_record(records_path, index_path, chain[-1]["version"] - 1))
+    findings = None
+    for record in reversed(chain):
+        findings = decode_findings(record, findings)
+    return decoded(chain[0], findings)
+
+
+@timed("commons.append_research_version")
+def append_research_version(research_id: str, version_data: dict, research_history_path: Path,
+                            snapshot_interval: int = 0, compression: str = "none") -> dict:
+    """Append one version as a single fsync'd JSONL record and index entry.
+
+    The version number is assigned here (previous count + 1).
+
+    Args:
+        research_id: Research ID
+        version_data: Version fields (query, findings, ...) without "version"
+        research_history_path: Path to research history directory
+        snapshot_interval: If > 1, store a full snapshot every N versions and
+                           line-level deltas against the previous version in between
+        compression: "none", "zlib" or "zstd" for the stored findings
+
+    Returns:
+        The stored version dictionary (with full findings)
+
+    Raises:
+        InvalidResearchIdError: If research_id contains invalid characters
+    """
+    validate_research_id(research_id)
+    research_history_path.mkdir(exist_ok=True)
+    records_path, index_path, _ = _history_files(research_id, research_history_path)
+    # 버전 번호 할당, delta 기준 버전 읽기, 두 파일 append 를 하나의 임계 구역으로 처리
+    with history_lock(research_id, research_history_path):
+        count = count_research_versions(research_id, research_history_path)
+
+        version = count + 1
+        previous = None
+        if snapshot_interval > 1 and (version - 1) % snapshot_interval != 0:
+            previous = load_research_version(research_id, research_history_path, count)["findings"]
+        encoded = encode_findings(version_data["findings"], previous, compression)
+
+        stored = {"version": version}
+        for key, value in version_data.items():
+            if key == "findings":
+                stored.update(encoded)
+            else:
+                stored[key] = value
+        line = (json.dumps(stored, ensure_ascii=False) + '\n').encode('utf-8')
+        offset = records_path.stat().st_size if records_path.exists() else 0
+        _fsync_write(records_path, 'ab', line)
+        _fsync_write(index_path, 'ab', struct.pack('<Q', offset))
+    return {"version": version, **version_data}
+
+
+@timed("commons.save_research")
 def save_research(research_id: str, data: dict, research_history_path: Path) -> None:
-    """Save research data to JSON file.
+    """Rewrite the whole research history atomically.
 
     Args:
         research_id: Research ID
@@ -115,6 +459,70 @@ def save_research(research_id: str, data: dict, research_history_path: Path) ->
     """
     validate_research_id(research_id)
     research_history_path.mkdir(exist_ok=True)
-    filepath = research_history_path / f"{research_id}.json"
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    records_path, index_path, _ = _history_files(research_id, research_history_path)
+
+    offsets = []
+    chunks = []
+    end = 0
+    for version in data.get("versions", []):
+        line = (json.dumps(version, ensure_ascii=False) + '\n').encode('utf-8')
+        offsets.append(end)
+        chunks.append(line)
+        end += len(line)
+
+    with history_lock(research_id, research_history_path):
+        for filepath, payload in ((records_path, b''.join(chunks)),
+                                  (index_path, struct.pack(f'<{len(offsets)}Q', *offsets))):
+            _atomic_write(filepath, payload)
+
+
+def _draft_path(research_id: str, research_history_path: Path) -> Path:
+    return research_history_path / f"{research_id}.draft.json"
+
+
+@timed("commons.save_draft")
+def save_draft(research_id: str, draft: dict, research_history_path: Path) -> Path:
+    """Atomically checkpoint a partially generated research draft.
+
+    Args:
+        research_id: Research ID
+        draft: Draft dictionary (query, findings so far, status, ...)
+        research_history_path: Path to research history directory
+
+    Returns:
+        Path to the draft file
+
+    Raises:
+        InvalidResearchIdError: If research_id contains invalid characters
+    """
+    validate_research_id(research_id)
+    research_history_path.mkdir(exist_ok=True)
+    filepath = _draft_path(research_id, research_history_path)
+    _atomic_write(filepath, json.dumps(draft, ensure_ascii=False, indent=2).encode('utf-8'))
+    return filepath
+
+
+@timed("commons.load_draft")
+def load_draft(research_id: str, research_history_path: Path) -> Optional[dict]:
+    """Load the draft for a research ID, or None if there is none.
+
+    Raises:
+        InvalidResearchIdError: If research_id contains invalid characters
+    """
+    validate_research_id(research_id)
+    filepath = _draft_path(research_id, research_history_path)
+    if not filepath.exists():
+        return None
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@timed("commons.delete_draft")
+def delete_draft(research_id: str, research_history_path: Path) -> None:
+    """Remove the draft for a research ID if it exists.
+
+    Raises:
+        InvalidResearchIdError: If research_id contains invalid characters
+    """
+    validate_research_id(research_id)
+    _draft_path(research_id, research_history_path).unlink(missing_ok=True)
@@ -0,0 +1,123 @@
+"""Delta/compression codec for research findings in the history store.
+
+Intermediate versions can be stored as line-level deltas against the previous
+version (computed with difflib's SequenceMatcher, the same machinery behind
+``unified_diff``), with periodic full snapshots so that reconstructing any
+version replays at most ``snapshot_interval - 1`` deltas.
+
+Encoded records replace ``findings`` with:
+    findings_encoding: "snapshot" | "delta"
+    compression:       "none" | "zlib" | "zstd"
+    findings_payload:  text (snapshot) or JSON ops (delta), base64 if compressed
+"""
+import base64
+import json
+import zlib
+from difflib import SequenceMatcher
+from typing import List, Optional, Union
+
+COMPRESSIONS = ("none", "zlib", "zstd")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ValueError("zstd compression requires the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+
+def compress(data: bytes, compression: str) -> str:
+    """Compress bytes and return ASCII-safe text (base64 unless compression is 'none')."""
+    if compression == "none":
+        return data.decode('utf-8')
+    if compression == "zlib":
+        packed = zlib.compress(data, 9)
+    elif compression == "zstd":
+        packed = _zstd().ZstdCompressor(level=10).compress(data)
+    else:
+        raise ValueError(f"Unknown compression: {compression}. Use one of {', '.join(COMPRESSIONS)}")
+    return base64.b64encode(packed).decode('ascii')
+
+
+def decompress(payload: str, compression: str) -> bytes:
+    """Inverse of ``compress``."""
+    if compression == "none":
+        return payload.encode('utf-8')
+    packed = base64.b64decode(payload)
+    if compression == "zlib":
+        return zlib.decompress(packed)
+    if compression == "zstd":
+        return _zstd().ZstdDecompressor().decompress(packed)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def make_delta(old: str, new: str) -> List[Union[list, str]]:
+    """Line-level delta: [start, end] copies old lines, a string inserts new text."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old: str, ops: List[Union[list, str]]) -> str:
+    """Rebuild the new text from the old text and a delta from ``make_delta``."""
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(''.join(old_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def is_delta(record: dict) -> bool:
+    return record.get("findings_encoding") == "delta"
+
+
+def encode_findings(findings: str, previous: Optional[str], compression: str = "none") -> dict:
+    """Encode findings as a delta against ``previous`` (or a snapshot when None).
+
+    Falls back to a snapshot when the delta would not be smaller. Plain
+    uncompressed snapshots keep the original ``findings`` field.
+    """
+    snapshot = {"findings": findings} if compression == "none" else {
+        "findings_encoding": "snapshot",
+        "compression": compression,
+        "findings_payload": compress(findings.encode('utf-8'), compression),
+    }
+    if previous is None:
+        return snapshot
+
+    ops = json.dumps(make_delta(previous, findings), ensure_ascii=False)
+    delta = {
+        "findings_encoding": "delta",
+        "compression": compression,
+        "findings_payload": compress(ops.encode('utf-8'), compression),
+    }
+    snapshot_size = len(snapshot.get("findings_payload", findings))
+    return delta if len(delta["findings_payload"]) < snapshot_size else snapshot
+
+
+def decode_findings(record: dict, previous: Optional[str] = None) -> str:
+    """Return the full findings text of a record (``previous`` is required for deltas)."""
+    encoding = record.get("findings_encoding")
+    if encoding is None:
+        return record["findings"]
+    data = decompress(record["findings_payload"], record.get("compression", "none"))
+    if encoding == "snapshot":
+        return data.decode('utf-8')
+    if previous is None:
+        raise ValueError(f"Version {record.get('version')} is a delta but no base text was given")
+    return apply_delta(previous, json.loads(data))
+
+
+def decoded(record: dict, findings: str) -> dict:
+    """Return a copy of ``record`` in the plain format with ``findings`` restored."""
+    plain = {}
+    for key, value in record.items():
+        if key == "findings_encoding":
+            plain["findings"] = findings
+        elif key not in ("compression", "findings_payload"):
+            plain[key] = value
+    return plain
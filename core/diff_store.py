@@ -0,0 +1,104 @@
+"""Persisted semantic-diff inputs and results next to the research history.
+
+Saved versions never change, so ``semantic_diff`` results can be reused:
+
+- ``semantic/<model>/<id>/<sha>.npy``: L2-normalized embeddings of one
+  version's findings, row 0 for the whole text and one row per section,
+  keyed by the SHA-1 of the findings (written when the version is saved)
+- ``semantic/<model>/<id>/diff-v<v1>-v<v2>-t<threshold>-m<min_similarity>.json``:
+  a ``semantic_diff`` result plus the findings hashes it was computed from
+
+``<model>`` is the embedding identity (model name + backend), so changing
+the embedding model never returns vectors or results from another model.
+The findings hashes guard against a research ID being deleted and reused,
+and ``RESULT_FORMAT`` is bumped whenever ``semantic_diff`` output changes so
+stale memoized results are recomputed.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SEMANTIC_DIRNAME = "semantic"
+RESULT_FORMAT = 2
+
+
+def findings_hash(findings: str) -> str:
+    return hashlib.sha1(findings.encode('utf-8')).hexdigest()
+
+
+class SemanticDiffStore:
+    """Per-version section embeddings and memoized semantic diffs for one embedding model."""
+
+    def __init__(self, research_history_path: Path, model_identity: str):
+        model_dir = re.sub(r'[^A-Za-z0-9._@-]+', '_', model_identity)
+        self.dir = Path(research_history_path) / SEMANTIC_DIRNAME / model_dir
+
+    def _research_dir(self, research_id: str) -> Path:
+        return self.dir / research_id
+
+    @staticmethod
+    def _write_atomic(path: Path, write) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 사전 계산 worker 와 diff 가 같은 파일을 동시에 쓸 수 있으므로 임시 파일 이름은 고유하게
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    # -- version embeddings ----------------------------------------------
+
+    def load_embeddings(self, research_id: str, findings: str) -> Optional["np.ndarray"]:
+        """(1 + sections, dim) array for these findings, or None if not precomputed."""
+        import numpy as np
+
+        path = self._research_dir(research_id) / f"{findings_hash(findings)}.npy"
+        if not path.exists():
+            return None
+        return np.load(path)
+
+    def save_embeddings(self, research_id: str, findings: str, embedded: "np.ndarray") -> None:
+        import numpy as np
+
+        path = self._research_dir(research_id) / f"{findings_hash(findings)}.npy"
+        self._write_atomic(path, lambda f: np.save(f, embedded.astype(np.float32)))
+
+    # -- diff results ----------------------------------------------------
+
+    def _result_path(self, research_id: str, v1: int, v2: int, threshold: float, min_similarity: float) -> Path:
+        return self._research_dir(research_id) / f"diff-v{v1}-v{v2}-t{threshold:g}-m{min_similarity:g}.json"
+
+    def load_result(self, research_id: str, v1: int, v2: int, findings1: str, findings2: str,
+                    threshold: float, min_similarity: float) -> Optional[dict]:
+        path = self._result_path(research_id, v1, v2, threshold, min_similarity)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if (stored.get("format") != RESULT_FORMAT
+                or stored.get("hashes") != [findings_hash(findings1), findings_hash(findings2)]):
+            return None
+        return stored["result"]
+
+    def save_result(self, research_id: str, v1: int, v2: int, findings1: str, findings2: str,
+                    threshold: float, min_similarity: float, result: dict) -> None:
+        payload = json.dumps({
+            "format": RESULT_FORMAT,
+            "hashes": [findings_hash(findings1), findings_hash(findings2)],
+            "result": result,
+        }, ensure_ascii=False).encode('utf-8')
+        self._write_atomic(self._result_path(research_id, v1, v2, threshold, min_similarity),
+                           lambda f: f.write(payload))
@@ -0,0 +1,233 @@
+"""Persistent, content-addressed embedding cache.
+
+Vectors are stored per embedding model as a flat float32 file that is read
+through ``np.memmap``; a small JSON index maps ``sha256(model, text)`` keys to
+row numbers and tracks recency for size-based LRU eviction.
+
+Several processes may share one cache directory. Writers (append, eviction,
+index save) hold an exclusive lock on ``cache.lock`` and readers a shared
+one. Eviction compacts the rows into a new ``vectors.<generation>.f32`` file
+and records the new generation in the index, so a handle whose row numbers
+are stale notices that its vectors file is gone and reloads the index
+instead of reading another key's row. Before saving, a handle merges the
+index on disk so entries appended by other processes are kept.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from core.commons import file_lock
+from core.metrics import incr, span
+
+
+class EmbeddingCache:
+    """On-disk float32 embedding store keyed by (model name, text hash)."""
+
+    def __init__(self, cache_dir: Path, model_name: str, max_bytes: int = 256 * 1024 * 1024):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        slug = re.sub(r'[^a-zA-Z0-9_.-]+', '_', model_name).strip('_')
+        self.dir = Path(cache_dir) / slug
+        self.index_path = self.dir / "index.json"
+        self.lock_path = self.dir / "cache.lock"
+
+        self.dim: Optional[int] = None
+        self.clock = 0
+        self.generation = 0
+        self.entries: Dict[str, List[int]] = {}  # key -> [row, last_used]
+        self._dirty = False    # 새 행 추가/압축: 바로 저장
+        self._touched = False  # 조회로 바뀐 최근 사용 시각: flush()/close() 때 저장
+        with self._lock(shared=True):
+            self._load_index()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self._vectors_path(self.generation)
+
+    def _vectors_path(self, generation: int) -> Path:
+        return self.dir / ("vectors.f32" if not generation else f"vectors.{generation}.f32")
+
+    def _lock(self, shared: bool = False):
+        return file_lock(self.lock_path, shared=shared, metric="embedding_cache")
+
+    def _read_index(self) -> Optional[dict]:
+        if not self.index_path.exists():
+            return None
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _load_index(self) -> None:
+        index = self._read_index()
+        if index is None:
+            return
+        self.dim = index.get("dim")
+        self.clock = index.get("clock", 0)
+        self.generation = index.get("generation", 0)
+        self.entries = index.get("entries", {})
+        self._dirty = self._touched = False
+
+    def _sync(self) -> None:
+        """Bring the in-memory index up to date with the one on disk (lock held)."""
+        index = self._read_index()
+        if index is None:
+            return
+        if index.get("generation", 0) != self.generation:
+            # 다른 프로세스가 압축해 행 번호가 바뀜: 가진 행 번호는 모두 무효
+            self._load_index()
+            return
+        self.clock = max(self.clock, index.get("clock", 0))
+        for key, entry in index.get("entries", {}).items():
+            mine = self.entries.get(key)
+            if mine is None:
+                self.entries[key] = entry
+            elif entry[0] == mine[0]:
+                mine[1] = max(mine[1], entry[1])
+
+    def _rows(self) -> int:
+        if not self.dim or not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.dim * 4)
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()[:32]
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Return cached vectors aligned with ``texts`` (None for misses)."""
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock(shared=True):
+            if (not self.entries or not self.vectors_path.exists()) and self.index_path.exists():
+                self._load_index()
+            rows = self._rows()
+            if not rows:
+                return results
+
+            matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+            for i, text in enumerate(texts):
+                entry = self.entries.get(self.key(text))
+                if entry is None or entry[0] >= rows:
+                    continue
+                self.clock += 1
+                entry[1] = self.clock
+                self._touched = True
+                results[i] = np.array(matrix[entry[0]])
+            del matrix
+        return results
+
+    def put_many(self, texts: List[str], vectors) -> None:
+        """Append vectors for ``texts``, evict least-recently-used rows if over budget and save the index."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(texts):
+            return
+        with self._lock():
+            self._sync()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension mismatch for {self.model_name}: "
+                    f"cache has {self.dim}, got {vectors.shape[1]}"
+                )
+
+            base = self._rows()
+            with open(self.vectors_path, 'ab') as f:
+                f.write(np.ascontiguousarray(vectors).tobytes())
+
+            for offset, text in enumerate(texts):
+                self.clock += 1
+                self.entries[self.key(text)] = [base + offset, self.clock]
+            self._dirty = True
+
+            if self._rows() * self.dim * 4 > self.max_bytes:
+                self._evict()
+            self._write_index()
+
+    def _evict(self) -> None:
+        """Keep the most recently used rows within 80% of the budget in a new generation file (lock held)."""
+        keep_rows = int(self.max_bytes * 0.8) // (self.dim * 4)
+        rows = self._rows()
+        live = sorted(
+            ((k, e) for k, e in self.entries.items() if e[0] < rows),
+            key=lambda item: item[1][1],
+            reverse=True,
+        )[:keep_rows]
+
+        old_path = self.vectors_path
+        matrix = np.memmap(old_path, dtype=np.float32, mode='r', shape=(rows, self.dim))
+        kept = np.array(matrix[[e[0] for _, e in live]]) if live else np.zeros((0, self.dim), np.float32)
+        del matrix
+
+        self.generation += 1
+        with open(self.vectors_path, 'wb') as f:
+            f.write(kept.tobytes())
+        self.entries = {k: [row, e[1]] for row, (k, e) in enumerate(live)}
+        self._dirty = True
+        # 새 세대의 인덱스를 먼저 기록한 뒤 이전 파일을 지움: 중간에 죽어도 인덱스와 행이 어긋나지 않음
+        self._write_index()
+        try:
+            old_path.unlink()
+        except OSError:
+            pass  # Windows 에서 아직 열려 있으면 남겨 둠 (인덱스가 새 세대를 가리키므로 읽히지 않음)
+
+    def _write_index(self) -> None:
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"dim": self.dim, "clock": self.clock, "generation": self.generation,
+                       "entries": self.entries}, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = self._touched = False
+
+    def flush(self) -> None:
+        """Persist the index atomically, merged with the one on disk, if anything changed."""
+        if not (self._dirty or self._touched):
+            return
+        with self._lock():
+            self._sync()
+            if self.dim is not None:
+                self._write_index()
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain ``Embeddings`` wrapper that serves repeated texts from an ``EmbeddingCache``."""
+
+    def __init__(self, inner: Embeddings, cache: EmbeddingCache):
+        self.inner = inner
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = self.cache.get_many(texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        hits = len(texts) - sum(1 for v in cached if v is None)
+        self.hits += hits
+        self.misses += len(missing)
+        incr("embedding_cache_hits", hits)
+        incr("embedding_cache_misses", len(missing))
+
+        if missing:
+            with span("embedding.model", texts=len(missing)):
+                fresh = np.asarray(self.inner.embed_documents(missing), dtype=np.float32)
+            self.cache.put_many(missing, fresh)
+            by_text = dict(zip(missing, fresh))
+            cached = [v if v is not None else by_text[t] for t, v in zip(texts, cached)]
+        return [v.tolist() for v in cached]
+
+    def embed_query(self, text: str) -> List[float]:
+        cached = self.cache.get_many([text])[0]
+        if cached is not None:
+            self.hits += 1
+            incr("embedding_cache_hits")
+            return cached.tolist()
+
+        self.misses += 1
+        incr("embedding_cache_misses")
+        with span("embedding.model", texts=1):
+            vector = np.asarray(self.inner.embed_query(text), dtype=np.float32)
+        self.cache.put_many([text], vector[None, :])
+        return vector.tolist()
@@ -0,0 +1,95 @@
+"""Embedding backend selection for the configured sentence-transformers model.
+
+``rag.embedding_backend`` picks how the model runs on CPU:
+
+- ``torch``: full-precision PyTorch (default, previous behavior)
+- ``onnx``: ONNX Runtime with the exported fp32 graph
+- ``onnx-int8``: ONNX Runtime with a dynamically int8-quantized graph
+
+The ONNX backends need ``optimum[onnxruntime]``. Vectors differ slightly
+between backends, so the backend is part of the embedding identity used for
+the embedding cache and the ingest manifest.
+"""
+from typing import Optional
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# sentence-transformers 모델 저장소에 함께 배포되는 ONNX 파일
+DEFAULT_ONNX_FILES = {
+    "onnx": "onnx/model.onnx",
+    "onnx-int8": "onnx/model_quint8_avx2.onnx",
+}
+
+
+def embedding_backend(rag_config: dict) -> str:
+    """Return the configured backend name, validating it."""
+    backend = rag_config.get('embedding_backend') or "torch"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding_backend: {backend!r} (choose from {', '.join(BACKENDS)})")
+    return backend
+
+
+def embedding_identity(rag_config: dict) -> str:
+    """Model name plus backend (and ONNX file); equal identities give equal vectors.
+
+    The torch backend keeps the bare model name so existing caches stay valid.
+    """
+    model_name = rag_config['embedding_model']
+    backend = embedding_backend(rag_config)
+    if backend == "torch":
+        return model_name
+    return f"{model_name}@{backend}:{onnx_file_name(rag_config)}"
+
+
+def onnx_file_name(rag_config: dict) -> str:
+    backend = embedding_backend(rag_config)
+    return rag_config.get('embedding_onnx_file') or DEFAULT_ONNX_FILES.get(backend, "")
+
+
+def _session_options(threads: Optional[int]):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    return options
+
+
+def create_embeddings(rag_config: dict):
+    """Build a HuggingFaceEmbeddings for ``rag_config`` (the ``rag`` config section).
+
+    Raises:
+        ValueError: If the backend is unknown or its dependencies are missing
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    backend = embedding_backend(rag_config)
+    threads = rag_config.get('embedding_threads') or None
+    encode_kwargs = {"batch_size": rag_config.get('embedding_batch_size', 32)}
+
+    if backend == "torch":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return HuggingFaceEmbeddings(model_name=rag_config['embedding_model'], encode_kwargs=encode_kwargs)
+
+    try:
+        import optimum.onnxruntime  # noqa: F401
+    except ImportError as e:
+        raise ValueError(f"embedding_backend '{backend}' requires optimum "
+                         "(pip install 'optimum[onnxruntime]')") from e
+
+    model_kwargs = {
+        "backend": "onnx",
+        "model_kwargs": {
+            "file_name": onnx_file_name(rag_config),
+            "provider": "CPUExecutionProvider",
+            "session_options": _session_options(threads),
+        },
+    }
+    return HuggingFaceEmbeddings(
+        model_name=rag_config['embedding_model'],
+        model_kwargs=model_kwargs,
+        encode_kwargs=encode_kwargs
+    )
@@ -0,0 +1,314 @@
+"""Memory-mapped flat vector store (alternative to Chroma for mid-sized corpora).
+
+Layout of the store directory:
+
+- ``vectors.npy``: L2-normalized float32 matrix in standard ``.npy`` format
+  with a fixed 128-byte header, so appending rows only rewrites the shape in
+  the header and opening is a single ``np.memmap`` (pages are shared between
+  processes through the OS cache)
+- ``meta.jsonl`` + ``meta.idx``: one ``{"id", "text", "metadata"}`` record
+  per row and its uint64 byte offset, so top-k rows are read by seeking
+- ``ids.txt``: row IDs, one per line (loaded only for id lookups)
+- ``deleted.u64``: tombstoned row numbers; rows are never rewritten in
+  place, and the store is compacted once ``compact_ratio`` of rows are dead
+
+The row count in the ``vectors.npy`` header is the only commit point: an
+append writes the vector rows and all sidecar entries first and publishes
+the new count last. Entries beyond the header count left by an interrupted
+append are cut off when the store is opened and before the next append.
+Writers (add, delete, compact) hold an exclusive lock on ``store.lock``.
+
+Search is a matmul of the query (or a batch of queries) against the matrix
+plus ``argpartition`` top-k. The public methods mirror the subset of the
+LangChain Chroma API the agent uses (``add_texts``, ``delete``, ``get``,
+``similarity_search_by_vector``).
+"""
+import ast
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.commons import file_lock
+
+NPY_HEADER_SIZE = 128
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _npy_header(rows: int, dim: int) -> bytes:
+    header = repr({'descr': '<f4', 'fortran_order': False, 'shape': (rows, dim)}).encode('latin1')
+    padding = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - len(header) - 1
+    return NPY_MAGIC + struct.pack('<H', NPY_HEADER_SIZE - len(NPY_MAGIC) - 2) + header + b' ' * padding + b'\n'
+
+
+def _read_shape(path: Path) -> tuple:
+    with open(path, 'rb') as f:
+        raw = f.read(NPY_HEADER_SIZE)
+    return ast.literal_eval(raw[len(NPY_MAGIC) + 2:].decode('latin1').strip())['shape']
+
+
+class FlatVectorStore:
+    """Append-only memory-mapped embedding matrix with tombstones."""
+
+    def __init__(self, persist_directory: str, embedding_function, compact_ratio: float = 0.5):
+        self.dir = Path(persist_directory)
+        self.embedding_function = embedding_function
+        self.compact_ratio = compact_ratio
+        self.vectors_path = self.dir / "vectors.npy"
+        self.meta_path = self.dir / "meta.jsonl"
+        self.offsets_path = self.dir / "meta.idx"
+        self.ids_path = self.dir / "ids.txt"
+        self.deleted_path = self.dir / "deleted.u64"
+
+        self._matrix: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._ids: Optional[List[str]] = None
+        self._rows_by_id: Optional[Dict[str, int]] = None
+        self.deleted = set()
+        if self.vectors_path.exists():
+            with self._lock():
+                self._truncate_to_header()
+        if self.deleted_path.exists():
+            self.deleted = set(np.fromfile(self.deleted_path, dtype='<u8').tolist())
+
+    def _lock(self):
+        return file_lock(self.dir / "store.lock", metric="flat_store")
+
+    def _truncate_to_header(self) -> None:
+        """Drop vectors and sidecar entries past the header row count (lock held).
+
+        They are left behind when an append is interrupted before it publishes
+        the new header; keeping them would shift every later row's id/text.
+        """
+        if not self.vectors_path.exists():
+            return
+        rows, dim = _read_shape(self.vectors_path)
+        vectors_end = NPY_HEADER_SIZE + rows * dim * 4
+        if self.vectors_path.stat().st_size > vectors_end:
+            os.truncate(self.vectors_path, vectors_end)
+
+        offsets_size = self.offsets_path.stat().st_size if self.offsets_path.exists() else 0
+        if rows:
+            offsets = np.fromfile(self.offsets_path, dtype='<u8', count=rows)
+            with open(self.meta_path, 'rb') as f:
+                f.seek(int(offsets[rows - 1]))
+                f.readline()
+                meta_end = f.tell()
+        else:
+            meta_end = 0
+        if self.meta_path.exists() and self.meta_path.stat().st_size > meta_end:
+            os.truncate(self.meta_path, meta_end)
+
+        if offsets_size > rows * 8:
+            os.truncate(self.offsets_path, rows * 8)
+            # ids.txt 는 meta.idx 다음에 기록되므로 meta.idx 가 길 때만 넘칠 수 있음
+            if self.ids_path.exists():
+                data = self.ids_path.read_bytes()
+                end = 0
+                for _ in range(rows):
+                    end = data.index(b'\n', end) + 1
+                if len(data) > end:
+                    os.truncate(self.ids_path, end)
+        self._matrix = None
+        self._offsets = None
+        self._ids = None
+        self._rows_by_id = None
+
+    # -- reading ---------------------------------------------------------
+
+    @property
+    def rows(self) -> int:
+        if not self.vectors_path.exists():
+            return 0
+        return _read_shape(self.vectors_path)[0]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """(rows, dim) float32 memmap; re-opened when another writer appended rows."""
+        rows = self.rows
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            if rows == 0:
+                return np.zeros((0, 0), dtype=np.float32)
+            self._matrix = np.load(self.vectors_path, mmap_mode='r')
+            self._offsets = None
+        return self._matrix
+
+    def _offset(self, row: int) -> int:
+        if self._offsets is None or row >= len(self._offsets):
+            self._offsets = np.fromfile(self.offsets_path, dtype='<u8')
+        return int(self._offsets[row])
+
+    def _records(self, rows: List[int]) -> List[dict]:
+        records = []
+        with open(self.meta_path, 'rb') as f:
+            for row in rows:
+                f.seek(self._offset(row))
+                records.append(json.loads(f.readline()))
+        return records
+
+    def _id_map(self) -> Dict[str, int]:
+        if self._rows_by_id is None or len(self._ids) != self.rows:
+            ids = self.ids_path.read_text(encoding='utf-8').splitlines() if self.ids_path.exists() else []
+            # 헤더에 반영되지 않은 (진행 중/중단된 append 의) ID 는 무시
+            self._ids = ids[:self.rows]
+            # 같은 ID가 다시 추가된 경우 가장 마지막 (살아 있는) 행이 유효
+            self._rows_by_id = {chunk_id: row for row, chunk_id in enumerate(self._ids)
+                                if row not in self.deleted}
+        return self._rows_by_id
+
+    def __len__(self) -> int:
+        return self.rows - len(self.deleted)
+
+    # -- search ----------------------------------------------------------
+
+    def search_batch(self, embeddings, k: int) -> List[List[tuple]]:
+        """Top-``k`` (row, cosine similarity) pairs for each query vector, best first."""
+        queries = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        queries = queries / (np.linalg.norm(queries, axis=1, keepdims=True) + 1e-8)
+        matrix = self.matrix
+        if not len(matrix):
+            return [[] for _ in queries]
+
+        scores = queries @ matrix.T
+        if self.deleted:
+            scores[:, list(self.deleted)] = -np.inf
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in queries]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row_scores, candidates in zip(scores, top):
+            order = candidates[np.argsort(-row_scores[candidates])]
+            results.append([(int(row), float(row_scores[row])) for row in order])
+        return results
+
+    def similarity_search_by_vector_batch(self, embeddings, k: int = 4) -> List[list]:
+        """Batched multi-query search returning LangChain Documents per query."""
+        from langchain_core.documents import Document
+
+        hits = self.search_batch(embeddings, k)
+        records = self._records([row for query_hits in hits for row, _ in query_hits])
+        results, i = [], 0
+        for query_hits in hits:
+            results.append([Document(id=record["id"], page_content=record["text"], metadata=record["metadata"])
+                            for record in records[i:i + len(query_hits)]])
+            i += len(query_hits)
+        return results
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4) -> list:
+        return self.similarity_search_by_vector_batch([embedding], k)[0]
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> dict:
+        """Chroma-style ``get``: {"ids", "documents", "metadatas"} of live rows."""
+        rows_by_id = self._id_map()
+        if ids is None:
+            pairs = sorted(rows_by_id.items(), key=lambda item: item[1])
+        else:
+            pairs = [(chunk_id, rows_by_id[chunk_id]) for chunk_id in ids if chunk_id in rows_by_id]
+        records = self._records([row for _, row in pairs])
+        return {
+            "ids": [chunk_id for chunk_id, _ in pairs],
+            "documents": [record["text"] for record in records],
+            "metadatas": [record["metadata"] for record in records],
+        }
+
+    # -- writing ---------------------------------------------------------
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None) -> List[str]:
+        """Embed and append texts; an existing ID is tombstoned and re-appended."""
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = np.asarray(self.embedding_function.embed_documents(list(texts)), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-8
+        with self._lock():
+            self._truncate_to_header()
+            ids = list(ids) if ids else [f"row{self.rows + i}" for i in range(len(texts))]
+            self.delete([chunk_id for chunk_id in ids if chunk_id in self._id_map()])
+            self._append(vectors, texts, metadatas, ids)
+        return ids
+
+    def _append(self, vectors: np.ndarray, texts, metadatas, ids) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        rows = self.rows
+        if rows and vectors.shape[1] != _read_shape(self.vectors_path)[1]:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store")
+
+        # 벡터 행과 메타데이터를 모두 쓴 뒤 행 수(헤더)를 마지막에 갱신: 헤더가 유일한 커밋 지점이라
+        # 중간에 중단되면 헤더 뒤에 남은 항목은 다음 open/append 때 잘라냄
+        dim = vectors.shape[1]
+        mode = 'r+b' if rows else 'wb'
+        with open(self.vectors_path, mode) as vectors_file:
+            if not rows:
+                vectors_file.write(_npy_header(0, dim))
+            vectors_file.seek(NPY_HEADER_SIZE + rows * dim * 4)
+            vectors_file.write(np.ascontiguousarray(vectors, dtype='<f4').tobytes())
+            vectors_file.flush()
+
+            offset = self.meta_path.stat().st_size if self.meta_path.exists() else 0
+            offsets = []
+            with open(self.meta_path, 'ab') as f:
+                for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                    line = (json.dumps({"id": chunk_id, "text": text, "metadata": metadata},
+                                       ensure_ascii=False) + '\n').encode('utf-8')
+                    offsets.append(offset)
+                    offset += len(line)
+                    f.write(line)
+            with open(self.offsets_path, 'ab') as f:
+                f.write(np.asarray(offsets, dtype='<u8').tobytes())
+            with open(self.ids_path, 'a', encoding='utf-8') as f:
+                f.writelines(f"{chunk_id}\n" for chunk_id in ids)
+
+            vectors_file.seek(0)
+            vectors_file.write(_npy_header(rows + len(vectors), dim))
+        if self._rows_by_id is not None:
+            self._ids.extend(ids)
+            self._rows_by_id.update((chunk_id, rows + i) for i, chunk_id in enumerate(ids))
+
+    def delete(self, ids: Optional[List[str]] = None) -> None:
+        """Tombstone rows by ID; compacts the store once most rows are dead."""
+        with self._lock():
+            rows_by_id = self._id_map()
+            rows = [rows_by_id.pop(chunk_id) for chunk_id in ids or [] if chunk_id in rows_by_id]
+            if not rows:
+                return
+            self.deleted.update(rows)
+            with open(self.deleted_path, 'ab') as f:
+                f.write(np.asarray(rows, dtype='<u8').tobytes())
+            if len(self.deleted) > self.rows * self.compact_ratio:
+                self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the store with live rows only (built in a temp directory, then swapped in)."""
+        with self._lock():
+            live = sorted(self._id_map().items(), key=lambda item: item[1])
+            tmp_dir = self.dir / ".compact"
+            tmp_dir.mkdir(exist_ok=True)
+            for leftover in tmp_dir.iterdir():
+                # 이전에 중단된 compact 의 잔여 파일
+                leftover.unlink()
+            compacted = FlatVectorStore(str(tmp_dir), self.embedding_function, self.compact_ratio)
+            if live:
+                records = self._records([row for _, row in live])
+                compacted._append(np.array(self.matrix[[row for _, row in live]]),
+                                  [record["text"] for record in records],
+                                  [record["metadata"] for record in records],
+                                  [chunk_id for chunk_id, _ in live])
+
+            self._matrix = None
+            # 벡터 헤더(행 수)가 마지막에 바뀌도록 메타데이터부터 교체
+            for name in ("meta.jsonl", "meta.idx", "ids.txt", "vectors.npy"):
+                source = tmp_dir / name
+                if source.exists():
+                    os.replace(source, self.dir / name)
+                else:
+                    (self.dir / name).unlink(missing_ok=True)
+            self.deleted_path.unlink(missing_ok=True)
+            tmp_dir.rmdir()
+            self.deleted = set()
+            self._rows_by_id = None
+            self._offsets = None
@@ -0,0 +1,174 @@
+"""SQLite index over all research histories.
+
+Keeps one row of metadata per (research_id, version) plus an FTS5 table over
+queries and findings, so listing, filtering and full-text search across every
+research ID do not need to open the history files. The agent updates the
+index whenever it saves a version; ``rebuild`` regenerates it from the
+history files.
+"""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from core.commons import load_research
+
+INDEX_FILENAME = "index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    research_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    query TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (research_id, version)
+);
+CREATE INDEX IF NOT EXISTS versions_timestamp ON versions (timestamp);
+"""
+
+
+def findings_hash(findings: str) -> str:
+    return hashlib.sha256(findings.encode('utf-8')).hexdigest()[:16]
+
+
+class HistoryIndex:
+    """Metadata + full-text index of research versions in ``research_history_path``."""
+
+    def __init__(self, research_history_path: Path):
+        self.research_history_path = Path(research_history_path)
+        self.research_history_path.mkdir(exist_ok=True)
+        self.path = self.research_history_path / INDEX_FILENAME
+        # batch 모드는 워커 스레드에서 저장하므로 연결을 공유하고 쓰기는 lock으로 직렬화
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        try:
+            # trigram 토크나이저는 조사가 붙은 한국어 단어도 부분 일치로 검색 가능
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts USING fts5("
+                "research_id UNINDEXED, version UNINDEXED, query, findings, tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS findings_fts USING fts5("
+                "research_id UNINDEXED, version UNINDEXED, query, findings)"
+            )
+        self.conn.commit()
+
+    @classmethod
+    def open(cls, research_history_path: Path) -> "HistoryIndex":
+        """Open the index, building it from the history files if it is new or empty."""
+        index = cls(research_history_path)
+        if index.is_empty():
+            index.rebuild()
+        return index
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _add(self, research_id: str, version: dict) -> None:
+        findings = version.get("findings", "")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?)",
+            (research_id, version["version"], version.get("timestamp", ""), version.get("query", ""),
+             len(findings), findings_hash(findings))
+        )
+        self.conn.execute("DELETE FROM findings_fts WHERE research_id = ? AND version = ?",
+                          (research_id, version["version"]))
+        self.conn.execute("INSERT INTO findings_fts VALUES (?, ?, ?, ?)",
+                          (research_id, version["version"], version.get("query", ""), findings))
+
+    def add_version(self, research_id: str, version: dict) -> None:
+        """Index (or re-index) one saved version."""
+        with self._lock, self.conn:
+            self._add(research_id, version)
+
+    def rebuild(self) -> int:
+        """Re-index every history in the directory; returns the number of versions indexed."""
+        research_ids = sorted({p.stem for pattern in ("*.jsonl", "*.json")
+                               for p in self.research_history_path.glob(pattern)
+                               if not p.name.endswith(".draft.json")})
+        count = 0
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM versions")
+            self.conn.execute("DELETE FROM findings_fts")
+            for research_id in research_ids:
+                data = load_research(research_id, self.research_history_path, raise_if_missing=False)
+                for version in (data or {}).get("versions", []):
+                    self._add(research_id, version)
+                    count += 1
+        return count
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM versions LIMIT 1").fetchone() is None
+
+    @staticmethod
+    def _filters(research_id: Optional[str], since: Optional[str], until: Optional[str]) -> tuple:
+        clauses, params = [], []
+        if research_id:
+            clauses.append("v.research_id GLOB ?")
+            params.append(research_id)
+        if since:
+            clauses.append("v.timestamp >= ?")
+            params.append(since)
+        if until:
+            # 날짜만 주어진 경우 그날 전체를 포함
+            clauses.append("v.timestamp <= ?")
+            params.append(until if 'T' in until else until + "T99")
+        return (" AND ".join(clauses) or "1"), params
+
+    def list_research(self, research_id: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None) -> List[sqlite3.Row]:
+        """One row per research ID with version count, time range and latest query."""
+        where, params = self._filters(research_id, since, until)
+        return self.conn.execute(f"""
+            SELECT v.research_id, COUNT(*) AS versions, MIN(v.timestamp) AS first,
+                   MAX(v.timestamp) AS last, MAX(v.version) AS latest,
+                   (SELECT query FROM versions WHERE research_id = v.research_id
+                    ORDER BY version DESC LIMIT 1) AS query
+            FROM versions v WHERE {where}
+            GROUP BY v.research_id ORDER BY last DESC
+        """, params).fetchall()
+
+    def list_versions(self, research_id: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None) -> List[sqlite3.Row]:
+        """Per-version metadata rows, newest first."""
+        where, params = self._filters(research_id, since, until)
+        return self.conn.execute(
+            f"SELECT v.* FROM versions v WHERE {where} ORDER BY v.timestamp DESC, v.version DESC",
+            params
+        ).fetchall()
+
+    def search(self, text: str, research_id: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
+        """Full-text search over queries and findings, best matches first."""
+        where, params = self._filters(research_id, since, until)
+        if len(text) < 3:
+            # trigram 인덱스는 3글자 미만 검색어를 매칭하지 못하므로 LIKE로 대체
+            return self.conn.execute(f"""
+                SELECT f.research_id, f.version, v.timestamp, v.query,
+                       substr(f.findings, max(instr(f.findings, ?) - 30, 1), 80) AS snippet
+                FROM findings_fts f
+                JOIN versions v ON v.research_id = f.research_id AND v.version = f.version
+                WHERE (f.findings LIKE ? OR f.query LIKE ?) AND {where}
+                ORDER BY v.timestamp DESC LIMIT ?
+            """, [text, f"%{text}%", f"%{text}%"] + params + [limit]).fetchall()
+        phrase = '"' + text.replace('"', '""') + '"'
+        return self.conn.execute(f"""
+            SELECT f.research_id, f.version, v.timestamp, v.query,
+                   snippet(findings_fts, -1, '[', ']', '…', 12) AS snippet
+            FROM findings_fts f
+            JOIN versions v ON v.research_id = f.research_id AND v.version = f.version
+            WHERE findings_fts MATCH ? AND {where}
+            ORDER BY rank LIMIT ?
+        """, [phrase] + params + [limit]).fetchall()
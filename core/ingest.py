@@ -0,0 +1,85 @@
+"""Streaming, parallel document ingestion pipeline.
+
+Files are read, hashed and split in a process pool; only a bounded number of
+files is in flight at once, and the resulting chunks are consumed lazily in
+fixed-size batches so memory stays flat regardless of corpus size.
+"""
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple
+
+from core.manifest import content_hash
+
+
+class SplitDocument(NamedTuple):
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+    chunks: List[str]
+
+
+def read_and_split(path: str, chunk_size: int, chunk_overlap: int) -> SplitDocument:
+    """Read, hash and split one document (runs in a worker process)."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return SplitDocument(path, stat.st_size, stat.st_mtime, content_hash(raw),
+                         splitter.split_text(raw.decode('utf-8')))
+
+
+def iter_split_documents(paths: List[str], chunk_size: int, chunk_overlap: int,
+                         workers: int = 4, max_in_flight: int = 16) -> Iterator[SplitDocument]:
+    """Yield split documents in input order with at most ``max_in_flight`` pending files."""
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield read_and_split(path, chunk_size, chunk_overlap)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        remaining = iter(paths)
+        for path in islice(remaining, max_in_flight):
+            pending.append(executor.submit(read_and_split, path, chunk_size, chunk_overlap))
+        while pending:
+            result = pending.popleft().result()
+            for path in islice(remaining, 1):
+                pending.append(executor.submit(read_and_split, path, chunk_size, chunk_overlap))
+            yield result
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Group an iterable into lists of ``size`` items (the last may be shorter)."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class IngestProgress:
+    """Reports ingested chunks and throughput (chunks/s) on stderr."""
+
+    def __init__(self, stream=sys.stderr):
+        self.stream = stream
+        self.chunks = 0
+        self.start = time.perf_counter()
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.chunks / elapsed if elapsed > 0 else 0.0
+
+    def update(self, count: int) -> None:
+        self.chunks += count
+        print(f"\r  ingest: {self.chunks} chunks ({self.rate:.1f} chunks/s)",
+              end='', file=self.stream, flush=True)
+
+    def finish(self) -> None:
+        if self.chunks:
+            print(file=self.stream)
@@ -0,0 +1,79 @@
+"""Persistent LLM response cache keyed by (model, rendered prompt hash).
+
+One small JSON file per response; entries expire after a TTL and the oldest
+entries are evicted when the cache directory exceeds its size budget.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class ResponseCache:
+    """On-disk cache of generated texts with TTL and size-bounded eviction."""
+
+    def __init__(self, cache_dir: Path, ttl_seconds: float = 24 * 3600, max_bytes: int = 100 * 1024 * 1024):
+        self.dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode('utf-8')).hexdigest()
+
+    def _path(self, model: str, prompt: str) -> Path:
+        return self.dir / f"{self.key(model, prompt)}.json"
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        """Return the cached response text, or None if missing or expired."""
+        filepath = self._path(model, prompt)
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        if self.ttl_seconds and time.time() - entry["created"] > self.ttl_seconds:
+            filepath.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["text"]
+
+    def put(self, model: str, prompt: str, text: str) -> None:
+        """Store a response atomically, then enforce the size budget."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        filepath = self._path(model, prompt)
+        # 같은 프롬프트를 동시에 캐시하는 스레드/프로세스끼리 임시 파일이 겹치지 않도록 고유한 이름 사용
+        fd, tmp_name = tempfile.mkstemp(dir=self.dir, prefix=filepath.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"model": model, "created": time.time(), "text": text}, f, ensure_ascii=False)
+            os.replace(tmp_name, filepath)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for filepath in self.dir.glob('*.json'):
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:  # 다른 프로세스가 먼저 삭제
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filepath))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, filepath in sorted(entries):
+            filepath.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes * 0.8:
+                break
@@ -0,0 +1,90 @@
+"""Ingestion manifest for incremental, deduplicating RAG ingestion."""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_FILENAME = "ingest_manifest.json"
+GENERATION_FILENAME = "generation"
+
+
+def load_manifest(rag_db_path: Path, settings: dict) -> dict:
+    """Load the ingestion manifest stored next to the vector store.
+
+    Args:
+        rag_db_path: Path to RAG database directory
+        settings: Settings that affect chunking/embedding (model, chunk size, ...).
+                  If they differ from the recorded ones, the file entries are
+                  kept only so their chunks can be replaced.
+
+    Returns:
+        Manifest dictionary with "settings", "files" and "stale" keys
+    """
+    filepath = rag_db_path / MANIFEST_FILENAME
+    manifest = {"settings": settings, "files": {}, "stale": False}
+    if filepath.exists():
+        with open(filepath, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        manifest["files"] = stored.get("files", {})
+        manifest["stale"] = stored.get("settings") != settings
+    return manifest
+
+
+def save_manifest(manifest: dict, rag_db_path: Path) -> None:
+    """Atomically write the ingestion manifest.
+
+    Args:
+        manifest: Manifest dictionary
+        rag_db_path: Path to RAG database directory
+    """
+    rag_db_path.mkdir(parents=True, exist_ok=True)
+    filepath = rag_db_path / MANIFEST_FILENAME
+    tmp_path = filepath.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"settings": manifest["settings"], "files": manifest["files"]},
+                  f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+def manifest_key(path: str) -> str:
+    """Manifest key for a document path (absolute, resolved)."""
+    return str(Path(path).resolve())
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest of a document's raw bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_ids(key: str, count: int) -> list:
+    """Stable vector store IDs for the chunks of a document.
+
+    IDs depend only on the document path and chunk position, so a changed
+    document's previous chunks can be deleted without querying the store.
+    """
+    prefix = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return [f"{prefix}:{i:05d}" for i in range(count)]
+
+
+def is_unchanged(entry: dict, stat: os.stat_result) -> bool:
+    """Cheap size/mtime check against a manifest entry."""
+    return entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime
+
+
+def read_generation(rag_db_path: Path) -> int:
+    """Vector store generation counter (changes whenever ingestion modifies the store)."""
+    filepath = rag_db_path / GENERATION_FILENAME
+    if not filepath.exists():
+        return 0
+    return int(filepath.read_text(encoding='utf-8').strip() or 0)
+
+
+def bump_generation(rag_db_path: Path) -> int:
+    """Increment and persist the vector store generation counter."""
+    generation = read_generation(rag_db_path) + 1
+    rag_db_path.mkdir(parents=True, exist_ok=True)
+    filepath = rag_db_path / GENERATION_FILENAME
+    tmp_path = filepath.with_suffix('.tmp')
+    tmp_path.write_text(str(generation), encoding='utf-8')
+    os.replace(tmp_path, filepath)
+    return generation
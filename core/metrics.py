@@ -0,0 +1,175 @@
+"""Lightweight in-process timing spans and counters.
+
+A single process-wide registry (``METRICS``) records spans (name, duration,
+parent span, attributes such as token/chunk counts) and monotonically
+increasing counters (cache hits, Gemini calls, ...). Recording costs two
+``perf_counter`` calls and a dict update, so it is always on; the CLI shows a
+summary with ``--profile`` and exports JSON or Prometheus text with
+``--metrics-out``.
+
+Usage::
+
+    @timed("history.append")
+    def append(...): ...
+
+    with span("retrieval.vector_search", k=5) as attrs:
+        docs = ...
+        attrs["docs"] = len(docs)
+
+    incr("llm_cache_hits")
+"""
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+PROMETHEUS_PREFIX = "marketing_agent"
+
+
+class Metrics:
+    """Registry of span aggregates, recent span records and counters."""
+
+    def __init__(self, max_spans: int = 1000):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans = deque(maxlen=max_spans)       # 최근 span 기록 (JSON export용)
+        self.aggregates: Dict[str, dict] = {}      # name -> count/total/max
+        self.counters: Dict[str, float] = {}
+        self.started = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self.aggregates.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block; yields a dict the block can add attributes to."""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            self.record(name, time.perf_counter() - start, parent=parent, error=error, **attrs)
+
+    def record(self, name: str, seconds: float, parent: Optional[str] = None,
+               error: Optional[str] = None, **attrs) -> None:
+        """Record an already-measured span (e.g. a duration reported by a stream)."""
+        if parent is None:
+            stack = self._stack()
+            parent = stack[-1] if stack else None
+        record = {"name": name, "parent": parent, "seconds": round(seconds, 6),
+                  "start": round(time.time() - seconds, 3), **attrs}
+        if error:
+            record["error"] = error
+        with self._lock:
+            self.spans.append(record)
+            aggregate = self.aggregates.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "errors": 0})
+            aggregate["count"] += 1
+            aggregate["total"] += seconds
+            aggregate["max"] = max(aggregate["max"], seconds)
+            aggregate["errors"] += bool(error)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "spans": {name: dict(agg) for name, agg in self.aggregates.items()},
+                "counters": dict(self.counters),
+                "recent": list(self.spans),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (span durations as summaries)."""
+        data = self.to_dict()
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_span_seconds Time spent in instrumented spans",
+            f"# TYPE {PROMETHEUS_PREFIX}_span_seconds summary",
+        ]
+        for name, agg in sorted(data["spans"].items()):
+            label = f'{{span="{name}"}}'
+            lines.append(f"{PROMETHEUS_PREFIX}_span_seconds_sum{label} {agg['total']:.6f}")
+            lines.append(f"{PROMETHEUS_PREFIX}_span_seconds_count{label} {agg['count']}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_span_seconds_max gauge")
+        for name, agg in sorted(data["spans"].items()):
+            lines.append(f'{PROMETHEUS_PREFIX}_span_seconds_max{{span="{name}"}} {agg["max"]:.6f}')
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_span_errors_total counter")
+        for name, agg in sorted(data["spans"].items()):
+            lines.append(f'{PROMETHEUS_PREFIX}_span_errors_total{{span="{name}"}} {agg["errors"]}')
+        for name, value in sorted(data["counters"].items()):
+            metric = f"{PROMETHEUS_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Human-readable table of spans (slowest total first) and counters."""
+        data = self.to_dict()
+        lines = [f"{'Span':<32} {'Calls':>6} {'Total (ms)':>11} {'Mean (ms)':>10} {'Max (ms)':>9}",
+                 "-" * 72]
+        for name, agg in sorted(data["spans"].items(), key=lambda item: item[1]["total"], reverse=True):
+            lines.append(f"{name:<32} {agg['count']:>6} {agg['total'] * 1000:>11.1f} "
+                         f"{agg['total'] / agg['count'] * 1000:>10.1f} {agg['max'] * 1000:>9.1f}")
+        if data["counters"]:
+            lines.append("")
+            lines.extend(f"{name:<32} {value:>10g}" for name, value in sorted(data["counters"].items()))
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write JSON (``.json``) or Prometheus text (any other suffix) to ``path``."""
+        content = self.to_json() if str(path).endswith(".json") else self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+METRICS = Metrics()
+
+
+def span(name: str, **attrs):
+    return METRICS.span(name, **attrs)
+
+
+def incr(name: str, value: float = 1) -> None:
+    METRICS.incr(name, value)
+
+
+def record(name: str, seconds: float, **attrs) -> None:
+    METRICS.record(name, seconds, **attrs)
+
+
+def timed(name: Optional[str] = None):
+    """Decorator recording each call of the function as a span."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,116 @@
+"""Prompt-size budgeting and context compression for research prompts.
+
+Token counts are estimated locally (no API call): Hangul/CJK characters
+count roughly 1 token per 1.5 characters, everything else 1 token per 4.
+"""
+import re
+from typing import List
+
+WIDE_CHARS = re.compile(r'[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u9fff\uac00-\ud7af]')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for mixed Korean/English text."""
+    if not text:
+        return 0
+    wide = len(WIDE_CHARS.findall(text))
+    return int(wide / 1.5 + (len(text) - wide) / 4) + 1
+
+
+def _sections(text: str) -> List[List[str]]:
+    """Split markdown text into sections, each starting at a heading line."""
+    sections = [[]]
+    for line in text.splitlines():
+        if line.lstrip().startswith('#') and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return [s for s in sections if s]
+
+
+def summarize_findings(text: str, max_tokens: int) -> str:
+    """Extractively shorten findings to ``max_tokens``.
+
+    Keeps every heading and the first N non-empty lines of each section,
+    lowering N until the text fits; falls back to truncation.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sections = _sections(text)
+    longest = max(len(s) for s in sections)
+    for keep in range(longest - 1, -1, -1):
+        lines = []
+        for section in sections:
+            body = [line for line in section[1:] if line.strip()]
+            lines.append(section[0])
+            lines.extend(body[:keep])
+            if len(body) > keep:
+                lines.append("  - …")
+        summary = "\n".join(lines)
+        if estimate_tokens(summary) <= max_tokens:
+            return summary
+
+    ratio = max_tokens / max(estimate_tokens(summary), 1)
+    return summary[:int(len(summary) * ratio)] + "\n…"
+
+
+class PromptBudget:
+    """Fits RAG docs and previous findings into a prompt token budget."""
+
+    def __init__(self, max_prompt_tokens: int = 6000, previous_research_max_tokens: int = 2500,
+                 rag_overlap_similarity: float = 0.9):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.previous_research_max_tokens = previous_research_max_tokens
+        self.rag_overlap_similarity = rag_overlap_similarity
+
+    @classmethod
+    def from_config(cls, config: dict) -> "PromptBudget":
+        budget = config.get('budget') or {}
+        return cls(
+            max_prompt_tokens=budget.get('max_prompt_tokens', 6000),
+            previous_research_max_tokens=budget.get('previous_research_max_tokens', 2500),
+            rag_overlap_similarity=budget.get('rag_overlap_similarity', 0.9),
+        )
+
+    def dedupe_docs(self, docs: List[dict], doc_embeddings, previous_embeddings) -> List[dict]:
+        """Drop RAG docs that repeat another doc or overlap the previous research.
+
+        Embeddings are expected to be L2-normalized row matrices.
+        """
+        keep = []
+        for i, doc in enumerate(docs):
+            vector = doc_embeddings[i]
+            if len(previous_embeddings) and float((previous_embeddings @ vector).max()) >= self.rag_overlap_similarity:
+                continue
+            if keep and float((doc_embeddings[keep] @ vector).max()) >= self.rag_overlap_similarity:
+                continue
+            keep.append(i)
+        return [docs[i] for i in keep]
+
+    def fit(self, template_tokens: int, query: str, docs: List[dict], previous_research: str,
+            format_docs) -> tuple:
+        """Trim docs and summarize previous research to fit the budget.
+
+        Args:
+            template_tokens: Tokens of the prompt template without variables
+            query: Research query
+            docs: Retrieved docs (best first)
+            previous_research: Previous findings ("" for initial research)
+            format_docs: Callable rendering docs into the rag_context string
+
+        Returns:
+            (docs, previous_research) that fit, as far as possible, in max_prompt_tokens
+        """
+        if estimate_tokens(previous_research) > self.previous_research_max_tokens:
+            previous_research = summarize_findings(previous_research, self.previous_research_max_tokens)
+
+        fixed = template_tokens + estimate_tokens(query)
+        docs = list(docs)
+        while docs and fixed + estimate_tokens(format_docs(docs)) + estimate_tokens(previous_research) \
+                > self.max_prompt_tokens:
+            docs.pop()  # 순위가 가장 낮은 문서부터 제거
+
+        remaining = self.max_prompt_tokens - fixed - estimate_tokens(format_docs(docs))
+        if previous_research and estimate_tokens(previous_research) > remaining:
+            previous_research = summarize_findings(previous_research, max(remaining, 200))
+        return docs, previous_research
@@ -0,0 +1,101 @@
+"""Persistent LRU cache of RAG retrieval results.
+
+Entries are keyed by normalized query text, ``top_k``, the retrieval mode
+(dense or hybrid) and the vector store generation (bumped by every ingestion that changes the store), so results
+are reused only while the RAG DB is unchanged. An optional near-duplicate
+lookup reuses results when a new query embedding is within a cosine
+similarity threshold of a cached query.
+"""
+import json
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+CACHE_FILENAME = "retrieval_cache.json"
+
+
+def normalize_query(query: str) -> str:
+    """NFKC-normalize, lowercase and collapse whitespace."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', query)).strip().lower()
+
+
+class RetrievalCache:
+    """LRU cache of retrieved documents with hit/miss statistics."""
+
+    def __init__(self, rag_db_path: Path, max_entries: int = 256, mode: str = "dense"):
+        self.path = Path(rag_db_path) / CACHE_FILENAME
+        self.max_entries = max_entries
+        self.mode = mode
+        self.entries: OrderedDict = OrderedDict()
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0}
+        self._dirty = False
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            self.entries = OrderedDict(stored.get("entries", []))
+            self.stats.update(stored.get("stats", {}))
+
+    def _key(self, query: str, generation: int, k: int) -> str:
+        prefix = "" if self.mode == "dense" else f"{self.mode}:"
+        return f"{prefix}{generation}:{k}:{normalize_query(query)}"
+
+    def _touch(self, key: str) -> List[dict]:
+        self.entries.move_to_end(key)
+        self._dirty = True
+        return self.entries[key]["docs"]
+
+    def get(self, query: str, generation: int, k: int) -> Optional[List[dict]]:
+        """Exact lookup by normalized query; None on miss (the miss is not counted here)."""
+        key = self._key(query, generation, k)
+        if key not in self.entries:
+            return None
+        self.stats["hits"] += 1
+        return self._touch(key)
+
+    def get_similar(self, embedding: List[float], generation: int, k: int,
+                    threshold: float) -> Optional[List[dict]]:
+        """Near-duplicate lookup: best cached query with cosine similarity >= threshold."""
+        import numpy as np
+
+        keys = [key for key, entry in self.entries.items()
+                if entry.get("embedding") and entry["generation"] == generation and entry["k"] == k
+                and entry.get("mode", "dense") == self.mode]
+        if not keys:
+            return None
+        matrix = np.asarray([self.entries[key]["embedding"] for key in keys], dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        similarities = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-8)
+        best = int(np.argmax(similarities))
+        if similarities[best] < threshold:
+            return None
+        self.stats["near_hits"] += 1
+        return self._touch(keys[best])
+
+    def put(self, query: str, generation: int, k: int, docs: List[dict],
+            embedding: Optional[List[float]] = None) -> None:
+        """Store results for a query that missed, evicting the least recently used entries."""
+        self.stats["misses"] += 1
+        key = self._key(query, generation, k)
+        self.entries[key] = {"generation": generation, "k": k, "mode": self.mode,
+                             "embedding": embedding, "docs": docs}
+        self.entries.move_to_end(key)
+        # 이전 generation의 결과는 다시 쓰일 일이 없으므로 함께 정리
+        for stale in [key for key, entry in self.entries.items() if entry["generation"] != generation]:
+            del self.entries[stale]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._dirty = True
+
+    def flush(self) -> None:
+        """Persist entries and stats atomically if anything changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"stats": self.stats, "entries": list(self.entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,279 @@
+"""Resident agent server: one warm agent behind a localhost HTTP JSON API.
+
+``cli.py --mode serve`` loads the embedding model, vector store, BM25 index
+and Gemini client once and then serves requests from thin clients
+(``cli.py --server http://127.0.0.1:8765 ...``), so per-request latency is
+the work itself instead of seconds of startup.
+
+Each HTTP connection is accepted on its own thread and submitted to a
+fixed worker pool; at most ``max_queue`` requests wait for a worker and
+the rest are rejected with 503. Local state (embedding cache, vector
+store, retrieval cache, BM25 index) is not thread-safe, so, like the batch
+runner, local work runs under one agent lock while Gemini calls run
+concurrently outside it. Requests for the same research ID are serialized
+so updates see each other's versions.
+
+Endpoints (JSON bodies and responses):
+
+- ``GET /health``, ``GET /metrics`` (Prometheus text)
+- ``POST /ingest`` ``{"docs": [...]}``
+- ``POST /research`` ``{"query", "id", "update": false}``
+- ``POST /retrieve`` ``{"query"}``
+- ``POST /diff`` ``{"id", "old", "new", "textual_only": false}``
+
+The server binds to localhost by default and has no authentication.
+"""
+import json
+import signal
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.commons import InvalidResearchIdError
+from core.metrics import METRICS, span, incr, record
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class QueueFullError(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class AgentServer:
+    """Worker pool and request handlers around one warm MarketingResearchAgent."""
+
+    def __init__(self, agent, workers: int = 4, max_queue: int = 32, flush_seconds: float = 30.0):
+        self.agent = agent
+        self.workers = workers
+        self.max_queue = max_queue
+        self.flush_seconds = flush_seconds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent-worker")
+        self.agent_lock = threading.Lock()
+        self._id_locks = {}
+        self._state_lock = threading.Lock()
+        self._pending = 0
+        self._stop = threading.Event()
+        self.started = time.time()
+
+    @classmethod
+    def from_config(cls, agent, **overrides) -> "AgentServer":
+        options = dict(agent.config.get('server') or {})
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(
+            agent,
+            workers=options.get('workers', 4),
+            max_queue=options.get('max_queue', 32),
+            flush_seconds=options.get('flush_seconds', 30.0),
+        )
+
+    # -- lifecycle -------------------------------------------------------
+
+    def warm_up(self) -> None:
+        """Load the embedding model, stores and Gemini client before the first request."""
+        agent = self.agent
+        with span("server.warm_up"):
+            agent.embeddings.embed_query("warm up")
+            agent.vectorstore
+            agent.bm25_index
+            agent.retrieval_cache
+            agent.history_index
+            agent.client
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            with self.agent_lock:
+                self.agent.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        self.executor.shutdown(wait=True)
+        with self.agent_lock:
+            self.agent.close()
+
+    # -- dispatch --------------------------------------------------------
+
+    def _id_lock(self, research_id: str) -> threading.Lock:
+        with self._state_lock:
+            return self._id_locks.setdefault(research_id, threading.Lock())
+
+    def submit(self, endpoint: str, payload: dict) -> dict:
+        """Run one request on the worker pool and wait for its result."""
+        handler = getattr(self, f"handle_{endpoint}", None)
+        if handler is None:
+            raise LookupError(f"Unknown endpoint: {endpoint}")
+        with self._state_lock:
+            if self._pending >= self.workers + self.max_queue:
+                incr("server_rejected")
+                raise QueueFullError("Server queue is full, retry later")
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def run():
+            record("server.queue_wait", time.perf_counter() - submitted, endpoint=endpoint)
+            with span(f"server.{endpoint}"):
+                return handler(payload)
+
+        try:
+            return self.executor.submit(run).result()
+        finally:
+            with self._state_lock:
+                self._pending -= 1
+
+    def health(self) -> dict:
+        with self._state_lock:
+            pending = self._pending
+        return {"status": "ok", "workers": self.workers, "pending": pending,
+                "uptime_seconds": round(time.time() - self.started, 1)}
+
+    # -- handlers (run on worker threads) ----------------------------------
+
+    def handle_ingest(self, payload: dict) -> dict:
+        docs = payload.get("docs") or []
+        if not docs:
+            raise ValueError("'docs' is required")
+        with self.agent_lock:
+            stats = self.agent.ingest_documents(docs)
+            self.agent.flush()
+        return stats
+
+    def handle_retrieve(self, payload: dict) -> dict:
+        query = payload.get("query")
+        if not query:
+            raise ValueError("'query' is required")
+        with self.agent_lock:
+            docs = self.agent._retrieve_docs(query)
+            return {"docs": docs, "retrieval": self.agent.last_retrieval}
+
+    def handle_diff(self, payload: dict) -> dict:
+        research_id, v1, v2 = payload.get("id"), payload.get("old"), payload.get("new")
+        if not research_id or v1 is None or v2 is None:
+            raise ValueError("'id', 'old' and 'new' are required")
+        with self.agent_lock:
+            return {"diff": self.agent.compute_diff(research_id, int(v1), int(v2),
+                                                    textual_only=bool(payload.get("textual_only")))}
+
+    def handle_research(self, payload: dict) -> dict:
+        query, research_id = payload.get("query"), payload.get("id")
+        update_mode = bool(payload.get("update"))
+        if not query or not research_id:
+            raise ValueError("'query' and 'id' are required")
+        agent = self.agent
+        with self._id_lock(research_id):
+            with self.agent_lock:
+                prompt = agent._prepare_research(query, research_id, update_mode)
+                retrieval = agent.last_retrieval
+                findings = agent._cached_response(prompt)
+                llm_cache_hit = agent.last_llm_cache_hit
+            if findings is None:
+                # Gemini 호출은 lock 밖에서 다른 요청과 동시에 실행
+                findings = agent._call_gemini(prompt)
+                with self.agent_lock:
+                    agent._store_response(prompt, findings)
+            with self.agent_lock:
+                result = agent._record_research(query, research_id, findings, update_mode)
+                stats = dict(agent.retrieval_cache.stats)
+        return {"result": result, "retrieval": retrieval, "retrieval_stats": stats,
+                "llm_cache_hit": llm_cache_hit}
+
+    # -- HTTP ------------------------------------------------------------
+
+    def make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json; charset=utf-8"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status: int, data: dict):
+                self._send(status, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send_json(200, server.health())
+                elif self.path == "/metrics":
+                    self._send(200, METRICS.to_prometheus().encode('utf-8'), "text/plain; version=0.0.4")
+                else:
+                    self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+            def do_POST(self):
+                start = time.perf_counter()
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                    data = server.submit(self.path.strip("/"), payload)
+                    status = 200
+                except json.JSONDecodeError as e:
+                    status, data = 400, {"error": f"Invalid JSON body: {e}"}
+                except LookupError as e:
+                    status, data = 404, {"error": str(e)}
+                except QueueFullError as e:
+                    status, data = 503, {"error": str(e)}
+                except (InvalidResearchIdError, ValueError) as e:
+                    status, data = 400, {"error": str(e)}
+                except FileNotFoundError as e:
+                    status, data = 404, {"error": str(e)}
+                except RuntimeError as e:
+                    status, data = 502, {"error": str(e)}
+                except Exception as e:
+                    status, data = 500, {"error": f"Unexpected error: {e}"}
+                data["server_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                self._send_json(status, data)
+
+            def log_message(self, format, *args):
+                print(f"[serve] {self.address_string()} {format % args}", file=sys.stderr)
+
+        return Handler
+
+    def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        httpd.daemon_threads = True
+        threading.Thread(target=self._flush_loop, name="agent-flush", daemon=True).start()
+        # SIGTERM(서비스 관리자 종료)도 Ctrl+C 와 같이 진행 중인 요청을 마치고 캐시를 기록한 뒤 종료
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=httpd.shutdown).start())
+        print(f"✓ 서버 준비 완료: http://{host}:{port} (workers {self.workers}, queue {self.max_queue})",
+              file=sys.stderr)
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print("\n서버를 종료합니다...", file=sys.stderr)
+            httpd.server_close()
+            self.close()
+
+
+def request(server_url: str, endpoint: str, payload: dict, timeout: float = 600) -> dict:
+    """Thin client: POST a JSON request to a running server.
+
+    Raises:
+        ValueError / FileNotFoundError / RuntimeError: mirroring the server-side error
+    """
+    req = urllib.request.Request(f"{server_url.rstrip('/')}/{endpoint}",
+                                 data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", str(e))
+        except (ValueError, AttributeError):
+            message = str(e)
+        if e.code == 400:
+            raise ValueError(message) from e
+        if e.code == 404:
+            raise FileNotFoundError(message) from e
+        raise RuntimeError(message) from e
+    except urllib.error.URLError as e:
+        raise RuntimeError(f"서버에 연결할 수 없습니다 ({server_url}): {e.reason}") from e
@@ -0,0 +1,284 @@
+"""Multi-version drift analysis of one research history.
+
+Each version's findings are split into sections by their markdown headings
+(``## 경쟁사 동향``, ``**가격**``; numbering is ignored so renumbered
+sections still line up), and each section into the same ~500-character
+pieces ``semantic_diff`` embeds. Pieces from many versions are embedded
+together in batches of at most ``batch_texts`` texts; repeated sections hit
+the embedding cache, so an unchanged section is embedded once per history.
+
+A section vector is the normalized sum of its piece vectors and a version
+vector the normalized sum of all its pieces. Only the previous version's
+section vectors and one vector per version are kept, so memory grows with
+``versions x dim`` rather than with the history size, and the version-to-
+version drift matrix is produced in row blocks when exported.
+
+Drift is cosine distance: ``step_drift`` against the previous version,
+``drift_from_first`` against version 1 and ``cumulative_drift`` the running
+sum of steps. A section counts as changed when its distance to the previous
+version exceeds ``threshold``; added and removed sections count as distance 1.
+A version with empty findings gets a zero vector, and any drift measured
+against it is undefined (``None`` in the records, empty/null in the matrix
+exports); its steps add nothing to ``cumulative_drift``.
+"""
+import csv
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+HEADING_PATTERN = re.compile(r'^\s*(?:#{1,6}\s+(.+?)\s*#*|\*\*([^*]+)\*\*:?)\s*$')
+NUMBERING_PATTERN = re.compile(r'^(?:\d+(?:\.\d+)*[.)]?|[IVX]+\.)\s+')
+PREAMBLE = "(서두)"
+MATRIX_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def section_title(heading: str) -> str:
+    return NUMBERING_PATTERN.sub('', heading.strip().rstrip(':')).strip() or heading.strip()
+
+
+def split_sections(findings: str, chunk_text: Callable[[str], List[str]]) -> List[Tuple[str, List[str]]]:
+    """[(title, pieces)] in document order; repeated titles get a " (2)" suffix.
+
+    Findings without any heading fall back to positional "섹션 N" pieces.
+    """
+    sections, title, lines, found_heading = [], PREAMBLE, [], False
+    for line in findings.splitlines():
+        match = HEADING_PATTERN.match(line)
+        if match:
+            found_heading = True
+            if '\n'.join(lines).strip():
+                sections.append((title, '\n'.join(lines)))
+            title, lines = section_title(match.group(1) or match.group(2)), []
+        else:
+            lines.append(line)
+    if '\n'.join(lines).strip():
+        sections.append((title, '\n'.join(lines)))
+
+    if not found_heading:
+        return [(f"섹션 {i}", [piece]) for i, piece in enumerate(chunk_text(findings), 1) if piece]
+
+    seen: Dict[str, int] = {}
+    titled = []
+    for title, text in sections:
+        seen[title] = seen.get(title, 0) + 1
+        pieces = [piece for piece in chunk_text(text) if piece]
+        titled.append((title if seen[title] == 1 else f"{title} ({seen[title]})", pieces))
+    return titled
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    return vector / (np.linalg.norm(vector) + 1e-8)
+
+
+def _distance(a: np.ndarray, b: np.ndarray) -> Optional[float]:
+    """Cosine distance of two normalized vectors, or None if either is empty (zero)."""
+    if not a.any() or not b.any():
+        return None
+    return float(max(0.0, 1.0 - a @ b))
+
+
+def _matrix_values(row: np.ndarray, missing) -> list:
+    values = np.round(row, 4).tolist()
+    if np.isnan(row).any():
+        values = [missing if value != value else value for value in values]
+    return values
+
+
+class Timeline:
+    """Per-version drift records, per-section churn and version vectors of one research."""
+
+    def __init__(self, research_id: str, threshold: float):
+        self.research_id = research_id
+        self.threshold = threshold
+        self.versions: List[dict] = []
+        self.sections: Dict[str, dict] = {}
+        self._vectors: List[np.ndarray] = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self._previous: Dict[str, np.ndarray] = {}
+
+    def _touch_section(self, title: str, version: int) -> dict:
+        return self.sections.setdefault(title, {
+            "section": title, "changes": 0, "drift": 0.0,
+            "first_version": version, "last_version": version, "last_changed": None,
+        })
+
+    def _change(self, title: str, version: int, distance: float) -> None:
+        stats = self.sections[title]
+        stats["drift"] += distance
+        if distance > self.threshold:
+            stats["changes"] += 1
+            stats["last_changed"] = version
+
+    def add_version(self, version: dict, sections: List[Tuple[str, np.ndarray]], vector: np.ndarray) -> None:
+        """Record one version given its (title, section vector) list and version vector."""
+        number = version["version"]
+        current = dict(sections)
+        changed, added, removed = [], [], []
+        for title, section_vector in sections:
+            stats = self._touch_section(title, number)
+            stats["last_version"] = number
+            if not self.versions:
+                continue
+            if title in self._previous:
+                distance = float(max(0.0, 1.0 - section_vector @ self._previous[title]))
+                self._change(title, number, distance)
+                if distance > self.threshold:
+                    changed.append(title)
+            else:
+                self._change(title, number, 1.0)
+                added.append(title)
+        for title in self._previous:
+            if title not in current:
+                self._change(title, number, 1.0)
+                removed.append(title)
+
+        if self._vectors:
+            step = _distance(vector, self._vectors[-1])
+            from_first = _distance(vector, self._vectors[0])
+            cumulative = self.versions[-1]["cumulative_drift"] + (step or 0.0)
+        else:
+            step = from_first = cumulative = 0.0
+        self.versions.append({
+            "version": number,
+            "timestamp": version.get("timestamp", ""),
+            "query": version.get("query", ""),
+            "sections": len(sections),
+            "step_drift": None if step is None else round(step, 4),
+            "drift_from_first": None if from_first is None else round(from_first, 4),
+            "cumulative_drift": round(cumulative, 4),
+            "changed": changed,
+            "added": added,
+            "removed": removed,
+        })
+        self._vectors.append(vector)
+        self._previous = current
+
+    def finish(self) -> "Timeline":
+        self.vectors = np.stack(self._vectors) if self._vectors else np.zeros((0, 0), dtype=np.float32)
+        self._vectors = []
+        self._previous = {}
+        for stats in self.sections.values():
+            stats["drift"] = round(stats["drift"], 4)
+        return self
+
+    def shifts(self, limit: int = 5) -> List[dict]:
+        """Versions whose step drift exceeds the threshold, largest first."""
+        shifts = [v for v in self.versions[1:] if v["step_drift"] is not None and v["step_drift"] > self.threshold]
+        return sorted(shifts, key=lambda v: v["step_drift"], reverse=True)[:limit]
+
+    def churn(self, limit: int = None) -> List[dict]:
+        """Sections ordered by number of changes, then accumulated drift."""
+        ranked = sorted(self.sections.values(), key=lambda s: (s["changes"], s["drift"]), reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def drift_rows(self) -> Iterator[np.ndarray]:
+        """Rows of the version x version cosine distance matrix, computed in bounded blocks.
+
+        Distances involving an empty-findings version are NaN.
+        """
+        n = len(self.vectors)
+        block = max(1, MATRIX_BLOCK_BYTES // (4 * max(n, 1)))
+        empty = ~self.vectors.any(axis=1) if n else np.zeros(0, dtype=bool)
+        for start in range(0, n, block):
+            rows = np.clip(1.0 - self.vectors[start:start + block] @ self.vectors.T, 0.0, 2.0)
+            if empty.any():
+                rows[:, empty] = np.nan
+                rows[empty[start:start + block]] = np.nan
+            yield from rows
+
+    def to_dict(self) -> dict:
+        return {
+            "research_id": self.research_id,
+            "threshold": self.threshold,
+            "versions": self.versions,
+            "shifts": [v["version"] for v in self.shifts(len(self.versions))],
+            "sections": self.churn(),
+        }
+
+    def write_json(self, path: str) -> None:
+        """Summary plus the full drift matrix, streamed row by row."""
+        summary = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(summary[:-2])
+            f.write(',\n  "drift_matrix": [')
+            for i, row in enumerate(self.drift_rows()):
+                f.write(("\n    " if i == 0 else ",\n    ") + json.dumps(_matrix_values(row, None)))
+            f.write("\n  ]\n}\n")
+
+    def write_csv(self, path: str) -> List[Path]:
+        """Write <path> (per version), <stem>_sections.csv and <stem>_matrix.csv."""
+        path = Path(path)
+        sections_path = path.with_name(f"{path.stem}_sections.csv")
+        matrix_path = path.with_name(f"{path.stem}_matrix.csv")
+
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["version", "timestamp", "query", "sections", "step_drift", "drift_from_first",
+                             "cumulative_drift", "changed", "added", "removed"])
+            for v in self.versions:
+                writer.writerow([v["version"], v["timestamp"], v["query"], v["sections"],
+                                 "" if v["step_drift"] is None else v["step_drift"],
+                                 "" if v["drift_from_first"] is None else v["drift_from_first"],
+                                 v["cumulative_drift"],
+                                 "; ".join(v["changed"]), "; ".join(v["added"]), "; ".join(v["removed"])])
+        with open(sections_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["section", "changes", "drift", "first_version", "last_version", "last_changed"])
+            for s in self.churn():
+                writer.writerow([s["section"], s["changes"], s["drift"], s["first_version"],
+                                 s["last_version"], s["last_changed"] or ""])
+        with open(matrix_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["version"] + [v["version"] for v in self.versions])
+            for v, row in zip(self.versions, self.drift_rows()):
+                writer.writerow([v["version"]] + _matrix_values(row, ""))
+        return [path, sections_path, matrix_path]
+
+
+def build_timeline(research_id: str, versions: Iterable[dict],
+                   embed_texts: Callable[[List[str]], np.ndarray],
+                   chunk_text: Callable[[str], List[str]],
+                   threshold: float = 0.15, batch_texts: int = 512) -> Timeline:
+    """Embed all versions in batches of up to ``batch_texts`` pieces and build the timeline."""
+    timeline = Timeline(research_id, threshold)
+    window: List[Tuple[dict, List[Tuple[str, List[str]]]]] = []
+    pending = 0
+    state = {"dim": 0}
+
+    def process():
+        texts = [piece for _, sections in window for _, pieces in sections for piece in pieces]
+        embedded = embed_texts(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+        if embedded.shape[1]:
+            state["dim"] = embedded.shape[1]
+        elif not state["dim"]:
+            # 창 안의 버전이 모두 빈 findings 라도 이후 버전과 같은 차원의 0 벡터를 쓰도록 임베딩 차원만 확인
+            state["dim"] = embed_texts([PREAMBLE]).shape[1]
+        dim = state["dim"]
+        if not embedded.shape[1]:
+            embedded = np.zeros((len(texts), dim), dtype=np.float32)
+        row = 0
+        for version, sections in window:
+            section_vectors = []
+            total = np.zeros(dim, dtype=np.float32)
+            for title, pieces in sections:
+                summed = embedded[row:row + len(pieces)].sum(axis=0) if pieces else np.zeros(dim, np.float32)
+                row += len(pieces)
+                total += summed
+                section_vectors.append((title, _normalize(summed)))
+            timeline.add_version(version, section_vectors, _normalize(total))
+        window.clear()
+
+    for version in versions:
+        sections = split_sections(version["findings"], chunk_text)
+        # 텍스트 본문은 임베딩 후 버리고 요약 필드만 유지
+        window.append(({k: version.get(k) for k in ("version", "timestamp", "query")}, sections))
+        pending += sum(len(pieces) for _, pieces in sections)
+        if pending >= batch_texts:
+            process()
+            pending = 0
+    if window:
+        process()
+    return timeline.finish()
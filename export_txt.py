@@ -1,74 +1,88 @@
 # export_txt.py
 import argparse
+import fnmatch
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from difflib import unified_diff
+from pathlib import Path
+from typing import List
 
-from core.commons import load_config, get_research_history_path, load_research
+from core.commons import (
+    load_config,
+    get_research_history_path,
+    load_research,
+    count_research_versions,
+    load_research_version,
+)
 
+# Diffs up to this size stay in memory; larger ones spill to a temp file
+DIFF_SPOOL_BYTES = 1024 * 1024
 
-def export_version(research_id: str, version: int, research_history_path, output_path: str = None) -> str:
-    """Export a specific version to TXT."""
-    data = load_research(research_id, research_history_path)
-    versions = data.get("versions", [])
-
-    if version < 1 or version > len(versions):
-        raise ValueError(f"Version {version} not found. Available: 1-{len(versions)}")
 
-    v = versions[version - 1]
-
-    content = f"""{'='*80}
+def write_version(f, research_id: str, v: dict) -> None:
+    """Write one version's TXT export to an open text file."""
+    f.write(f"""{'='*80}
 Research ID: {research_id}
 Version: {v['version']}
 Timestamp: {v['timestamp']}
 Query: {v['query']}
 {'='*80}
 
-{v['findings']}
+""")
+    f.write(v['findings'])
+    f.write(f"""
 
 {'='*80}
 Sources: {', '.join(v.get('sources', []))}
 Delta: {v.get('delta', 'N/A')}
 {'='*80}
-"""
+""")
+
+
+def export_version(research_id: str, version: int, research_history_path, output_path: str = None) -> str:
+    """Export a specific version to TXT."""
+    v = load_research_version(research_id, research_history_path, version)
 
     if output_path is None:
         output_path = f"{research_id}_v{version}.txt"
 
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+        write_version(f, research_id, v)
 
     return output_path
 
 
-def export_diff(research_id: str, v1: int, v2: int, research_history_path, output_path: str = None) -> str:
-    """Export diff between two versions to TXT."""
-    data = load_research(research_id, research_history_path)
-    versions = data.get("versions", [])
-    max_v = len(versions)
-
-    if v1 < 1 or v1 > max_v or v2 < 1 or v2 > max_v:
-        raise ValueError(f"Invalid version. Available: 1-{max_v}")
-
-    ver1 = versions[v1 - 1]
-    ver2 = versions[v2 - 1]
-
-    findings1 = ver1['findings']
-    findings2 = ver2['findings']
-
-    # Generate unified diff
-    diff_lines = list(unified_diff(
-        findings1.splitlines(keepends=True),
-        findings2.splitlines(keepends=True),
-        fromfile=f"Version {v1} ({ver1['timestamp']})",
-        tofile=f"Version {v2} ({ver2['timestamp']})",
-        lineterm=''
-    ))
-
-    # Count changes
-    added = sum(1 for line in diff_lines if line.startswith('+') and not line.startswith('+++'))
-    removed = sum(1 for line in diff_lines if line.startswith('-') and not line.startswith('---'))
-
-    content = f"""{'='*80}
+def write_diff(f, research_id: str, ver1: dict, ver2: dict) -> None:
+    """Write the diff report between two loaded versions to an open text file.
+
+    The unified diff is generated in a single pass: lines are counted as they
+    stream into a spooled temp file (on disk past DIFF_SPOOL_BYTES), so the
+    diff is never held as a list or concatenated into one string. The summary
+    header needs the counts, so the spooled diff is copied after it.
+    """
+    v1, v2 = ver1['version'], ver2['version']
+
+    added = removed = 0
+    with tempfile.SpooledTemporaryFile(max_size=DIFF_SPOOL_BYTES, mode='w+', encoding='utf-8') as spool:
+        for line in unified_diff(
+            ver1['findings'].splitlines(keepends=True),
+            ver2['findings'].splitlines(keepends=True),
+            fromfile=f"Version {v1} ({ver1['timestamp']})",
+            tofile=f"Version {v2} ({ver2['timestamp']})",
+            lineterm=''
+        ):
+            if line.startswith('+') and not line.startswith('+++'):
+                added += 1
+            elif line.startswith('-') and not line.startswith('---'):
+                removed += 1
+            spool.write(line)
+
+        f.write(f"""{'='*80}
 DIFF REPORT
 Research ID: {research_id}
 Comparison: Version {v1} → Version {v2}
@@ -92,33 +106,185 @@ SUMMARY
 {'='*80}
 UNIFIED DIFF
 {'='*80}
-"""
-
-    content += ''.join(diff_lines)
+""")
+        spool.seek(0)
+        shutil.copyfileobj(spool, f)
 
     # Add side-by-side summary
-    content += f"""
+    f.write(f"""
 
 {'='*80}
 VERSION {v1} FULL TEXT
 {'='*80}
-{findings1}
+""")
+    f.write(ver1['findings'])
+    f.write(f"""
 
 {'='*80}
 VERSION {v2} FULL TEXT
 {'='*80}
-{findings2}
-"""
+""")
+    f.write(ver2['findings'])
+    f.write("\n")
+
+
+def export_diff(research_id: str, v1: int, v2: int, research_history_path, output_path: str = None) -> str:
+    """Export diff between two versions to TXT."""
+    max_v = count_research_versions(research_id, research_history_path)
+    if max_v == 0:
+        raise FileNotFoundError(f"Research not found: {research_id}")
+
+    if v1 < 1 or v1 > max_v or v2 < 1 or v2 > max_v:
+        raise ValueError(f"Invalid version. Available: 1-{max_v}")
+
+    ver1 = load_research_version(research_id, research_history_path, v1)
+    ver2 = load_research_version(research_id, research_history_path, v2)
 
     if output_path is None:
         output_path = f"{research_id}_diff_v{v1}_v{v2}.txt"
 
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+        write_diff(f, research_id, ver1, ver2)
 
     return output_path
 
 
+def parse_version_ranges(spec: str, max_version: int) -> List[int]:
+    """Parse a version range spec like "1-3,5,7-" into sorted version numbers.
+
+    Versions beyond ``max_version`` are ignored; an empty spec selects all.
+    """
+    if not spec:
+        return list(range(1, max_version + 1))
+    selected = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = part.split('-', 1)
+                start = int(start) if start else 1
+                end = int(end) if end else max_version
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid version range: {part!r} (e.g. 1-3,5,7-)") from None
+        selected.update(range(max(start, 1), min(end, max_version) + 1))
+    return sorted(selected)
+
+
+def resolve_research_ids(patterns: List[str], research_history_path) -> List[str]:
+    """Expand research IDs / glob patterns against the history directory."""
+    available = sorted({p.stem for pattern in ("*.jsonl", "*.json")
+                        for p in Path(research_history_path).glob(pattern)
+                        if not p.name.endswith(".draft.json")})
+    research_ids = []
+    for pattern in patterns:
+        matches = fnmatch.filter(available, pattern)
+        if not matches:
+            raise FileNotFoundError(f"Research not found: {pattern}")
+        research_ids.extend(m for m in matches if m not in research_ids)
+    return research_ids
+
+
+def _export_research(research_id: str, research_history_path, version_spec: str, diffs: bool,
+                     output_dir: str) -> List[tuple]:
+    """Export the selected versions (and consecutive diffs) of one research ID.
+
+    Runs in a worker process. The history file is parsed once and each export
+    is written straight to its own file. Returns (file name, path) pairs.
+    """
+    data = load_research(research_id, Path(research_history_path))
+    versions = {v['version']: v for v in data.get("versions", [])}
+    selected = parse_version_ranges(version_spec, len(versions))
+
+    written = []
+    for version in selected:
+        name = f"{research_id}_v{version}.txt"
+        path = os.path.join(output_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            write_version(f, research_id, versions[version])
+        written.append((name, path))
+    if diffs:
+        for old, new in zip(selected, selected[1:]):
+            name = f"{research_id}_diff_v{old}_v{new}.txt"
+            path = os.path.join(output_dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                write_diff(f, research_id, versions[old], versions[new])
+            written.append((name, path))
+    return written
+
+
+def _open_archive(output: str):
+    """Return (add(name, path), close()) for a .zip / .tar[.gz|.bz2|.xz] archive."""
+    if output.endswith('.zip'):
+        archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED)
+        return (lambda name, path: archive.write(path, arcname=name)), archive.close
+    for suffix, mode in (('.tar.gz', 'w:gz'), ('.tgz', 'w:gz'), ('.tar.bz2', 'w:bz2'),
+                         ('.tar.xz', 'w:xz'), ('.tar', 'w')):
+        if output.endswith(suffix):
+            archive = tarfile.open(output, mode)
+            return (lambda name, path: archive.add(path, arcname=name)), archive.close
+    return None
+
+
+def export_bulk(patterns: List[str], research_history_path, output: str, version_spec: str = None,
+                diffs: bool = False, workers: int = None) -> int:
+    """Export many research IDs in a process pool.
+
+    Args:
+        patterns: Research IDs or glob patterns (e.g. "competitor_*")
+        research_history_path: Path to research history directory
+        output: Output directory, or a .zip/.tar/.tar.gz archive path
+        version_spec: Version ranges per ID (e.g. "1-3,5"); all versions if None
+        diffs: Also export diffs between consecutive selected versions
+        workers: Worker processes (default: CPU count)
+
+    Returns:
+        Number of files exported
+    """
+    research_ids = resolve_research_ids(patterns, research_history_path)
+    parse_version_ranges(version_spec, 0)  # 워커를 띄우기 전에 형식 오류 확인
+    archive = _open_archive(output)
+    if archive is None:
+        os.makedirs(output, exist_ok=True)
+        staging = None
+        output_dir = output
+    else:
+        # 워커는 임시 디렉터리에 파일을 쓰고, 메인 프로세스가 완료된 순서대로 아카이브에 추가
+        staging = tempfile.TemporaryDirectory()
+        output_dir = staging.name
+        add, close = archive
+
+    count = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_export_research, research_id, str(research_history_path),
+                                version_spec, diffs, output_dir): research_id
+                for research_id in research_ids
+            }
+            for future in as_completed(futures):
+                try:
+                    written = future.result()
+                except Exception as e:
+                    # 한 리서치의 오류로 전체 내보내기를 중단하지 않음
+                    print(f"  {futures[future]}: failed: {e!r}")
+                    continue
+                if staging is not None:
+                    for name, path in written:
+                        add(name, path)
+                        os.remove(path)
+                count += len(written)
+                print(f"  {futures[future]}: {len(written)} files")
+    finally:
+        if staging is not None:
+            close()
+            staging.cleanup()
+    return count
+
+
 def list_versions(research_id: str, research_history_path):
     """List all versions for a research ID."""
     data = load_research(research_id, research_history_path)
@@ -136,13 +302,21 @@ def list_versions(research_id: str, research_history_path):
 
 def main():
     parser = argparse.ArgumentParser(description="Export research versions to TXT")
-    parser.add_argument("--mode", choices=["version", "diff", "list"], required=True,
-                        help="version: export single version, diff: export diff, list: show versions")
-    parser.add_argument("--id", required=True, help="Research ID")
+    parser.add_argument("--mode", choices=["version", "diff", "list", "bulk"], required=True,
+                        help="version: export single version, diff: export diff, list: show versions, "
+                             "bulk: export many IDs/versions in parallel")
+    parser.add_argument("--id", help="Research ID")
+    parser.add_argument("--ids", nargs="+", help="Research IDs or glob patterns, e.g. 'competitor_*' (for bulk mode)")
+    parser.add_argument("--versions", help="Version ranges per ID, e.g. 1-3,5,7- (for bulk mode, default: all)")
+    parser.add_argument("--diffs", action="store_true",
+                        help="Also export diffs between consecutive selected versions (for bulk mode)")
+    parser.add_argument("--workers", type=int, help="Worker processes (for bulk mode, default: CPU count)")
     parser.add_argument("--version", "-v", type=int, help="Version number (for version mode)")
     parser.add_argument("--old", dest="old_ver", type=int, help="Source version (for diff mode)")
     parser.add_argument("--new", dest="new_ver", type=int, help="Target version (for diff mode)")
-    parser.add_argument("--output", "-o", help="Output file path (optional)")
+    parser.add_argument("--output", "-o",
+                        help="Output file path (optional); for bulk mode an output directory "
+                             "or a .zip/.tar/.tar.gz archive (default: exports/)")
     parser.add_argument("--config", "-c", default="config.yaml", help="Config file path (default: config.yaml)")
 
     args = parser.parse_args()
@@ -151,6 +325,11 @@ def main():
     config = load_config(args.config)
     research_history_path = get_research_history_path(config)
 
+    if args.mode != "bulk" and not args.id:
+        parser.error("--id required for version/diff/list mode")
+    if args.mode == "bulk" and not args.ids:
+        parser.error("--ids required for bulk mode")
+
     try:
         if args.mode == "list":
             list_versions(args.id, research_history_path)
@@ -167,6 +346,12 @@ def main():
             output = export_diff(args.id, args.old_ver, args.new_ver, research_history_path, args.output)
             print(f"✓ Exported to: {output}")
 
+        elif args.mode == "bulk":
+            output = args.output or "exports"
+            count = export_bulk(args.ids, research_history_path, output, args.versions,
+                                diffs=args.diffs, workers=args.workers)
+            print(f"✓ Exported {count} files to: {output}")
+
     except FileNotFoundError as e:
         print(f"Error: {e}")
     except ValueError as e:
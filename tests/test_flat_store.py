@@ -0,0 +1,78 @@
+"""Crash consistency of the flat vector store: entries past the header row count are discarded."""
+import hashlib
+import json
+
+import numpy as np
+import pytest
+
+import core.flat_store as flat_store
+from core.flat_store import FlatVectorStore
+
+
+class WordHashEmbeddings:
+    """Bag-of-words embeddings: texts sharing words are similar."""
+
+    def embed_documents(self, texts):
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.split():
+                vectors[i, int(hashlib.sha1(word.encode('utf-8')).hexdigest(), 16) % 64] += 1.0
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def open_store(path):
+    return FlatVectorStore(str(path), WordHashEmbeddings())
+
+
+def search(store, query, k=1):
+    return store.similarity_search_by_vector(store.embedding_function.embed_query(query), k=k)
+
+
+def test_interrupted_append_before_header_is_rolled_back(tmp_path, monkeypatch):
+    store = open_store(tmp_path)
+    store.add_texts(["alpha beta", "gamma delta"], ids=["a", "b"])
+
+    def crash(rows, dim):
+        raise KeyboardInterrupt
+    # 벡터와 모든 부가 파일을 쓴 뒤 헤더(커밋 지점) 갱신 직전에 중단
+    monkeypatch.setattr(flat_store, "_npy_header", crash)
+    with pytest.raises(KeyboardInterrupt):
+        store.add_texts(["crash text"], ids=["crash"])
+    monkeypatch.undo()
+
+    store = open_store(tmp_path)
+    assert store.rows == 2
+    assert store.get()["ids"] == ["a", "b"]
+    store.add_texts(["epsilon zeta"], ids=["c"])
+    assert store.get()["ids"] == ["a", "b", "c"]
+    assert search(store, "epsilon zeta")[0].page_content == "epsilon zeta"
+    assert search(store, "alpha beta")[0].metadata == {}
+
+
+def test_sidecar_entries_without_vectors_are_truncated(tmp_path):
+    store = open_store(tmp_path)
+    store.add_texts(["alpha beta", "gamma delta"], ids=["a", "b"], metadatas=[{"n": 1}, {"n": 2}])
+
+    # 이전 쓰기 순서에서 벡터/헤더를 쓰기 전에 중단된 상태
+    meta_size = store.meta_path.stat().st_size
+    with open(store.meta_path, 'ab') as f:
+        f.write((json.dumps({"id": "crash", "text": "crash text", "metadata": {}}) + '\n').encode('utf-8'))
+    with open(store.offsets_path, 'ab') as f:
+        f.write(np.asarray([meta_size], dtype='<u8').tobytes())
+    with open(store.ids_path, 'a', encoding='utf-8') as f:
+        f.write("crash\n")
+
+    reader = open_store(tmp_path)
+    assert reader.get()["ids"] == ["a", "b"]
+    reader.add_texts(["epsilon zeta"], ids=["c"], metadatas=[{"n": 3}])
+
+    reopened = open_store(tmp_path)
+    found = reopened.get()
+    assert found["ids"] == ["a", "b", "c"]
+    assert found["documents"] == ["alpha beta", "gamma delta", "epsilon zeta"]
+    hit = search(reopened, "epsilon zeta")[0]
+    assert (hit.page_content, hit.metadata) == ("epsilon zeta", {"n": 3})
+    assert len(reopened.ids_path.read_text(encoding='utf-8').splitlines()) == reopened.rows == 3
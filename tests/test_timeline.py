@@ -0,0 +1,66 @@
+"""Timeline drift analysis over histories that contain empty-findings versions."""
+import csv
+import hashlib
+import json
+
+import numpy as np
+import pytest
+
+from core.timeline import build_timeline
+
+
+def embed_texts(texts):
+    """Deterministic normalized embeddings; (n, 0) when no text is non-empty, like the agent's."""
+    if not any(texts):
+        return np.zeros((len(texts), 0), dtype=np.float32)
+    vectors = np.stack([
+        np.random.default_rng(int.from_bytes(hashlib.sha1(t.encode('utf-8')).digest()[:8], 'little'))
+        .standard_normal(16).astype(np.float32) for t in texts
+    ])
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def chunk_text(text, chunk_size=500):
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def versions(*findings):
+    return [{"version": i, "timestamp": f"2025-01-0{i}", "query": "q", "findings": f}
+            for i, f in enumerate(findings, 1)]
+
+
+@pytest.mark.parametrize("batch_texts", [1, 512])
+def test_empty_findings_version_has_undefined_drift(batch_texts):
+    history = versions("## 시장\n성장\n## 가격\n인상", "", "## 시장\n성장\n## 가격\n동결")
+    timeline = build_timeline("t", history, embed_texts, chunk_text, batch_texts=batch_texts)
+
+    first, empty, last = timeline.versions
+    assert empty["step_drift"] is None and empty["drift_from_first"] is None
+    assert empty["removed"] == ["시장", "가격"]
+    assert last["step_drift"] is None and last["drift_from_first"] is not None
+    assert last["cumulative_drift"] == 0.0
+    assert timeline.vectors.shape == (3, 16)
+    assert [v["version"] for v in timeline.shifts()] == []
+
+
+def test_leading_empty_versions_and_exports(tmp_path):
+    history = versions("", "", "## 시장\n성장", "## 시장\n하락")
+    timeline = build_timeline("t", history, embed_texts, chunk_text, batch_texts=1)
+
+    assert timeline.vectors.shape == (4, 16)
+    assert timeline.versions[3]["step_drift"] > 0
+    rows = list(timeline.drift_rows())
+    assert np.isnan(rows[0]).all() and np.isnan(rows[2][:2]).all() and rows[2][2] == 0.0
+
+    timeline.write_json(str(tmp_path / "t.json"))
+    exported = json.loads((tmp_path / "t.json").read_text(encoding='utf-8'))
+    assert exported["drift_matrix"][2][:3] == [None, None, 0.0]
+    timeline.write_csv(str(tmp_path / "t.csv"))
+    with open(tmp_path / "t_matrix.csv", encoding='utf-8') as f:
+        assert list(csv.reader(f))[3][1:4] == ["", "", "0.0"]
+
+
+def test_all_empty_history():
+    timeline = build_timeline("t", versions("", ""), embed_texts, chunk_text)
+    assert timeline.vectors.shape == (2, 16)
+    assert timeline.versions[1]["step_drift"] is None